@@ -0,0 +1,205 @@
+"""
+Concurrent multi-symbol fetching for the stock analysis scripts.
+
+BatchFetcher pulls many symbols at once through a bounded thread pool. A shared
+token-bucket rate limiter keeps it under the data provider's request limit, and
+failed fetches are retried with exponential backoff. Results can be consumed:
+
+- as a stream, symbol by symbol as each one arrives   -> iter_fetch()
+- as a dict of per-symbol frames                       -> fetch_many()
+- as one wide frame aligned on date, one column each   -> fetch_wide()
+
+fetch_many() and fetch_wide() raise FetchError when symbols still fail after all
+retries, unless called with raise_on_failure=False.
+
+By default symbols are read through the local PriceStore, so repeat runs are served
+from disk and only missing date ranges reach the network.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from price_store import PriceStore
+
+FetchFn = Callable[[str, str, str], pd.DataFrame]
+
+
+class FetchError(Exception):
+    """Some symbols could not be fetched; `failures` maps each one to its last error"""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = dict(failures)
+        details = ", ".join(f"{s} ({type(e).__name__}: {e})" for s, e in self.failures.items())
+        super().__init__(f"Failed to fetch {len(self.failures)} symbol(s) after retries: {details}")
+
+
+class RateLimiter:
+    """Token bucket shared by all worker threads"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchFetcher:
+    """Fetch many symbols concurrently with a bounded pool, rate limiting and retries"""
+
+    def __init__(self, fetch: Optional[FetchFn] = None, max_workers: int = 8,
+                 rate_per_second: Optional[float] = None, burst: int = 4,
+                 retries: int = 3, backoff: float = 0.5):
+        self.fetch = fetch or PriceStore().read
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate_per_second, burst) if rate_per_second else None
+        self.retries = retries
+        self.backoff = backoff
+        self.failures: Dict[str, Exception] = {}
+
+    def _fetch_one(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                return self.fetch(symbol, start_date, end_date)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def iter_fetch(self, symbols: List[str], start_date: str, end_date: str) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yield (symbol, frame) in completion order, so analysis can start on the first arrival
+
+        Symbols that still fail after all retries are skipped and recorded in self.failures.
+        """
+        self.failures = {}
+        unique_symbols = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._fetch_one, s, start_date, end_date): s for s in unique_symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    self.failures[symbol] = e
+                    continue
+                yield symbol, data
+
+    def fetch_many(self, symbols: List[str], start_date: str, end_date: str,
+                   raise_on_failure: bool = True) -> Dict[str, pd.DataFrame]:
+        """Dict of frames in the order the symbols were given
+
+        Raises FetchError if any symbol failed; with raise_on_failure=False the failed
+        symbols are left out and only recorded in self.failures.
+        """
+        results = dict(self.iter_fetch(symbols, start_date, end_date))
+        if self.failures and raise_on_failure:
+            raise FetchError(self.failures)
+        return {s: results[s] for s in dict.fromkeys(symbols) if s in results}
+
+    def fetch_wide(self, symbols: List[str], start_date: str, end_date: str, column: str = "Close",
+                   raise_on_failure: bool = True) -> pd.DataFrame:
+        """One frame indexed by date with a `column` series per symbol (outer-joined)"""
+        frames = self.fetch_many(symbols, start_date, end_date, raise_on_failure)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat({s: f[column] for s, f in frames.items()}, axis=1, join="outer").sort_index()
+
+
+# Example usage:
+# fetcher = BatchFetcher(max_workers=8, rate_per_second=5)
+# for symbol, data in fetcher.iter_fetch(["NVDA", "TSLA", "AAPL"], "2025-01-01", "2025-02-17"):
+#     analyze(symbol, data)
+
+
+def benchmark_throughput(n_symbols: int = 200, latency: float = 0.05, failure_rate: float = 0.05):
+    """Symbols/sec for serial vs. concurrent fetching against a fake source with latency"""
+    import random
+    import tempfile
+
+    from price_store import SyntheticSource, to_date
+
+    source = SyntheticSource(latency=latency)
+    rng = random.Random(0)
+    lock = threading.Lock()
+
+    def flaky_fetch(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        with lock:
+            fail = rng.random() < failure_rate
+        if fail:
+            time.sleep(latency)
+            raise ConnectionError(f"Injected failure for {symbol}")
+        return source.fetch(symbol, to_date(start_date), to_date(end_date))
+
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    start_date, end_date = "2024-01-01", "2025-01-01"
+
+    print(f"=== BATCH FETCH: {n_symbols} symbols, {latency * 1000:.0f} ms latency, "
+          f"{failure_rate:.0%} injected failures ===")
+
+    started = time.perf_counter()
+    for symbol in symbols:
+        source.fetch(symbol, to_date(start_date), to_date(end_date))
+    serial = time.perf_counter() - started
+    print(f"Serial loop:            {n_symbols / serial:8.1f} symbols/sec")
+
+    for workers in (4, 8, 16, 32):
+        fetcher = BatchFetcher(flaky_fetch, max_workers=workers, backoff=0.01)
+        started = time.perf_counter()
+        first_arrival = None
+        received = 0
+        for _ in fetcher.iter_fetch(symbols, start_date, end_date):
+            received += 1
+            if first_arrival is None:
+                first_arrival = time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        print(f"{workers:>2} workers:             {received / elapsed:8.1f} symbols/sec "
+              f"(first result after {first_arrival * 1000:.0f} ms, {len(fetcher.failures)} failed)")
+
+    fetcher = BatchFetcher(flaky_fetch, max_workers=32, rate_per_second=100, burst=10, backoff=0.01)
+    started = time.perf_counter()
+    wide = fetcher.fetch_wide(symbols, start_date, end_date, raise_on_failure=False)
+    elapsed = time.perf_counter() - started
+    print(f"32 workers, 100 req/s:  {wide.shape[1] / elapsed:8.1f} symbols/sec "
+          f"(wide frame {wide.shape[0]} dates x {wide.shape[1]} symbols, {len(fetcher.failures)} failed)")
+
+    def outage(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        if symbol == symbols[0]:
+            raise ConnectionError(f"{symbol} source unavailable")
+        return source.fetch(symbol, to_date(start_date), to_date(end_date))
+
+    try:
+        BatchFetcher(outage, max_workers=8, retries=1, backoff=0.01).fetch_wide(symbols[:20], start_date, end_date)
+    except FetchError as e:
+        print(f"Symbol down for good:   {e}")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, source)
+        fetcher = BatchFetcher(store.read, max_workers=16)
+        fetcher.fetch_many(symbols, start_date, end_date)
+        started = time.perf_counter()
+        fetcher.fetch_many(symbols, start_date, end_date)
+        elapsed = time.perf_counter() - started
+        print(f"16 workers, warm store: {n_symbols / elapsed:8.1f} symbols/sec")
+
+
+if __name__ == "__main__":
+    benchmark_throughput()
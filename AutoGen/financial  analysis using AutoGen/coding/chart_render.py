@@ -0,0 +1,258 @@
+"""
+Headless, parallel chart rendering for the stock analysis scripts.
+
+Charts are described as data (a ChartJob naming a ChartTemplate plus the lines to
+draw) and rendered by a pool of worker processes with the Agg backend through the
+object-oriented Figure API, so nothing depends on pyplot's global state or a display.
+
+- Templates: each worker keeps one Figure per template and reuses it between jobs
+- Skipping: a chart whose template and input data hash is unchanged is not re-rendered
+- Output: every PNG goes to a configurable output directory
+
+    renderer = ChartRenderer("charts", workers=4)
+    renderer.render([ChartJob.from_series("close", "NVDA", data["Close"], "NVDA_close.png")])
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DEFAULT_OUTPUT_DIR = os.environ.get("CHART_OUTPUT_DIR", os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_NAME = ".render_manifest.json"
+
+
+# ============================================================================
+# TEMPLATES AND JOBS
+# ============================================================================
+
+@dataclass(frozen=True)
+class PanelSpec:
+    title: str = ""
+    ylabel: str = ""
+    kind: str = "line"  # "line" or "bar"
+    legend: bool = False
+    grid: bool = False
+
+
+@dataclass(frozen=True)
+class ChartTemplate:
+    name: str
+    panels: Tuple[PanelSpec, ...]
+    figsize: Tuple[float, float] = (10, 6)
+    xlabel: str = "Date"
+    suptitle: bool = False  # draw the job title above all panels instead of in the panel
+
+
+TEMPLATES: Dict[str, ChartTemplate] = {
+    "close": ChartTemplate("close", (PanelSpec(ylabel="Closing Price (USD)"),)),
+    "volume": ChartTemplate("volume", (PanelSpec(ylabel="Volume"),)),
+    "moving_averages": ChartTemplate("moving_averages", (PanelSpec(ylabel="Price (USD)", legend=True),)),
+    "daily_returns": ChartTemplate("daily_returns", (PanelSpec(ylabel="Daily Return"),)),
+    "price_lines": ChartTemplate("price_lines", (PanelSpec(ylabel="Price in USD", legend=True, grid=True),),
+                                 figsize=(14, 7)),
+    "ytd_and_volume": ChartTemplate(
+        "ytd_and_volume",
+        (PanelSpec("YTD Gains and Moving Averages", "Gain in %", legend=True, grid=True),
+         PanelSpec("Daily Trading Volume", "Volume", kind="bar", legend=True, grid=True)),
+        figsize=(12, 10), suptitle=True),
+}
+
+
+@dataclass
+class Line:
+    label: str
+    x: np.ndarray
+    y: np.ndarray
+    style: Dict = field(default_factory=dict)  # passed to plot()/bar(), e.g. color, linestyle, alpha
+
+
+@dataclass
+class ChartJob:
+    template: str
+    title: str
+    filename: str
+    panels: List[List[Line]]  # one list of lines per template panel
+
+    @classmethod
+    def from_series(cls, template: str, title: str, series: pd.Series, filename: str, **style) -> "ChartJob":
+        return cls(template, title, filename, [[Line(str(series.name), series.index.values, series.to_numpy(), style)]])
+
+    @classmethod
+    def from_frame(cls, template: str, title: str, frame: pd.DataFrame, filename: str) -> "ChartJob":
+        lines = [Line(str(col), frame.index.values, frame[col].to_numpy()) for col in frame.columns]
+        return cls(template, title, filename, [lines])
+
+    def content_hash(self) -> str:
+        """Hash of everything that affects the rendered image"""
+        digest = hashlib.sha256(repr((TEMPLATES[self.template], self.title)).encode())
+        for panel in self.panels:
+            for line in panel:
+                digest.update(repr((line.label, sorted(line.style.items()))).encode())
+                digest.update(np.ascontiguousarray(line.x).view(np.uint8))
+                digest.update(np.ascontiguousarray(line.y, dtype=np.float64).view(np.uint8))
+        return digest.hexdigest()
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+# Per-process cache of (figure, axes) keyed by template name
+_FIGURES: Dict[str, Tuple[Figure, list]] = {}
+
+
+def _figure_for(template: ChartTemplate) -> Tuple[Figure, list]:
+    cached = _FIGURES.get(template.name)
+    if cached is None:
+        figure = Figure(figsize=template.figsize)
+        FigureCanvasAgg(figure)
+        axes = list(figure.subplots(len(template.panels), 1, squeeze=False)[:, 0])
+        cached = _FIGURES[template.name] = (figure, axes)
+    return cached
+
+
+def render_job(job: ChartJob, output_dir: str) -> str:
+    """Draw one chart into the reused template figure and save it as PNG"""
+    template = TEMPLATES[job.template]
+    figure, axes = _figure_for(template)
+    figure.suptitle("")
+
+    for ax, spec, lines in zip(axes, template.panels, job.panels):
+        ax.cla()
+        for line in lines:
+            if spec.kind == "bar":
+                ax.bar(line.x, line.y, label=line.label, **line.style)
+            else:
+                ax.plot(line.x, line.y, label=line.label, **line.style)
+        ax.set_title(spec.title if template.suptitle else (spec.title or job.title))
+        ax.set_ylabel(spec.ylabel)
+        if spec.legend and lines:
+            ax.legend()
+        if spec.grid:
+            ax.grid(True)
+    axes[-1].set_xlabel(template.xlabel)
+
+    if template.suptitle:
+        figure.suptitle(job.title)
+        figure.tight_layout(rect=[0, 0.03, 1, 0.95])
+    path = os.path.join(output_dir, job.filename)
+    figure.savefig(path)
+    return path
+
+
+def _render_batch(jobs: List[ChartJob], output_dir: str) -> List[str]:
+    return [render_job(job, output_dir) for job in jobs]
+
+
+# ============================================================================
+# RENDERER
+# ============================================================================
+
+@dataclass
+class RenderReport:
+    rendered: int
+    skipped: int
+    elapsed: float
+
+    @property
+    def charts_per_second(self) -> float:
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+
+class ChartRenderer:
+    """Fans chart jobs out to a process pool and skips charts whose inputs are unchanged"""
+
+    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR, workers: int = 4, skip_unchanged: bool = True):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.skip_unchanged = skip_unchanged
+        os.makedirs(output_dir, exist_ok=True)
+        self._manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self._manifest: Dict[str, str] = {}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as f:
+                self._manifest = json.load(f)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def render(self, jobs: Sequence[ChartJob]) -> RenderReport:
+        started = time.perf_counter()
+        hashes = {job.filename: job.content_hash() for job in jobs}
+        pending = [
+            job for job in jobs
+            if not (self.skip_unchanged
+                    and self._manifest.get(job.filename) == hashes[job.filename]
+                    and os.path.exists(os.path.join(self.output_dir, job.filename)))
+        ]
+
+        if self.workers <= 1 or len(pending) <= 1:
+            _render_batch(pending, self.output_dir)
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            # A few jobs per task keeps pickling overhead low while balancing load
+            chunk = max(1, len(pending) // (self.workers * 4))
+            batches = [pending[i:i + chunk] for i in range(0, len(pending), chunk)]
+            for future in [self._pool.submit(_render_batch, batch, self.output_dir) for batch in batches]:
+                future.result()
+
+        for job in pending:
+            self._manifest[job.filename] = hashes[job.filename]
+        with open(self._manifest_path, "w") as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+
+        return RenderReport(len(pending), len(jobs) - len(pending), time.perf_counter() - started)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ChartRenderer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(n_charts: int = 120, worker_counts: Sequence[int] = (1, 4, 8)):
+    """Charts/sec for 1, 4 and 8 workers, plus a re-run with unchanged data"""
+    import tempfile
+
+    from price_store import SyntheticSource, to_date
+
+    source = SyntheticSource()
+    symbols = [f"SYM{i:03d}" for i in range(n_charts // 4)]
+    jobs = []
+    for symbol in symbols:
+        data = source.fetch(symbol, to_date("2024-01-01"), to_date("2025-01-01"))
+        jobs += [
+            ChartJob.from_series("close", f"{symbol} Closing Price Trend", data["Close"], f"{symbol}_close.png"),
+            ChartJob.from_series("volume", f"{symbol} Trading Volume", data["Volume"], f"{symbol}_volume.png",
+                                 color="orange"),
+            ChartJob.from_frame("moving_averages", f"{symbol} Moving Averages",
+                                data[["Close"]].assign(MA_30=data["Close"].rolling(30).mean()),
+                                f"{symbol}_moving_averages.png"),
+            ChartJob.from_series("daily_returns", f"{symbol} Daily Returns", data["Close"].pct_change(),
+                                 f"{symbol}_daily_returns.png", color="red"),
+        ]
+
+    print(f"=== CHART RENDERING: {len(jobs)} charts ===")
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as output_dir, ChartRenderer(output_dir, workers) as renderer:
+            report = renderer.render(jobs)
+            rerun = renderer.render(jobs)
+            print(f"{workers} worker(s): {report.charts_per_second:7.1f} charts/sec "
+                  f"({report.elapsed:.2f} s); unchanged re-run skipped {rerun.skipped} in {rerun.elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,54 +1,57 @@
-import yfinance as yf
-import matplotlib.pyplot as plt
+import pandas as pd
+from price_store import PriceStore
+from batch_fetch import BatchFetcher, FetchError
+from indicators import returns, rolling_means
+from chart_render import ChartJob, ChartRenderer
+
+# Bars are cached on disk; repeat runs only fetch dates not seen before
+store = PriceStore()
 
 def fetch_stock_data(symbol, start_date, end_date):
-    stock = yf.Ticker(symbol)
-    hist = stock.history(start=start_date, end=end_date)
-    return hist
-
-def plot_close_prices(data, symbol):
-    data['Close'].plot(title=f'{symbol} Closing Price Trend', figsize=(10, 6))
-    plt.xlabel('Date')
-    plt.ylabel('Closing Price (USD)')
-    plt.savefig(f'/content/coding/{symbol}_closing_price_trend.png')
-    plt.show()
-
-def plot_volumes(data, symbol):
-    data['Volume'].plot(title=f'{symbol} Trading Volume', figsize=(10, 6), color='orange')
-    plt.xlabel('Date')
-    plt.ylabel('Volume')
-    plt.savefig(f'/content/coding/{symbol}_trading_volume.png')
-    plt.show()
-
-def plot_moving_averages(data, symbol):
+    return store.read(symbol, start_date, end_date)
+
+def close_price_chart(data, symbol):
+    return ChartJob.from_series('close', f'{symbol} Closing Price Trend', data['Close'],
+                                f'{symbol}_closing_price_trend.png')
+
+def volume_chart(data, symbol):
+    return ChartJob.from_series('volume', f'{symbol} Trading Volume', data['Volume'],
+                                f'{symbol}_trading_volume.png', color='orange')
+
+def moving_averages_chart(data, symbol):
     moving_averages = [30, 50]
-    for ma in moving_averages:
-        data[f'MA_{ma}'] = data['Close'].rolling(window=ma).mean()
-    data[['Close', 'MA_30', 'MA_50']].plot(title=f'{symbol} Moving Averages', figsize=(10, 6))
-    plt.xlabel('Date')
-    plt.ylabel('Price (USD)')
-    plt.savefig(f'/content/coding/{symbol}_moving_averages.png')
-    plt.show()
-
-def plot_daily_returns(data, symbol):
-    data['Daily Return'] = data['Close'].pct_change()
-    data['Daily Return'].plot(title=f'{symbol} Daily Returns', figsize=(10, 6), color='red')
-    plt.xlabel('Date')
-    plt.ylabel('Daily Return')
-    plt.savefig(f'/content/coding/{symbol}_daily_returns.png')
-    plt.show()
+    close = data['Close'].to_numpy()
+    # Both windows in one pass, without adding columns to the caller's frame
+    averages = rolling_means(close, moving_averages)[:, :, 0]
+    lines = pd.DataFrame({'Close': close, **{f'MA_{ma}': averages[i] for i, ma in enumerate(moving_averages)}},
+                         index=data.index)
+    return ChartJob.from_frame('moving_averages', f'{symbol} Moving Averages', lines,
+                               f'{symbol}_moving_averages.png')
+
+def daily_returns_chart(data, symbol):
+    daily_return = pd.Series(returns(data['Close'].to_numpy())[:, 0], index=data.index, name='Daily Return')
+    return ChartJob.from_series('daily_returns', f'{symbol} Daily Returns', daily_return,
+                                f'{symbol}_daily_returns.png', color='red')
 
 def main():
     start_date = '2025-01-01'
     end_date = '2025-02-17'
     symbols = ['NVDA', 'TSLA']
 
-    for symbol in symbols:
-        data = fetch_stock_data(symbol, start_date, end_date)
-        plot_close_prices(data, symbol)
-        plot_volumes(data, symbol)
-        plot_moving_averages(data, symbol)
-        plot_daily_returns(data, symbol)
+    # Symbols are fetched concurrently; their charts are rendered headless in parallel
+    # into CHART_OUTPUT_DIR, skipping any chart whose data has not changed
+    fetcher = BatchFetcher(fetch_stock_data)
+    jobs = []
+    for symbol, data in fetcher.iter_fetch(symbols, start_date, end_date):
+        jobs += [close_price_chart(data, symbol), volume_chart(data, symbol),
+                 moving_averages_chart(data, symbol), daily_returns_chart(data, symbol)]
+    # iter_fetch skips symbols that failed after all retries; don't drop them silently
+    if fetcher.failures:
+        raise FetchError(fetcher.failures)
+
+    with ChartRenderer() as renderer:
+        report = renderer.render(jobs)
+    print(f'Rendered {report.rendered} charts to {renderer.output_dir} ({report.skipped} unchanged)')
 
 if __name__ == "__main__":
     main()
@@ -1,56 +1,44 @@
-import yfinance as yf
-import matplotlib.pyplot as plt
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from datetime import datetime
+from price_store import PriceStore
+from batch_fetch import BatchFetcher
+from indicators import sma, ytd_gain
+from chart_render import ChartJob, ChartRenderer, Line
+
+# Bars are cached on disk; repeat runs only fetch dates not seen before
+store = PriceStore()
 
 def fetch_stock_data(symbol: str, start_date: str, end_date: str) -> DataFrame:
-    stock = yf.Ticker(symbol)
-    return stock.history(start=start_date, end=end_date)
+    return store.read(symbol, start_date, end_date)
 
 def calculate_moving_average(data: DataFrame, period: int) -> DataFrame:
-    return data['Close'].rolling(window=period).mean()
+    return Series(sma(data['Close'].to_numpy(), period)[:, 0], index=data.index)
 
 def plot_stock_data(stock_data: dict, title: str, file_name: str):
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-    
-    # Plot YTD gain and moving averages on the first subplot
+    # YTD gain and moving averages on the first panel
+    gain_lines = []
     for label, data in stock_data.items():
-        ytd_gain = ((data['Close'] - data['Close'].iloc[0]) / data['Close'].iloc[0]) * 100
+        gain = ytd_gain(data['Close'].to_numpy())[:, 0]
         moving_average = calculate_moving_average(data, period=15)  # 15-day moving average        
-        ax1.plot(data.index, ytd_gain, label=f'{label} YTD Gain (%)')
-        ax1.plot(data.index, ((moving_average - data['Close'].iloc[0]) / data['Close'].iloc[0]) * 100, 
-                 label=f'{label} 15-Day MA', linestyle='--')
-    
-    ax1.set_title('YTD Gains and Moving Averages')
-    ax1.set_ylabel('Gain in %')
-    ax1.legend()
-    ax1.grid(True)
-    
-    # Plot volume on the second subplot
-    for label, data in stock_data.items():
-        ax2.bar(data.index, data['Volume'], label=f'{label} Volume', alpha=0.3)
+        gain_lines.append(Line(f'{label} YTD Gain (%)', data.index.values, gain))
+        gain_lines.append(Line(f'{label} 15-Day MA', data.index.values,
+                               (((moving_average - data['Close'].iloc[0]) / data['Close'].iloc[0]) * 100).to_numpy(),
+                               {'linestyle': '--'}))
     
-    ax2.set_title('Daily Trading Volume')
-    ax2.set_ylabel('Volume')
-    ax2.legend()
-    ax2.grid(True)
+    # Volume on the second panel
+    volume_lines = [Line(f'{label} Volume', data.index.values, data['Volume'].to_numpy(), {'alpha': 0.3})
+                    for label, data in stock_data.items()]
     
-    # Global settings and saving
-    plt.suptitle(title)
-    plt.xlabel('Date')
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-    plt.savefig(file_name)
-    plt.show()
+    # Rendered headless into CHART_OUTPUT_DIR; skipped when the data has not changed
+    with ChartRenderer(workers=1) as renderer:
+        renderer.render([ChartJob('ytd_and_volume', title, file_name, [gain_lines, volume_lines])])
 
 # Define the start of the year and the current date
 start_date = '2025-01-01'
 current_date = datetime.now().strftime('%Y-%m-%d')
 
 # Fetch and plot data for NVDA and TSLA
-stock_data = {
-    'NVDA': fetch_stock_data('NVDA', start_date, current_date),
-    'TSLA': fetch_stock_data('TSLA', start_date, current_date)
-}
+stock_data = BatchFetcher(fetch_stock_data).fetch_many(['NVDA', 'TSLA'], start_date, current_date)
 
 plot_stock_data(stock_data=stock_data,
                 title='Detailed Stock Analysis for NVDA and TSLA in 2025',
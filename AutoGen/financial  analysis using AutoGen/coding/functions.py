@@ -0,0 +1,211 @@
+"""
+Stock data functions shared by the AutoGen coding scripts.
+
+get_stock_prices returns close prices aligned on date, one column per symbol. Results
+are memoized in a size-bounded, in-process cache keyed on the symbols and date range.
+A cached wider range also serves narrower requests (and a cached superset of symbols
+serves a subset) by slicing, so repeated queries inside one session never go back to
+the data source.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, FrozenSet, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from price_store import DateLike, to_date
+
+CloseSource = Callable[[List[str], str, str], pd.DataFrame]
+CacheKey = Tuple[FrozenSet[str], date, date]
+
+
+@dataclass
+class PriceCacheStats:
+    hits: int = 0        # exact (symbols, range) matches
+    subsumed: int = 0    # served by slicing a wider cached entry
+    misses: int = 0
+    evictions: int = 0
+
+
+class PriceCache:
+    """LRU of close-price frames that can answer narrower requests from wider entries"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.stats = PriceCacheStats()
+        self._entries: "OrderedDict[CacheKey, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, symbols: List[str], start: date, end: date) -> Optional[pd.DataFrame]:
+        wanted = frozenset(symbols)
+        with self._lock:
+            exact = self._entries.get((wanted, start, end))
+            if exact is not None:
+                self._entries.move_to_end((wanted, start, end))
+                self.stats.hits += 1
+                return exact[symbols]
+
+            for key, frame in reversed(self._entries.items()):
+                cached_symbols, cached_start, cached_end = key
+                if wanted <= cached_symbols and cached_start <= start and end <= cached_end:
+                    self._entries.move_to_end(key)
+                    self.stats.subsumed += 1
+                    return frame.loc[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end)), symbols]
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, symbols: List[str], start: date, end: date, frame: pd.DataFrame):
+        with self._lock:
+            self._entries[(frozenset(symbols), start, end)] = frame
+            self._entries.move_to_end((frozenset(symbols), start, end))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+
+_cache = PriceCache()
+_source: Optional[CloseSource] = None
+
+
+def _default_source(symbols: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+    # Imported lazily so importing this module does not create the on-disk store
+    from batch_fetch import BatchFetcher
+
+    return BatchFetcher().fetch_wide(symbols, start_date, end_date, column="Close")
+
+
+def set_price_source(source: Optional[CloseSource], max_entries: Optional[int] = None):
+    """Use `source(symbols, start_date, end_date)` for close prices (None restores the default)
+
+    The cache is reset, since its entries came from the previous source.
+    """
+    global _source, _cache
+    _source = source
+    _cache = PriceCache(max_entries if max_entries is not None else _cache.max_entries)
+
+
+def price_cache() -> PriceCache:
+    return _cache
+
+
+def get_stock_prices(stock_symbols: Union[str, List[str]], start_date: DateLike, end_date: DateLike) -> pd.DataFrame:
+    """Get the stock prices for the given stock symbols between
+    the start and end dates.
+
+    Args:
+        stock_symbols (str or list): The stock symbols to get the
+        prices for.
+        start_date (str): The start date in the format
+        'YYYY-MM-DD'.
+        end_date (str): The end date in the format 'YYYY-MM-DD'
+        (exclusive).
+
+    Returns:
+        pandas.DataFrame: The closing prices for the given stock
+        symbols indexed by date, with one column per stock
+        symbol in the order given.
+
+    Raises:
+        batch_fetch.FetchError: Some symbols could not be fetched
+        from the default source.
+    """
+    symbols = [stock_symbols] if isinstance(stock_symbols, str) else list(dict.fromkeys(stock_symbols))
+    start, end = to_date(start_date), to_date(end_date)
+
+    cached = _cache.get(symbols, start, end)
+    if cached is not None:
+        return cached.copy()
+
+    source = _source or _default_source
+    frame = source(symbols, start.isoformat(), end.isoformat())
+    complete = all(s in frame.columns and frame[s].notna().any() for s in symbols)
+    frame = frame.reindex(columns=symbols).sort_index()
+    # Ranges reaching past today can still gain bars, so only settled ranges are cached;
+    # a missing or empty symbol may be a passing outage, so that frame is not cached either
+    if complete and end <= date.today():
+        _cache.put(symbols, start, end, frame)
+    return frame.copy()
+
+
+def _self_check():
+    """Cache hits, range/symbol subsumption, partial overlaps and eviction on a synthetic source"""
+    import time
+
+    from price_store import SyntheticSource
+
+    synthetic = SyntheticSource()
+    calls = []
+
+    def source(symbols, start_date, end_date):
+        calls.append((tuple(symbols), start_date, end_date))
+        return pd.concat({s: synthetic.fetch(s, to_date(start_date), to_date(end_date))["Close"] for s in symbols},
+                         axis=1)
+
+    set_price_source(source, max_entries=2)
+
+    full = get_stock_prices(["NVDA", "TSLA"], "2024-01-01", "2024-07-01")
+    assert list(full.columns) == ["NVDA", "TSLA"] and len(calls) == 1
+
+    # Exact hit
+    assert get_stock_prices(["TSLA", "NVDA"], "2024-01-01", "2024-07-01").equals(full[["TSLA", "NVDA"]])
+    assert len(calls) == 1 and price_cache().stats.hits == 1
+
+    # Narrower range and symbol subset are sliced from the cached entry
+    narrow = get_stock_prices("NVDA", "2024-02-01", "2024-03-01")
+    assert len(calls) == 1 and price_cache().stats.subsumed == 1
+    expected = source(["NVDA"], "2024-02-01", "2024-03-01")
+    calls.pop()
+    assert narrow.equals(expected)
+
+    # Returned frames are copies, so callers cannot corrupt the cache
+    narrow.iloc[:, :] = 0
+    assert get_stock_prices("NVDA", "2024-02-01", "2024-03-01").equals(expected)
+
+    # A range that only partially overlaps the cached one goes to the source
+    get_stock_prices(["NVDA", "TSLA"], "2024-06-01", "2024-08-01")
+    assert len(calls) == 2 and price_cache().stats.misses == 2
+
+    # A third entry evicts the least recently used one (the first range)
+    get_stock_prices(["AAPL"], "2024-01-01", "2024-02-01")
+    assert price_cache().stats.evictions == 1
+    get_stock_prices(["NVDA"], "2024-02-01", "2024-03-01")
+    assert len(calls) == 4
+
+    # A symbol the source did not return is NaN in the result but never cached
+    down = {"TSLA"}
+
+    def flaky_source(symbols, start_date, end_date):
+        return source([s for s in symbols if s not in down], start_date, end_date)
+
+    set_price_source(flaky_source)
+    assert get_stock_prices(["NVDA", "TSLA"], "2023-01-01", "2023-02-01")["TSLA"].isna().all()
+    down.clear()
+    assert get_stock_prices(["NVDA", "TSLA"], "2023-01-01", "2023-02-01")["TSLA"].notna().all()
+    assert price_cache().stats.hits == 0
+
+    set_price_source(source, max_entries=32)
+    started = time.perf_counter()
+    get_stock_prices(["NVDA", "TSLA"], "2015-01-01", "2025-01-01")
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for month in range(1, 13):
+        get_stock_prices(["NVDA"], f"2020-{month:02d}-01", f"2021-{month:02d}-01")
+    warm = (time.perf_counter() - started) / 12
+    print("functions self-check passed")
+    print(f"10-year fetch: {cold * 1000:.1f} ms, subsumed 1-year slice: {warm * 1000:.2f} ms")
+    set_price_source(None)
+
+
+if __name__ == "__main__":
+    _self_check()
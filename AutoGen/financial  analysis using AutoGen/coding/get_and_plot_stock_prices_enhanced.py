@@ -2,6 +2,7 @@ import os
 import pandas as pd
 import matplotlib.pyplot as plt
 from functions import get_stock_prices
+from indicators import sma
 
 def plot_and_save(stock_prices, directory, filename, title='', ylabel=''):
     plt.figure(figsize=(14, 7))
@@ -39,10 +40,12 @@ plot_and_save(stock_prices, directory, 'comparison_plot.png', 'Comparison of NVD
 for stock in stock_symbols:
     plot_and_save(stock_prices[[stock]], directory, f'{stock}_plot.png', f'{stock} Stock Price Movement', 'Price in USD')
 
-# Plot rolling mean for each stock
+# Plot rolling mean for each stock (computed for all stocks in one pass)
 window_size = 10  # days for moving average
+rolling_means = pd.DataFrame(sma(stock_prices.to_numpy(), window_size),
+                             index=stock_prices.index, columns=stock_prices.columns)
 for stock in stock_symbols:
-    rolling_mean = stock_prices[[stock]].rolling(window=window_size).mean()
+    rolling_mean = rolling_means[[stock]]
     plot_and_save(rolling_mean, directory, f'{stock}_rolling_mean.png', f'{stock} {window_size}-Day Moving Average', 'Price in USD')
 
 print(f"All enhanced stock price plots saved in {directory}")
\ No newline at end of file
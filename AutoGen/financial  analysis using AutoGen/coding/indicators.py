@@ -0,0 +1,386 @@
+"""
+Vectorized multi-symbol indicator engine.
+
+All indicators work on a 2-D float array of shape (T bars, N symbols), e.g. the
+`.to_numpy()` of a wide Close-price frame from BatchFetcher.fetch_wide(). Every
+symbol and every window is handled in one NumPy pass instead of a pandas
+`.rolling()` call per symbol per window:
+
+- rolling_means()       SMA for M windows at once from a single cumulative sum, O(T*N) per window
+- ema()                 EMAs for K spans at once (recursive over time, vectorized over symbols)
+- returns()             simple daily returns
+- ytd_gain()            % gain since the first bar of each calendar year
+- rolling_volatility()  rolling std of returns from cumulative sums of r and r^2
+
+Inputs are never modified, and results can be written into preallocated `out` arrays.
+IncrementalIndicators keeps running state so a new bar costs O(N*M) instead of a
+full recomputation.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+def _as_2d(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+
+def _window_counts(valid: np.ndarray) -> np.ndarray:
+    counts = np.zeros((valid.shape[0] + 1, valid.shape[1]), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=counts[1:])
+    return counts
+
+
+# ============================================================================
+# BATCH INDICATORS
+# ============================================================================
+
+def rolling_means(values: np.ndarray, windows: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Simple moving averages for every window: shape (M, T, N)
+
+    A window that contains a NaN (or is not yet full) yields NaN, like pandas
+    `.rolling(window).mean()`.
+    """
+    values = _as_2d(values)
+    T, N = values.shape
+    if out is None:
+        out = np.empty((len(windows), T, N))
+
+    valid = ~np.isnan(values)
+    sums = np.zeros((T + 1, N))
+    np.cumsum(np.where(valid, values, 0.0), axis=0, out=sums[1:])
+    counts = _window_counts(valid) if not valid.all() else None
+
+    for m, window in enumerate(windows):
+        result = out[m]
+        result[:window - 1] = np.nan
+        if T < window:
+            continue
+        tail = result[window - 1:]
+        np.subtract(sums[window:], sums[:-window], out=tail)
+        tail /= window
+        if counts is not None:
+            tail[(counts[window:] - counts[:-window]) < window] = np.nan
+    return out
+
+
+def sma(values: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Simple moving average for one window: shape (T, N)"""
+    values = _as_2d(values)
+    target = None if out is None else out[np.newaxis]
+    return rolling_means(values, [window], target)[0]
+
+
+def ema(values: np.ndarray, spans: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Exponential moving averages, pandas `ewm(span, adjust=False)` style: shape (K, T, N)"""
+    values = _as_2d(values)
+    T, N = values.shape
+    if out is None:
+        out = np.empty((len(spans), T, N))
+    alpha = (2.0 / (np.asarray(spans, dtype=np.float64) + 1.0))[:, np.newaxis]
+
+    if T == 0:
+        return out
+    out[:, 0] = values[0]
+    for t in range(1, T):
+        previous, current = out[:, t - 1], values[t]
+        step = previous + alpha * (current - previous)
+        # Start from the first valid price, and carry the last value across gaps
+        step = np.where(np.isnan(previous), current, step)
+        out[:, t] = np.where(np.isnan(current), previous, step)
+    return out
+
+
+def returns(values: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Simple returns (p_t / p_{t-1} - 1), NaN on the first row: shape (T, N)"""
+    values = _as_2d(values)
+    if out is None:
+        out = np.empty(values.shape)
+    out[:1] = np.nan
+    np.divide(values[1:], values[:-1], out=out[1:])
+    out[1:] -= 1.0
+    return out
+
+
+def ytd_gain(values: np.ndarray, dates: Optional[np.ndarray] = None,
+             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Percent gain since the first bar of each calendar year (or of the series without dates)"""
+    values = _as_2d(values)
+    T, N = values.shape
+    if out is None:
+        out = np.empty((T, N))
+    if T == 0:
+        return out
+
+    if dates is None:
+        segment_starts = np.zeros(1, dtype=np.int64)
+        segment_of_row = np.zeros(T, dtype=np.int64)
+    else:
+        years = np.asarray(dates).astype("datetime64[Y]")
+        is_start = np.empty(T, dtype=bool)
+        is_start[0] = True
+        np.not_equal(years[1:], years[:-1], out=is_start[1:])
+        segment_starts = np.flatnonzero(is_start)
+        segment_of_row = np.cumsum(is_start) - 1
+
+    base = values[segment_starts][segment_of_row]
+    np.divide(values, base, out=out)
+    out -= 1.0
+    out *= 100.0
+    return out
+
+
+def rolling_volatility(daily_returns: np.ndarray, window: int, annualize: bool = False,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling sample std of returns from running sums of r and r^2: shape (T, N)"""
+    daily_returns = _as_2d(daily_returns)
+    T, N = daily_returns.shape
+    if out is None:
+        out = np.empty((T, N))
+    out[:window - 1] = np.nan
+    if T < window:
+        return out
+
+    valid = ~np.isnan(daily_returns)
+    clean = np.where(valid, daily_returns, 0.0)
+    sums = np.zeros((T + 1, N))
+    squares = np.zeros((T + 1, N))
+    np.cumsum(clean, axis=0, out=sums[1:])
+    np.cumsum(clean * clean, axis=0, out=squares[1:])
+
+    window_sum = sums[window:] - sums[:-window]
+    window_sq = squares[window:] - squares[:-window]
+    tail = out[window - 1:]
+    np.subtract(window_sq, window_sum * window_sum / window, out=tail)
+    tail /= window - 1
+    np.maximum(tail, 0.0, out=tail)  # cancellation can leave tiny negatives
+    np.sqrt(tail, out=tail)
+    if annualize:
+        tail *= np.sqrt(252.0)
+    if not valid.all():
+        counts = _window_counts(valid)
+        tail[(counts[window:] - counts[:-window]) < window] = np.nan
+    return out
+
+
+@dataclass
+class IndicatorSet:
+    sma: np.ndarray          # (M, T, N), one slice per window in sma_windows
+    ema: np.ndarray          # (K, T, N), one slice per span in ema_spans
+    returns: np.ndarray      # (T, N)
+    ytd_gain: np.ndarray     # (T, N), percent
+    volatility: np.ndarray   # (T, N), rolling std of returns
+    sma_windows: tuple
+    ema_spans: tuple
+
+
+def compute_indicators(prices: np.ndarray, sma_windows: Sequence[int] = (15, 30, 50),
+                       ema_spans: Sequence[int] = (12, 26), volatility_window: int = 20,
+                       dates: Optional[np.ndarray] = None) -> IndicatorSet:
+    """Every indicator for every symbol in one pass over a (T, N) price array"""
+    prices = _as_2d(prices)
+    daily_returns = returns(prices)
+    return IndicatorSet(
+        sma=rolling_means(prices, sma_windows),
+        ema=ema(prices, ema_spans),
+        returns=daily_returns,
+        ytd_gain=ytd_gain(prices, dates),
+        volatility=rolling_volatility(daily_returns, volatility_window),
+        sma_windows=tuple(sma_windows),
+        ema_spans=tuple(ema_spans),
+    )
+
+
+# ============================================================================
+# INCREMENTAL UPDATES
+# ============================================================================
+
+class IncrementalIndicators:
+    """Running indicator state; each new bar updates every symbol and window in O(N*M)
+
+    Bars must be complete (no NaN). The arrays returned by update() are reused and
+    overwritten by the next call; copy them if you need to keep a snapshot.
+    """
+
+    RESYNC_EVERY = 10_000  # recompute running sums exactly to stop float drift
+
+    def __init__(self, n_symbols: int, sma_windows: Sequence[int] = (15, 30, 50),
+                 ema_spans: Sequence[int] = (12, 26), volatility_window: int = 20):
+        self.sma_windows = np.asarray(sma_windows, dtype=np.int64)
+        self.ema_alpha = (2.0 / (np.asarray(ema_spans, dtype=np.float64) + 1.0))[:, np.newaxis]
+        self.volatility_window = volatility_window
+        self.n_symbols = n_symbols
+        self.bars_seen = 0
+
+        depth = int(max(self.sma_windows.max(initial=1), 1))
+        self._prices = np.zeros((depth, n_symbols))        # ring buffer of recent closes
+        self._price_sums = np.zeros((len(self.sma_windows), n_symbols))
+        self._returns = np.zeros((volatility_window, n_symbols))  # ring buffer of recent returns
+        self._return_sum = np.zeros(n_symbols)
+        self._return_sq_sum = np.zeros(n_symbols)
+        self._last = np.full(n_symbols, np.nan)
+        self._year_base = np.full(n_symbols, np.nan)
+        self._year = None
+
+        self.sma = np.full((len(self.sma_windows), n_symbols), np.nan)
+        self.ema = np.full((len(ema_spans), n_symbols), np.nan)
+        self.daily_return = np.full(n_symbols, np.nan)
+        self.ytd_gain = np.full(n_symbols, np.nan)
+        self.volatility = np.full(n_symbols, np.nan)
+
+    @classmethod
+    def from_history(cls, prices: np.ndarray, dates: Optional[np.ndarray] = None, **kwargs) -> "IncrementalIndicators":
+        """Seed the running state by replaying a (T, N) history"""
+        prices = _as_2d(prices)
+        state = cls(prices.shape[1], **kwargs)
+        for t in range(prices.shape[0]):
+            state.update(prices[t], None if dates is None else dates[t])
+        return state
+
+    def update(self, bar: np.ndarray, timestamp: Optional[np.datetime64] = None) -> Dict[str, np.ndarray]:
+        """Fold in one bar of closes (shape (N,)) and return the latest indicator values"""
+        bar = np.asarray(bar, dtype=np.float64)
+        n = self.bars_seen
+        depth = self._prices.shape[0]
+
+        # SMA: add the new close, drop the one that just left each window
+        slot = n % depth
+        for m, window in enumerate(self.sma_windows):
+            if n >= window:
+                self._price_sums[m] -= self._prices[(n - window) % depth]
+        self._prices[slot] = bar
+        self._price_sums += bar
+        full = self.sma_windows <= n + 1
+        np.divide(self._price_sums, self.sma_windows[:, np.newaxis], out=self.sma)
+        self.sma[~full] = np.nan
+
+        # EMA
+        if n == 0:
+            self.ema[:] = bar
+        else:
+            self.ema += self.ema_alpha * (bar - self.ema)
+
+        # Returns and volatility over the last `volatility_window` returns
+        if n > 0:
+            np.divide(bar, self._last, out=self.daily_return)
+            self.daily_return -= 1.0
+            k = n - 1  # index of this return
+            w = self.volatility_window
+            if k >= w:
+                dropped = self._returns[k % w]
+                self._return_sum -= dropped
+                self._return_sq_sum -= dropped * dropped
+            self._returns[k % w] = self.daily_return
+            self._return_sum += self.daily_return
+            self._return_sq_sum += self.daily_return * self.daily_return
+            if k + 1 >= w:
+                variance = (self._return_sq_sum - self._return_sum * self._return_sum / w) / (w - 1)
+                np.sqrt(np.maximum(variance, 0.0), out=self.volatility)
+        self._last[:] = bar
+
+        # YTD gain resets on the first bar of a new calendar year
+        year = None if timestamp is None else np.datetime64(timestamp, "Y")
+        if n == 0 or (year is not None and year != self._year):
+            self._year_base[:] = bar
+        self._year = year
+        np.divide(bar, self._year_base, out=self.ytd_gain)
+        self.ytd_gain -= 1.0
+        self.ytd_gain *= 100.0
+
+        self.bars_seen += 1
+        if self.bars_seen % self.RESYNC_EVERY == 0:
+            self._resync()
+
+        return {
+            "sma": self.sma,
+            "ema": self.ema,
+            "return": self.daily_return,
+            "ytd_gain": self.ytd_gain,
+            "volatility": self.volatility,
+        }
+
+    def _resync(self):
+        """Rebuild running sums from the ring buffers"""
+        n, depth = self.bars_seen, self._prices.shape[0]
+        for m, window in enumerate(self.sma_windows):
+            rows = [(n - 1 - i) % depth for i in range(min(window, n))]
+            self._price_sums[m] = self._prices[rows].sum(axis=0)
+        count = min(n - 1, self.volatility_window)
+        if count > 0:
+            recent = self._returns if count == self.volatility_window else self._returns[:count]
+            self._return_sum = recent.sum(axis=0)
+            self._return_sq_sum = (recent * recent).sum(axis=0)
+
+
+# Example usage:
+# wide = BatchFetcher().fetch_wide(["NVDA", "TSLA"], "2025-01-01", "2025-02-17")
+# ind = compute_indicators(wide.to_numpy(), sma_windows=(30, 50), dates=wide.index.values)
+# ma_30 = pd.DataFrame(ind.sma[0], index=wide.index, columns=wide.columns)
+
+
+def benchmark(n_symbols: int = 1000, years: int = 10, repeat: int = 3):
+    """Vectorized engine vs. per-symbol pandas rolling on N symbols x 10 years"""
+    import time
+
+    import pandas as pd
+
+    T = 252 * years
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(T, n_symbols)), axis=0))
+    dates = np.busday_offset("2015-01-01", np.arange(T), roll="forward")
+    windows, spans = (10, 15, 20, 30, 50, 100, 200), (12, 26)
+    wide = pd.DataFrame(prices, index=pd.DatetimeIndex(dates))
+
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def per_symbol_pandas():
+        for column in wide.columns:
+            close = wide[column]
+            for window in windows:
+                close.rolling(window=window).mean()
+            for span in spans:
+                close.ewm(span=span, adjust=False).mean()
+            daily = close.pct_change()
+            daily.rolling(20).std()
+
+    def wide_pandas():
+        for window in windows:
+            wide.rolling(window=window).mean()
+        for span in spans:
+            wide.ewm(span=span, adjust=False).mean()
+        wide.pct_change().rolling(20).std()
+
+    engine = best(lambda: compute_indicators(prices, windows, spans, 20, dates))
+    wide_time = best(wide_pandas)
+    per_symbol = best(per_symbol_pandas) if n_symbols <= 1000 else float("nan")
+
+    print(f"=== INDICATORS: {n_symbols} symbols x {years} years ({T} bars), "
+          f"{len(windows)} SMA windows, {len(spans)} EMA spans, volatility ===")
+    print(f"pandas, per symbol:       {per_symbol * 1000:9.1f} ms")
+    print(f"pandas, wide frame:       {wide_time * 1000:9.1f} ms")
+    print(f"vectorized engine:        {engine * 1000:9.1f} ms")
+
+    state = IncrementalIndicators.from_history(prices[:-100], dates[:-100], sma_windows=windows,
+                                               ema_spans=spans, volatility_window=20)
+    started = time.perf_counter()
+    for t in range(T - 100, T):
+        state.update(prices[t], dates[t])
+    per_bar = (time.perf_counter() - started) / 100
+    print(f"incremental update:       {per_bar * 1e6:9.1f} µs per bar (all {n_symbols} symbols)")
+
+    full = compute_indicators(prices, windows, spans, 20, dates)
+    assert np.allclose(state.sma, full.sma[:, -1]) and np.allclose(state.ema, full.ema[:, -1])
+    assert np.allclose(state.volatility, full.volatility[-1]) and np.allclose(state.ytd_gain, full.ytd_gain[-1])
+
+
+if __name__ == "__main__":
+    benchmark()
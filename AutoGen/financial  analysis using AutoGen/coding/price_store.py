@@ -0,0 +1,281 @@
+"""
+Local OHLCV price store for the stock analysis scripts.
+
+Each symbol is kept as two memory-mapped NumPy files plus a small JSON manifest that
+records which date ranges have already been fetched:
+
+    <root>/NVDA.manifest.json   {"ranges": [["2025-01-01", "2025-02-17"]], "bars": 31}
+    <root>/NVDA.dates.npy       int64 nanoseconds since epoch, sorted
+    <root>/NVDA.ohlcv.npy       float64 (n_bars, 5): Open, High, Low, Close, Volume
+
+Manifests are per symbol so updating one symbol never rewrites the others.
+
+A read only asks the data source for the parts of the requested range that are not
+covered yet. It returns a writable copy by default; `copy=False` returns a read-only
+DataFrame backed directly by the memory-mapped arrays.
+The data source is pluggable, so the store can run offline with SyntheticSource.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Dict, List, Optional, Protocol, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_store")
+)
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+DateRange = Tuple[date, date]  # half-open: [start, end)
+
+
+def to_date(value: DateLike) -> date:
+    return pd.Timestamp(value).date()
+
+
+class DataSource(Protocol):
+    def fetch(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        """Daily bars in [start, end) with COLUMNS, indexed by a naive DatetimeIndex"""
+        ...
+
+
+class YFinanceSource:
+    """Yahoo Finance through yfinance (the scripts' original data source)"""
+
+    def fetch(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        import yfinance as yf
+
+        hist = yf.Ticker(symbol).history(start=start.isoformat(), end=end.isoformat())
+        if hist.empty:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([]))
+        hist.index = hist.index.tz_localize(None).normalize()
+        return hist[COLUMNS]
+
+
+class SyntheticSource:
+    """Deterministic random-walk-like bars on business days, for tests and benchmarks
+
+    Prices are a pure function of (symbol, date), so fetching a range in pieces gives
+    exactly the same bars as fetching it in one go.
+    """
+
+    def __init__(self, base_price: float = 100.0, latency: float = 0.0):
+        self.base_price = base_price
+        self.latency = latency  # seconds per fetch, to model a remote API
+        self.fetch_calls = 0
+
+    def fetch(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        self.fetch_calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        calendar = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D"))
+        business_days = calendar[np.is_busday(calendar)]
+        index = pd.DatetimeIndex(business_days.astype("datetime64[ns]"), name="Date")
+        seed = zlib.crc32(symbol.encode())
+        days = business_days.astype(np.int64).astype(np.uint64)
+
+        def noise(salt: int) -> np.ndarray:
+            mixed = (days * np.uint64(2654435761) + np.uint64(seed ^ salt)) % np.uint64(2 ** 32)
+            return mixed.astype(np.float64) / 2 ** 32
+
+        phase = (seed % 360) * np.pi / 180
+        trend = np.sin(days.astype(np.float64) / 40 + phase) * 0.2
+        close = self.base_price * (1 + (seed % 50) / 10) * np.exp(trend + (noise(1) - 0.5) * 0.04)
+        open_ = close * (1 + (noise(2) - 0.5) * 0.02)
+        high = np.maximum(open_, close) * (1 + noise(3) * 0.01)
+        low = np.minimum(open_, close) * (1 - noise(4) * 0.01)
+        volume = np.floor(1e6 + noise(5) * 9e6)
+        return pd.DataFrame(np.column_stack([open_, high, low, close, volume]), index=index, columns=COLUMNS)
+
+
+class PriceStore:
+    """Per-symbol memory-mapped OHLCV files with a manifest of covered date ranges"""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, source: Optional[DataSource] = None):
+        self.root = root
+        self.source = source or YFinanceSource()
+        os.makedirs(root, exist_ok=True)
+        self._manifests: Dict[str, List[DateRange]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.RLock()  # _merge holds it while calling _load
+
+    # ------------------------------------------------------------------
+    # Coverage
+    # ------------------------------------------------------------------
+
+    def covered_ranges(self, symbol: str) -> List[DateRange]:
+        ranges = self._manifests.get(symbol)
+        if ranges is None:
+            ranges = []
+            path = self._manifest_path(symbol)
+            if os.path.exists(path):
+                with open(path) as f:
+                    ranges = [(to_date(s), to_date(e)) for s, e in json.load(f)["ranges"]]
+            self._manifests[symbol] = ranges
+        return list(ranges)
+
+    def missing_ranges(self, symbol: str, start: DateLike, end: DateLike) -> List[DateRange]:
+        """Parts of [start, end) that have not been fetched yet"""
+        start, end = to_date(start), to_date(end)
+        missing, cursor = [], start
+        for covered_start, covered_end in self.covered_ranges(symbol):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+
+    def read(self, symbol: str, start: DateLike, end: DateLike, copy: bool = True) -> pd.DataFrame:
+        """Bars in [start, end), fetching only the uncovered ranges from the source
+
+        With copy=False the frame is a read-only view of the memory-mapped files, so
+        in-place writes to it raise; use it for read-only analysis of large ranges.
+        Such a frame keeps the files mapped: on Windows, a later read that has to fetch
+        new bars for the symbol fails while it is alive, and on POSIX it keeps seeing
+        the bars as they were when it was read.
+        """
+        start, end = to_date(start), to_date(end)
+        missing = self.missing_ranges(symbol, start, end)
+        if missing:
+            frames = [self.source.fetch(symbol, s, e) for s, e in missing]
+            self._merge(symbol, frames, missing)
+
+        dates, values = self._load(symbol)
+        lo, hi = np.searchsorted(dates, [pd.Timestamp(start).value, pd.Timestamp(end).value])
+        # Slices of the memory-mapped arrays: only copied when a writable frame is wanted
+        index = pd.DatetimeIndex(dates[lo:hi].view("datetime64[ns]"), name="Date")
+        return pd.DataFrame(values[lo:hi], index=index, columns=COLUMNS, copy=copy)
+
+    def _manifest_path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.manifest.json")
+
+    def _paths(self, symbol: str) -> Tuple[str, str]:
+        return (os.path.join(self.root, f"{symbol}.dates.npy"),
+                os.path.join(self.root, f"{symbol}.ohlcv.npy"))
+
+    def _load(self, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            arrays = self._arrays.get(symbol)
+            if arrays is None:
+                dates_path, values_path = self._paths(symbol)
+                if os.path.exists(dates_path):
+                    arrays = (np.load(dates_path, mmap_mode="r"), np.load(values_path, mmap_mode="r"))
+                else:
+                    arrays = (np.empty(0, dtype=np.int64), np.empty((0, len(COLUMNS))))
+                self._arrays[symbol] = arrays
+            return arrays
+
+    def _merge(self, symbol: str, frames: List[pd.DataFrame], fetched: List[DateRange]):
+        """Merge newly fetched bars into the symbol's files and extend its coverage"""
+        # One lock across read-merge-write, so concurrent merges cannot drop each other's bars
+        with self._lock:
+            self._merge_locked(symbol, frames, fetched)
+
+    def _merge_locked(self, symbol: str, frames: List[pd.DataFrame], fetched: List[DateRange]):
+        old_dates, old_values = self._load(symbol)
+        new_dates = [frame.index.values.astype("datetime64[ns]").view(np.int64) for frame in frames]
+        new_values = [frame[COLUMNS].to_numpy(dtype=np.float64) for frame in frames]
+
+        dates = np.concatenate([old_dates, *new_dates])
+        values = np.concatenate([old_values, *new_values]) if len(dates) else old_values
+        # Keep the newest bar for duplicate dates (stable sort keeps fetch order)
+        order = np.argsort(dates, kind="stable")
+        dates, values = dates[order], values[order]
+        keep = np.append(dates[1:] != dates[:-1], True) if len(dates) else np.ones(0, dtype=bool)
+        dates, values = np.ascontiguousarray(dates[keep]), np.ascontiguousarray(values[keep])
+
+        # Drop the store's own memmaps of the files first: Windows can't replace a file that is
+        # still mapped, and on POSIX a kept map would go on reading the old file
+        del old_dates, old_values
+        self._arrays.pop(symbol, None)
+        for path, array in zip(self._paths(symbol), (dates, values)):
+            tmp_path = f"{path}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+
+        # Today's bar can still change, so coverage stops at today
+        today = date.today()
+        ranges = _merge_ranges(self.covered_ranges(symbol) + [(s, min(e, today)) for s, e in fetched if s < today])
+        manifest_path = self._manifest_path(symbol)
+        with open(f"{manifest_path}.tmp", "w") as f:
+            json.dump({"ranges": [[s.isoformat(), e.isoformat()] for s, e in ranges], "bars": len(dates)}, f)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        self._manifests[symbol] = ranges
+
+
+def _merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# Example usage:
+# store = PriceStore()                                    # Yahoo Finance, cached under ./price_store
+# nvda = store.read("NVDA", "2025-01-01", "2025-02-17")   # fetches once, later runs read from disk
+
+
+def benchmark_repeat_runs(n_symbols: int = 500, start: str = "2015-01-01", end: str = "2025-01-01",
+                          latency: float = 0.01):
+    """Cold vs. repeat-run latency for reading many symbols through the store"""
+    import tempfile
+
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    with tempfile.TemporaryDirectory() as root:
+        source = SyntheticSource(latency=latency)
+
+        started = time.perf_counter()
+        store = PriceStore(root, source)
+        for symbol in symbols:
+            store.read(symbol, start, end)
+        cold = time.perf_counter() - started
+
+        # A new store instance models a fresh run of the script
+        started = time.perf_counter()
+        store = PriceStore(root, source)
+        bars = sum(len(store.read(symbol, start, end, copy=False)) for symbol in symbols)
+        warm = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for symbol in symbols:
+            source.fetch(symbol, to_date(start), to_date(end))
+        direct = time.perf_counter() - started
+
+        extended = "2025-03-01"
+        started = time.perf_counter()
+        store = PriceStore(root, source)
+        calls_before = source.fetch_calls
+        for symbol in symbols:
+            store.read(symbol, start, extended)
+        incremental = time.perf_counter() - started
+
+        print(f"=== PRICE STORE: {n_symbols} symbols, {start} to {end} ({bars} bars, "
+              f"{latency * 1000:.0f} ms per source fetch) ===")
+        print(f"Direct source fetch (no store):  {direct:.3f} s")
+        print(f"Cold run (fetch + write):        {cold:.3f} s")
+        print(f"Repeat run (memory-mapped read): {warm:.3f} s")
+        print(f"Extended range run:              {incremental:.3f} s "
+              f"({source.fetch_calls - calls_before} fetches, only the missing tail)")
+
+
+if __name__ == "__main__":
+    benchmark_repeat_runs()
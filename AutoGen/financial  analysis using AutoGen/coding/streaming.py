@@ -0,0 +1,262 @@
+"""
+Streaming mode for the stock analysis pipeline.
+
+Instead of analysing a fixed date range once, StreamingPipeline consumes bars from an
+async source and keeps every indicator current as each bar arrives:
+
+- Indicators: IncrementalIndicators updates SMA/EMA/returns/volatility/YTD in O(1) per
+  bar per window (no recomputation over history)
+- Metrics: every update is handed to an `on_metrics` callback
+- Charts: refreshed at most once per `chart_interval` seconds, rendered off the event
+  loop through ChartRenderer, and skipped while the previous refresh is still running
+- Latency: per-bar processing time is recorded and summarised as percentiles
+
+ReplaySource stands in for a live feed by replaying a file of bars (optionally paced in
+real time). Each replay step is one timestamp with a close for every symbol, so one step
+carries N bars.
+
+    python streaming.py                          # 1M-bar replay benchmark
+    python streaming.py --replay bars.npz        # stream a replay file
+    python streaming.py --symbols NVDA TSLA      # build a replay file from the price store and stream it
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from indicators import IncrementalIndicators
+
+
+@dataclass
+class BarBatch:
+    timestamp: np.datetime64
+    closes: np.ndarray  # (N,) one close per symbol
+
+
+@dataclass
+class StreamUpdate:
+    timestamp: np.datetime64
+    symbols: List[str]
+    values: Dict[str, np.ndarray]  # arrays are reused by the next update; copy to keep
+
+
+@dataclass
+class LatencyReport:
+    steps: int
+    bars: int
+    elapsed: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    max_us: float
+    chart_refreshes: int
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.elapsed if self.elapsed else 0.0
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+def write_replay_file(path: str, symbols: Sequence[str], dates: np.ndarray, closes: np.ndarray):
+    """Save a (T, N) close matrix with its dates and symbols for ReplaySource"""
+    np.savez(path, symbols=np.asarray(symbols), dates=np.asarray(dates).astype("datetime64[ns]"),
+             closes=np.asarray(closes, dtype=np.float64))
+
+
+class ReplaySource:
+    """Async stand-in for a live feed: replays a file written by write_replay_file
+
+    speed=None replays as fast as possible (yielding to the event loop every
+    `yield_every` steps); otherwise bars are paced at `speed` times real time, using the
+    gaps between recorded timestamps.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None, yield_every: int = 256):
+        with np.load(path) as data:
+            self.symbols = [str(s) for s in data["symbols"]]
+            self.dates = data["dates"]
+            self.closes = data["closes"]
+        self.speed = speed
+        self.yield_every = yield_every
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    async def __aiter__(self) -> AsyncIterator[BarBatch]:
+        gaps = np.diff(self.dates).astype("timedelta64[ns]").astype(np.int64) / 1e9 if self.speed else None
+        for t in range(len(self.dates)):
+            if self.speed:
+                if t:
+                    await asyncio.sleep(gaps[t - 1] / self.speed)
+            elif t % self.yield_every == 0:
+                await asyncio.sleep(0)
+            yield BarBatch(self.dates[t], self.closes[t])
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class StreamingPipeline:
+    """Keeps indicators current for a stream of bars, with throttled chart refreshes"""
+
+    def __init__(self, symbols: Sequence[str], sma_windows: Sequence[int] = (15, 30, 50),
+                 ema_spans: Sequence[int] = (12, 26), volatility_window: int = 20,
+                 on_metrics: Optional[Callable[[StreamUpdate], None]] = None,
+                 renderer=None, chart_interval: float = 5.0, chart_window: int = 250,
+                 chart_file: str = "streaming_latest.png"):
+        self.symbols = list(symbols)
+        self.indicators = IncrementalIndicators(len(self.symbols), sma_windows, ema_spans, volatility_window)
+        self.on_metrics = on_metrics
+        self.renderer = renderer
+        self.chart_interval = chart_interval
+        self.chart_file = chart_file
+        self.chart_refreshes = 0
+
+        # Recent closes for the chart, kept as a ring buffer
+        self._recent_closes = np.full((chart_window, len(self.symbols)), np.nan)
+        self._recent_dates = np.zeros(chart_window, dtype="datetime64[ns]")
+        self._recent_count = 0
+        self._chart_task: Optional[asyncio.Future] = None
+        self._last_chart = float("-inf")
+
+    async def run(self, source: AsyncIterator[BarBatch], max_steps: Optional[int] = None,
+                  expected_steps: int = 1 << 16) -> LatencyReport:
+        latencies = np.empty(expected_steps, dtype=np.int64)
+        steps = 0
+        window = len(self._recent_dates)
+        started = time.perf_counter()
+
+        async for batch in source:
+            tick = time.perf_counter_ns()
+            values = self.indicators.update(batch.closes, batch.timestamp)
+            slot = self._recent_count % window
+            self._recent_closes[slot] = batch.closes
+            self._recent_dates[slot] = batch.timestamp
+            self._recent_count += 1
+            if self.on_metrics is not None:
+                self.on_metrics(StreamUpdate(batch.timestamp, self.symbols, values))
+            if self.renderer is not None:
+                self._maybe_refresh_chart()
+
+            if steps == len(latencies):
+                latencies = np.resize(latencies, 2 * len(latencies))
+            latencies[steps] = time.perf_counter_ns() - tick
+            steps += 1
+            if max_steps is not None and steps >= max_steps:
+                break
+
+        if self._chart_task is not None:
+            await self._chart_task
+        elapsed = time.perf_counter() - started
+        p50, p95, p99, worst = (np.percentile(latencies[:steps], [50, 95, 99, 100]) / 1000
+                                if steps else (0.0,) * 4)
+        return LatencyReport(steps, steps * len(self.symbols), elapsed, p50, p95, p99, worst, self.chart_refreshes)
+
+    def _maybe_refresh_chart(self):
+        now = time.monotonic()
+        if now - self._last_chart < self.chart_interval:
+            return
+        if self._chart_task is not None and not self._chart_task.done():
+            return  # previous refresh still rendering; drop this one
+        self._last_chart = now
+        job = self._chart_job()
+        loop = asyncio.get_running_loop()
+        self._chart_task = loop.run_in_executor(None, self.renderer.render, [job])
+        self.chart_refreshes += 1
+
+    def _chart_job(self):
+        from chart_render import ChartJob, Line
+
+        window = len(self._recent_dates)
+        count = min(self._recent_count, window)
+        order = (np.arange(self._recent_count - count, self._recent_count)) % window
+        dates = self._recent_dates[order]
+        lines = [Line(symbol, dates, self._recent_closes[order, i]) for i, symbol in enumerate(self.symbols)]
+        return ChartJob("price_lines", f"Live prices ({count} most recent bars)", self.chart_file, [lines])
+
+
+# ============================================================================
+# BENCHMARK AND CLI
+# ============================================================================
+
+def benchmark(total_bars: int = 1_000_000, n_symbols: int = 10):
+    """Replay one million bars (n_symbols per step) and report per-step latency"""
+    import tempfile
+
+    steps = total_bars // n_symbols
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (steps, n_symbols)), axis=0))
+    dates = np.datetime64("2000-01-03T09:30", "m") + np.arange(steps).astype("timedelta64[m]")
+    symbols = [f"SYM{i:02d}" for i in range(n_symbols)]
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "replay.npz")
+        write_replay_file(path, symbols, dates, closes)
+        source = ReplaySource(path)
+
+        latest = {}
+        pipeline = StreamingPipeline(symbols, on_metrics=lambda update: latest.update(update.values))
+        report = asyncio.run(pipeline.run(source, expected_steps=steps))
+
+        from chart_render import ChartRenderer
+        with ChartRenderer(root, workers=1) as renderer:
+            charted = StreamingPipeline(symbols, renderer=renderer, chart_interval=0.5)
+            charted_report = asyncio.run(charted.run(ReplaySource(path), expected_steps=steps))
+
+    print(f"=== STREAMING REPLAY: {report.bars:,} bars ({steps:,} steps x {n_symbols} symbols) ===")
+    print(f"Throughput:          {report.bars_per_second:12,.0f} bars/sec ({report.elapsed:.2f} s)")
+    print(f"Per-step latency:    p50 {report.p50_us:.1f} us, p95 {report.p95_us:.1f} us, "
+          f"p99 {report.p99_us:.1f} us, max {report.max_us:.0f} us")
+    print(f"With charts (0.5 s): {charted_report.bars_per_second:12,.0f} bars/sec, "
+          f"{charted_report.chart_refreshes} refreshes, p99 {charted_report.p99_us:.1f} us")
+    print(f"Final SMA_15:        {np.round(latest['sma'][0][:3], 2)} ...")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream bars through the incremental indicator pipeline")
+    parser.add_argument("--replay", help="replay file written by write_replay_file")
+    parser.add_argument("--symbols", nargs="+", help="build a replay file from the price store for these symbols")
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end", default="2025-02-17")
+    parser.add_argument("--speed", type=float, help="pace the replay at this multiple of real time")
+    parser.add_argument("--chart-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if not args.replay and not args.symbols:
+        benchmark()
+        return
+
+    path = args.replay
+    if args.symbols:
+        from batch_fetch import BatchFetcher
+
+        wide = BatchFetcher().fetch_wide(args.symbols, args.start, args.end).dropna()
+        path = path or "streaming_replay.npz"
+        write_replay_file(path, list(wide.columns), wide.index.values, wide.to_numpy())
+
+    from chart_render import ChartRenderer
+
+    source = ReplaySource(path, speed=args.speed)
+
+    def print_metrics(update: StreamUpdate):
+        gains = ", ".join(f"{s} {g:+.2f}%" for s, g in zip(update.symbols, update.values["ytd_gain"]))
+        print(f"{np.datetime_as_string(update.timestamp, unit='D')}  YTD: {gains}")
+
+    with ChartRenderer(workers=1) as renderer:
+        pipeline = StreamingPipeline(source.symbols, on_metrics=print_metrics, renderer=renderer,
+                                     chart_interval=args.chart_interval)
+        report = asyncio.run(pipeline.run(source))
+    print(f"{report.steps} steps, p99 latency {report.p99_us:.1f} us, {report.chart_refreshes} chart refreshes")
+
+
+if __name__ == "__main__":
+    main()
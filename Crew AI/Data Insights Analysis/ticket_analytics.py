@@ -0,0 +1,439 @@
+"""
+Ticket Analytics
+Deterministic tables and charts for the Data Insights Analysis crew's reporting tasks.
+
+The table_generation and chart_generation tasks used to ask the agents to count issues,
+average resolution times and track satisfaction themselves, and the LLM's arithmetic
+did not add up (the sample report counts 54 tickets in a 50-ticket file).
+TicketAnalytics computes these numbers and hands them to the crew as task inputs:
+
+- issue_type x priority counts, per-agent mean / p50 / p90 resolution time, satisfaction
+  and resolution rate, monthly satisfaction and resolution trends
+- Running totals (bincounts, per-agent resolution-time histograms) updated with
+  vectorized numpy operations, so appended tickets cost O(new rows) rather than a
+  regroup of the whole file; percentiles stay exact for whole-minute times
+- refresh() reads only the bytes appended to the CSV since the last call
+- render_charts() draws the notebook's PNGs from the tables in parallel processes
+
+    analytics = TicketAnalytics()
+    analytics.refresh("./support_tickets_data.csv")
+    charts = render_charts(analytics.tables(), ".")
+    support_report_crew.kickoff(inputs=report_inputs(analytics, charts))
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PRIORITY_ORDER = ["Low", "Medium", "High", "Critical"]
+RATINGS = 5
+PERCENTILES = (50, 90)
+COLUMNS = ["ticket_id", "customer_id", "issue_type", "issue_description", "priority", "date_submitted",
+           "response_time_minutes", "resolution_time_minutes", "satisfaction_rating", "customer_comments",
+           "agent_id", "resolved"]
+
+
+def _grow(array: np.ndarray, shape: Sequence[int]) -> np.ndarray:
+    """Zero-pad array up to shape (never shrinks)"""
+    pad = [(0, max(0, want - have)) for have, want in zip(array.shape, shape)]
+    return np.pad(array, pad) if any(after for _, after in pad) else array
+
+
+class _Vocabulary:
+    """Stable value -> index mapping that grows as unseen values arrive"""
+
+    def __init__(self, values: Sequence = ()):
+        self.values: List = list(values)
+        self._index = pd.Index(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def codes(self, column) -> np.ndarray:
+        inverse, uniques = pd.factorize(pd.Series(column), sort=False)
+        positions = self._index.get_indexer(uniques)
+        if (positions < 0).any():
+            self.values.extend(pd.Index(uniques)[positions < 0].tolist())
+            self._index = pd.Index(self.values)
+            positions = self._index.get_indexer(uniques)
+        return positions[inverse]
+
+
+def _bincount2d(rows: np.ndarray, cols: np.ndarray, shape, weights=None) -> np.ndarray:
+    flat = np.bincount(rows * shape[1] + cols, weights=weights, minlength=shape[0] * shape[1])
+    return flat.reshape(shape)
+
+
+def _percentile_from_histogram(histogram: np.ndarray, q: float) -> float:
+    """np.percentile(values, q) (linear interpolation) for values given as a histogram over 0..n"""
+    total = histogram.sum()
+    if total == 0:
+        return float("nan")
+    cumulative = np.cumsum(histogram)
+    position = (total - 1) * q / 100
+    lower, upper = np.searchsorted(cumulative, [np.floor(position), np.ceil(position)], side="right")
+    return float(lower + (position - np.floor(position)) * (upper - lower))
+
+
+class TicketAnalytics:
+    """Running aggregates over the support tickets"""
+
+    def __init__(self):
+        self.issue_types = _Vocabulary()
+        self.priorities = _Vocabulary(PRIORITY_ORDER)
+        self.agents = _Vocabulary()
+        self.months = _Vocabulary()  # year * 12 + month - 1
+        self.tickets = 0
+        self.issue_priority = np.zeros((0, len(PRIORITY_ORDER)), np.int64)
+        self.agent_resolution = np.zeros((0, 0), np.int64)  # agent x minutes histogram
+        self.agent_rating_sum = np.zeros(0, np.int64)
+        self.agent_resolved = np.zeros(0, np.int64)
+        self.month_ratings = np.zeros((0, RATINGS), np.int64)
+        self.month_resolution_sum = np.zeros(0, np.int64)
+        self.month_resolved = np.zeros(0, np.int64)
+        self._path: Optional[str] = None
+        self._offset = 0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def append(self, tickets: pd.DataFrame) -> "TicketAnalytics":
+        """Fold a batch of tickets into the running totals"""
+        if tickets.empty:
+            return self
+        issue = self.issue_types.codes(tickets["issue_type"])
+        priority = self.priorities.codes(tickets["priority"])
+        agent = self.agents.codes(tickets["agent_id"])
+        dates = pd.to_datetime(tickets["date_submitted"])
+        month = self.months.codes(dates.dt.year.to_numpy() * 12 + dates.dt.month.to_numpy() - 1)
+        resolution = tickets["resolution_time_minutes"].to_numpy(np.int64)
+        rating = tickets["satisfaction_rating"].to_numpy(np.int64)
+        resolved = tickets["resolved"].to_numpy(bool)
+        if resolution.min() < 0 or not ((1 <= rating) & (rating <= RATINGS)).all():
+            raise ValueError("resolution_time_minutes must be >= 0 and satisfaction_rating in 1..5")
+
+        shape = (len(self.issue_types), len(self.priorities))
+        self.issue_priority = _grow(self.issue_priority, shape) + _bincount2d(issue, priority, shape)
+
+        agents = len(self.agents)
+        shape = (agents, max(self.agent_resolution.shape[1], int(resolution.max()) + 1))
+        self.agent_resolution = _grow(self.agent_resolution, shape) + _bincount2d(agent, resolution, shape)
+        self.agent_rating_sum = _grow(self.agent_rating_sum, (agents,)) + np.bincount(agent, rating, agents).astype(np.int64)
+        self.agent_resolved = _grow(self.agent_resolved, (agents,)) + np.bincount(agent, resolved, agents).astype(np.int64)
+
+        months = len(self.months)
+        self.month_ratings = _grow(self.month_ratings, (months, RATINGS)) + _bincount2d(month, rating - 1, (months, RATINGS))
+        self.month_resolution_sum = (_grow(self.month_resolution_sum, (months,))
+                                     + np.bincount(month, resolution, months).astype(np.int64))
+        self.month_resolved = _grow(self.month_resolved, (months,)) + np.bincount(month, resolved, months).astype(np.int64)
+        self.tickets += len(tickets)
+        return self
+
+    def refresh(self, path: str) -> int:
+        """Fold in tickets appended to the CSV since the last refresh; returns how many were added.
+
+        A different path, or a file that shrank, starts again from scratch.
+        """
+        size = os.path.getsize(path)
+        if path != self._path or size < self._offset:
+            self.__init__()
+            self._path = path
+        if size == self._offset:
+            return 0
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # Only whole lines: a writer may be in the middle of appending the last one
+        end = data.rfind(b"\n") + 1 if not data.endswith(b"\n") else len(data)
+        if end == 0:
+            return 0
+        header = "infer" if self._offset == 0 else None
+        batch = pd.read_csv(io.BytesIO(data[:end]), header=header, names=None if header else COLUMNS)
+        self._offset += end
+        self.append(batch)
+        return len(batch)
+
+    # ------------------------------------------------------------------
+    # Tables
+    # ------------------------------------------------------------------
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        issue_priority = pd.DataFrame(self.issue_priority, index=pd.Index(self.issue_types.values, name="issue_type"),
+                                      columns=self.priorities.values)
+        issue_priority["total"] = issue_priority.sum(axis=1)
+        issue_priority = issue_priority.sort_index().reset_index()
+
+        priority_levels = pd.DataFrame({"priority": self.priorities.values,
+                                        "tickets": self.issue_priority.sum(axis=0)})
+
+        counts = self.agent_resolution.sum(axis=1)
+        minutes = np.arange(self.agent_resolution.shape[1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            agent_performance = pd.DataFrame({
+                "agent_id": self.agents.values,
+                "tickets": counts,
+                "resolved": self.agent_resolved,
+                "resolved_rate": self.agent_resolved / counts,
+                "mean_resolution_time_minutes": self.agent_resolution @ minutes / counts,
+                **{f"p{q}_resolution_time_minutes": [_percentile_from_histogram(h, q) for h in self.agent_resolution]
+                   for q in PERCENTILES},
+                "mean_satisfaction_rating": self.agent_rating_sum / counts,
+            }).sort_values("agent_id", ignore_index=True)
+
+            order = np.argsort(self.months.values, kind="stable")
+            keys = np.asarray(self.months.values, dtype=np.int64)[order]
+            ratings = self.month_ratings[order]
+            responses = ratings.sum(axis=1)
+            month = [f"{k // 12}-{k % 12 + 1:02d}" for k in keys]
+            satisfaction_trend = pd.DataFrame({
+                "month": month,
+                "responses": responses,
+                "mean_satisfaction_rating": ratings @ np.arange(1, RATINGS + 1) / responses,
+                "low_rating_share": ratings[:, :2].sum(axis=1) / responses,
+            })
+            resolution_trend = pd.DataFrame({
+                "month": month,
+                "tickets": responses,
+                "mean_resolution_time_minutes": self.month_resolution_sum[order] / responses,
+                "resolved_rate": self.month_resolved[order] / responses,
+            })
+        return {"issue_priority": issue_priority, "priority_levels": priority_levels,
+                "agent_performance": agent_performance, "satisfaction_trend": satisfaction_trend,
+                "resolution_trend": resolution_trend}
+
+
+def reference_tables(tickets: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """The same agent and monthly tables from a plain pandas group-by over every ticket"""
+    dates = pd.to_datetime(tickets["date_submitted"])
+    by_agent = tickets.groupby("agent_id")["resolution_time_minutes"]
+    agent = pd.DataFrame({
+        "tickets": by_agent.size(),
+        "mean_resolution_time_minutes": by_agent.mean(),
+        **{f"p{q}_resolution_time_minutes": by_agent.quantile(q / 100) for q in PERCENTILES},
+        "mean_satisfaction_rating": tickets.groupby("agent_id")["satisfaction_rating"].mean(),
+    }).reset_index()
+    trend = tickets.groupby(dates.dt.strftime("%Y-%m"))["satisfaction_rating"].mean().reset_index()
+    return {"agent_performance": agent, "satisfaction_trend": trend}
+
+
+def to_markdown(frame: pd.DataFrame) -> str:
+    """A markdown table with floats to two decimals (no tabulate dependency)"""
+    def cell(value):
+        return f"{value:.2f}" if isinstance(value, (float, np.floating)) else str(value)
+
+    lines = ["| " + " | ".join(map(str, frame.columns)) + " |", "|" + "---|" * len(frame.columns)]
+    lines += ["| " + " | ".join(cell(v) for v in row) + " |" for row in frame.itertuples(index=False)]
+    return "\n".join(lines)
+
+
+TABLE_TITLES = {
+    "issue_priority": "Issue classification (tickets by issue type and priority)",
+    "priority_levels": "Priority levels",
+    "agent_performance": "Agent performance (resolution time in minutes)",
+    "satisfaction_trend": "Customer satisfaction by month",
+    "resolution_trend": "Resolution time by month",
+}
+
+
+def report_inputs(analytics: TicketAnalytics, charts: Sequence[str] = ()) -> Dict[str, str]:
+    """kickoff/test/train inputs for the {ticket_tables} and {chart_files} placeholders in tasks.yaml"""
+    tables = analytics.tables()
+    text = [f"Computed from {analytics.tickets} tickets."]
+    text += [f"### {TABLE_TITLES[name]}\n{to_markdown(table)}" for name, table in tables.items()]
+    files = "\n".join(f"- {os.path.basename(path)}" for path in charts) or "- (no charts rendered)"
+    return {"ticket_tables": "\n\n".join(text), "chart_files": files}
+
+
+# ============================================================================
+# CHARTS
+# ============================================================================
+
+def _figure():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
+    return plt, fig, ax
+
+
+def _save(plt, fig, ax, title: str, path: str):
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def _issue_distribution(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["issue_priority"].set_index("issue_type")
+    table[PRIORITY_ORDER].plot.bar(stacked=True, ax=ax, rot=30)
+    ax.set_ylabel("Tickets")
+    _save(plt, fig, ax, "Issue Distribution by Priority", path)
+
+
+def _priority_levels(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["priority_levels"]
+    ax.bar(table["priority"], table["tickets"], color=["#6baed6", "#fdae6b", "#fd8d3c", "#d62728"])
+    ax.set_ylabel("Tickets")
+    _save(plt, fig, ax, "Tickets by Priority Level", path)
+
+
+def _resolution_times(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["resolution_trend"]
+    ax.plot(table["month"], table["mean_resolution_time_minutes"], marker="o")
+    ax.set_ylabel("Mean resolution time (minutes)")
+    _save(plt, fig, ax, "Average Resolution Time by Month", path)
+
+
+def _customer_satisfaction(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["satisfaction_trend"]
+    ax.bar(table["month"], table["mean_satisfaction_rating"], color="#74c476")
+    ax.set_ylim(0, RATINGS)
+    ax.set_ylabel("Mean satisfaction rating")
+    _save(plt, fig, ax, "Customer Satisfaction by Month", path)
+
+
+def _agent_performance(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["agent_performance"]
+    x = np.arange(len(table))
+    ax.bar(x - 0.2, table["mean_resolution_time_minutes"], 0.4, label="Mean resolution time (min)")
+    ax.set_ylabel("Minutes")
+    ax.set_xticks(x, table["agent_id"])
+    twin = ax.twinx()
+    twin.bar(x + 0.2, table["mean_satisfaction_rating"], 0.4, color="#fd8d3c", label="Mean satisfaction")
+    twin.set_ylim(0, RATINGS)
+    twin.set_ylabel("Rating")
+    ax.margins(y=0.15)
+    handles, labels = ax.get_legend_handles_labels()
+    twin_handles, twin_labels = twin.get_legend_handles_labels()
+    ax.legend(handles + twin_handles, labels + twin_labels, loc="upper left")
+    _save(plt, fig, ax, "Agent Performance", path)
+
+
+def _agent_performance_resolution(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["agent_performance"]
+    x = np.arange(len(table))
+    for offset, column, label in ((-0.27, "mean_resolution_time_minutes", "Mean"),
+                                  (0.0, "p50_resolution_time_minutes", "Median"),
+                                  (0.27, "p90_resolution_time_minutes", "90th percentile")):
+        ax.bar(x + offset, table[column], 0.27, label=label)
+    ax.set_xticks(x, table["agent_id"])
+    ax.set_ylabel("Resolution time (minutes)")
+    ax.legend()
+    _save(plt, fig, ax, "Agent Resolution Times", path)
+
+
+def _agent_performance_satisfaction(tables, path):
+    plt, fig, ax = _figure()
+    table = tables["agent_performance"]
+    ax.bar(table["agent_id"], table["mean_satisfaction_rating"], color="#9e9ac8")
+    ax.set_ylim(0, RATINGS)
+    ax.set_ylabel("Mean satisfaction rating")
+    _save(plt, fig, ax, "Agent Customer Satisfaction", path)
+
+
+CHARTS: Dict[str, Callable] = {
+    "issue_distribution.png": _issue_distribution,
+    "priority_levels.png": _priority_levels,
+    "resolution_times.png": _resolution_times,
+    "customer_satisfaction.png": _customer_satisfaction,
+    "agent_performance.png": _agent_performance,
+    "agent_performance_resolution.png": _agent_performance_resolution,
+    "agent_performance_satisfaction.png": _agent_performance_satisfaction,
+}
+
+
+def _render(name: str, tables: Dict[str, pd.DataFrame], path: str) -> str:
+    CHARTS[name](tables, path)
+    return path
+
+
+def render_charts(tables: Dict[str, pd.DataFrame], directory: str = ".", workers: Optional[int] = None,
+                  names: Optional[Sequence[str]] = None) -> List[str]:
+    """Render the chart PNGs from the tables, one process per chart (serially with workers=1)"""
+    names = list(names or CHARTS)
+    paths = [os.path.join(directory, name) for name in names]
+    workers = min(len(names), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [_render(name, tables, path) for name, path in zip(names, paths)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render, names, [tables] * len(names), paths))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(tickets: int = 1_000_000, batches: int = 5, batch_size: int = 1_000):
+    """Incremental appends vs regrouping everything, exactness against pandas, chart rendering"""
+    import tempfile
+
+    from ticket_query_tool import synthetic_tickets
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix="ticket_analytics_")
+
+    sample = TicketAnalytics()
+    sample.refresh(os.path.join(here, "support_tickets_data.csv"))
+    print("=== TICKET ANALYTICS: support_tickets_data.csv ===")
+    print(to_markdown(sample.tables()["issue_priority"]))
+
+    frame = synthetic_tickets(tickets + batches * batch_size, seed=1)
+    frame["date_submitted"] = frame["date_submitted"].dt.strftime("%Y-%m-%d")
+    path = os.path.join(workdir, "tickets.csv")
+    frame.iloc[:tickets].to_csv(path, index=False)
+
+    analytics = TicketAnalytics()
+    started = time.perf_counter()
+    analytics.refresh(path)
+    initial = time.perf_counter() - started
+
+    incremental, regroup = 0.0, 0.0
+    for i in range(batches):
+        end = tickets + (i + 1) * batch_size
+        frame.iloc[end - batch_size:end].to_csv(path, mode="a", header=False, index=False)
+        started = time.perf_counter()
+        analytics.refresh(path)
+        analytics.tables()
+        incremental += time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference = reference_tables(pd.read_csv(path))
+        regroup += time.perf_counter() - started
+
+    tables = analytics.tables()
+    ours = tables["agent_performance"].set_index("agent_id")
+    theirs = reference["agent_performance"].set_index("agent_id")
+    assert analytics.tickets == len(frame)
+    assert np.allclose(ours[theirs.columns].to_numpy(float), theirs.to_numpy(float))
+    assert np.allclose(tables["satisfaction_trend"]["mean_satisfaction_rating"],
+                       reference["satisfaction_trend"]["satisfaction_rating"])
+
+    print(f"=== {tickets:,} tickets + {batches} appends of {batch_size:,} ===")
+    print(f"Initial load: {initial:.2f} s")
+    print(f"Per append: incremental refresh + tables {1000 * incremental / batches:7.1f} ms | "
+          f"re-read + pandas group-by {1000 * regroup / batches:7.1f} ms (tables match)")
+
+    for workers in (1, 4):
+        started = time.perf_counter()
+        charts = render_charts(tables, workdir, workers=workers)
+        print(f"Rendered {len(charts)} charts with {workers} process(es) on {os.cpu_count()} CPU(s): "
+              f"{time.perf_counter() - started:.2f} s")
+    print(f"Crew inputs: {len(report_inputs(analytics, charts)['ticket_tables']):,} characters of tables")
+
+
+if __name__ == "__main__":
+    benchmark()
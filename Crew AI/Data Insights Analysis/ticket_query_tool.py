@@ -0,0 +1,377 @@
+"""
+Ticket Query Tool
+Structured access to the support-ticket data for the Data Insights Analysis crew.
+
+`FileReadTool(file_path='./support_tickets_data.csv')` pastes the whole CSV into the
+prompt on every agent call: fine for 50 tickets, over any context window long before
+a million. TicketStore loads the CSV once into a typed columnar table and answers the
+questions the crew's tasks actually ask:
+
+- Categorical dtypes for issue_type, priority and agent_id; filters compare integer codes
+- summary: totals, rates, means and the distribution of every categorical column
+- aggregate: count / mean / median / min / max / sum per group (including month)
+- list: filtered, sorted, paged rows with only the requested columns
+- Answers are small CSV blocks, cached per query
+
+    store = TicketStore.from_csv("./support_tickets_data.csv")
+    ticket_tool = TicketQueryTool(store=store)
+    agent = Agent(config=agents_config["reporting_agent"], tools=[ticket_tool])
+"""
+
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Literal, Optional, Sequence, Type
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from pydantic import BaseModel, Field, PrivateAttr
+
+try:
+    from crewai_tools import BaseTool
+except ImportError:
+    BaseTool = None  # TicketStore still works on its own; only the crew tool needs crewai_tools
+
+CATEGORICAL = ("issue_type", "priority", "agent_id")
+NUMERIC = ("response_time_minutes", "resolution_time_minutes", "satisfaction_rating", "resolved")
+GROUPABLE = CATEGORICAL + ("resolved", "satisfaction_rating", "month")
+AGGREGATIONS = ("mean", "median", "min", "max", "sum")
+PRIORITY_ORDER = ["Low", "Medium", "High", "Critical"]
+LIST_COLUMNS = ["ticket_id", "issue_type", "priority", "date_submitted", "resolution_time_minutes",
+                "satisfaction_rating", "agent_id", "resolved", "customer_comments"]
+MAX_PAGE_SIZE = 100
+
+TOOL_DESCRIPTION = (
+    "Query the support tickets instead of reading the raw file. "
+    "action='summary' gives totals, averages and category distributions; "
+    "action='aggregate' groups by group_by (issue_type, priority, agent_id, resolved, satisfaction_rating, month) "
+    "and computes metrics such as 'count', 'mean:resolution_time_minutes' or 'mean:satisfaction_rating'; "
+    "action='list' returns one page of matching tickets. "
+    "Every action accepts filters: issue_type, priority, agent_id, resolved, date_from, date_to, "
+    "min_rating, max_rating."
+)
+
+
+class TicketQuery(BaseModel):
+    """Input for TicketQueryTool."""
+
+    action: Literal["summary", "aggregate", "list"] = Field("summary", description="summary, aggregate or list")
+    issue_type: Optional[List[str]] = Field(None, description="Keep only these issue types")
+    priority: Optional[List[str]] = Field(None, description="Keep only these priorities (Low, Medium, High, Critical)")
+    agent_id: Optional[List[str]] = Field(None, description="Keep only these agents, e.g. ['A001']")
+    resolved: Optional[bool] = Field(None, description="Keep only resolved (true) or unresolved (false) tickets")
+    date_from: Optional[str] = Field(None, description="First submission date, YYYY-MM-DD")
+    date_to: Optional[str] = Field(None, description="Last submission date, YYYY-MM-DD")
+    min_rating: Optional[int] = Field(None, description="Lowest satisfaction rating (1-5)")
+    max_rating: Optional[int] = Field(None, description="Highest satisfaction rating (1-5)")
+    group_by: List[str] = Field(default_factory=list, description="aggregate: columns to group by")
+    metrics: List[str] = Field(default_factory=lambda: ["count"],
+                               description="aggregate: 'count' or '<mean|median|min|max|sum>:<column>'")
+    sort_by: Optional[str] = Field(None, description="Column or metric to sort by")
+    descending: bool = Field(True, description="Sort from highest to lowest")
+    columns: Optional[List[str]] = Field(None, description="list: columns to return")
+    page: int = Field(1, description="list: page number, starting at 1")
+    page_size: int = Field(20, description=f"list: rows per page, at most {MAX_PAGE_SIZE}")
+
+
+def load_tickets(path: str) -> pd.DataFrame:
+    """Read the tickets CSV into typed columns"""
+    frame = pd.read_csv(path, dtype={"issue_type": "category", "agent_id": "category",
+                                     "priority": pd.CategoricalDtype(PRIORITY_ORDER, ordered=True),
+                                     "response_time_minutes": "int32", "resolution_time_minutes": "int32",
+                                     "satisfaction_rating": "int8", "resolved": "bool"},
+                        parse_dates=["date_submitted"])
+    return frame
+
+
+def _format(frame: pd.DataFrame) -> str:
+    return frame.to_csv(index=False, float_format="%.2f", date_format="%Y-%m-%d").strip()
+
+
+class TicketStore:
+    """The ticket table plus the filtered, aggregated and paged queries the crew runs against it"""
+
+    def __init__(self, frame: pd.DataFrame, cache_size: int = 256):
+        self.frame = frame
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        # Integer codes and raw arrays, so filters never touch strings or pandas indexes
+        self._codes = {col: frame[col].cat.codes.to_numpy() for col in CATEGORICAL}
+        self._dates = frame["date_submitted"].to_numpy()
+        self._ratings = frame["satisfaction_rating"].to_numpy()
+        self._resolved = frame["resolved"].to_numpy()
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> "TicketStore":
+        return cls(load_tickets(path), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # ------------------------------------------------------------------
+    # Filtering
+    # ------------------------------------------------------------------
+
+    def _category_codes(self, column: str, values: Sequence[str]) -> np.ndarray:
+        categories = self.frame[column].cat.categories
+        codes = categories.get_indexer(list(values))
+        if (codes < 0).any():
+            unknown = [v for v, c in zip(values, codes) if c < 0]
+            raise ValueError(f"Unknown {column} {unknown}; valid values: {list(categories)}")
+        return codes
+
+    def mask(self, query: TicketQuery) -> Optional[np.ndarray]:
+        """Boolean row mask for the query's filters, None when it has none"""
+        mask = None
+
+        def both(condition):
+            return condition if mask is None else mask & condition
+
+        for column in CATEGORICAL:
+            values = getattr(query, column)
+            if values:
+                mask = both(np.isin(self._codes[column], self._category_codes(column, values)))
+        if query.resolved is not None:
+            mask = both(self._resolved == query.resolved)
+        if query.date_from:
+            mask = both(self._dates >= np.datetime64(query.date_from))
+        if query.date_to:
+            mask = both(self._dates <= np.datetime64(query.date_to))
+        if query.min_rating is not None:
+            mask = both(self._ratings >= query.min_rating)
+        if query.max_rating is not None:
+            mask = both(self._ratings <= query.max_rating)
+        return mask
+
+    def select(self, query: TicketQuery) -> pd.DataFrame:
+        mask = self.mask(query)
+        return self.frame if mask is None else self.frame[mask]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, query: TicketQuery) -> str:
+        """The compact text answer for one query, served from the cache when seen before"""
+        key = query.model_dump_json()
+        answer = self._cache.get(key)
+        if answer is not None:
+            self._cache.move_to_end(key)
+            return answer
+        rows = self.select(query)
+        header = f"{len(rows)} of {len(self.frame)} tickets match"
+        if query.action == "summary":
+            answer = f"{header}\n{self.summary(rows)}"
+        elif query.action == "aggregate":
+            answer = f"{header}\n{_format(self.aggregate(rows, query))}"
+        else:
+            answer = self.page(rows, query, header)
+        self._cache[key] = answer
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return answer
+
+    def summary(self, rows: pd.DataFrame) -> str:
+        if rows.empty:
+            return "No tickets"
+        lines = [
+            f"dates: {rows['date_submitted'].min():%Y-%m-%d} to {rows['date_submitted'].max():%Y-%m-%d}",
+            f"resolved_rate: {rows['resolved'].mean():.2f}",
+            f"mean_response_time_minutes: {rows['response_time_minutes'].mean():.1f}",
+            f"mean_resolution_time_minutes: {rows['resolution_time_minutes'].mean():.1f}",
+            f"mean_satisfaction_rating: {rows['satisfaction_rating'].mean():.2f}",
+        ]
+        for column in CATEGORICAL:
+            counts = rows[column].value_counts(sort=False)
+            lines.append(f"{column}: " + ", ".join(f"{k}={v}" for k, v in counts.items() if v))
+        return "\n".join(lines)
+
+    def aggregate(self, rows: pd.DataFrame, query: TicketQuery) -> pd.DataFrame:
+        unknown = [g for g in query.group_by if g not in GROUPABLE]
+        if unknown:
+            raise ValueError(f"Cannot group by {unknown}; choose from {list(GROUPABLE)}")
+        named: Dict[str, Any] = {}
+        for metric in query.metrics:
+            if metric == "count":
+                named["count"] = ("ticket_id", "size")
+                continue
+            func, _, column = metric.partition(":")
+            if func not in AGGREGATIONS or column not in NUMERIC:
+                raise ValueError(f"Unknown metric {metric!r}; use 'count' or '<{'|'.join(AGGREGATIONS)}>:<column>' "
+                                 f"with a column from {list(NUMERIC)}")
+            named[f"{func}_{column}"] = (column, func)
+        if not named:
+            raise ValueError("No metrics requested")
+
+        if "month" in query.group_by:
+            rows = rows.assign(month=rows["date_submitted"].dt.to_period("M"))
+        if query.group_by:
+            table = rows.groupby(query.group_by, observed=True, sort=True).agg(**named).reset_index()
+            if "month" in table:
+                table["month"] = table["month"].astype(str)
+        else:
+            table = pd.DataFrame({name: [rows[column].agg(func)] for name, (column, func) in named.items()})
+        if query.sort_by:
+            if query.sort_by not in table.columns:
+                raise ValueError(f"Cannot sort by {query.sort_by!r}; columns are {list(table.columns)}")
+            table = table.sort_values(query.sort_by, ascending=not query.descending)
+        return table
+
+    def page(self, rows: pd.DataFrame, query: TicketQuery, header: str) -> str:
+        columns = query.columns or LIST_COLUMNS
+        unknown = [c for c in columns if c not in self.frame.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}; available: {list(self.frame.columns)}")
+        page_size = max(1, min(query.page_size, MAX_PAGE_SIZE))
+        start = (max(query.page, 1) - 1) * page_size
+        pages = max(1, -(-len(rows) // page_size))
+        if query.sort_by:
+            if query.sort_by not in self.frame.columns:
+                raise ValueError(f"Cannot sort by {query.sort_by!r}; columns are {list(self.frame.columns)}")
+            values = rows[query.sort_by]
+            if is_numeric_dtype(values) and not is_bool_dtype(values):
+                # Only the rows up to this page need ordering, not the whole selection
+                take = start + page_size
+                order = values.nlargest(take) if query.descending else values.nsmallest(take)
+                rows = rows.loc[order.index]
+            else:
+                # Text, dates, booleans and categoricals (priority sorts Low < Critical)
+                rows = rows.sort_values(query.sort_by, ascending=not query.descending, kind="stable")
+        chunk = rows.iloc[start:start + page_size][columns]
+        if chunk.empty and len(rows):
+            return f"{header}; page {start // page_size + 1} is past the last page ({pages})"
+        return f"{header}; page {start // page_size + 1} of {pages}\n{_format(chunk)}"
+
+
+# ============================================================================
+# CREW TOOL
+# ============================================================================
+
+def _require_crewai_tools():
+    if BaseTool is None:
+        raise ImportError("TicketQueryTool needs crewai_tools: pip install crewai_tools")
+
+
+if BaseTool is not None:
+    class TicketQueryTool(BaseTool):
+        name: str = "Query support tickets"
+        description: str = TOOL_DESCRIPTION
+        args_schema: Type[BaseModel] = TicketQuery
+        _store: TicketStore = PrivateAttr()
+
+        def __init__(self, store: Optional[TicketStore] = None, file_path: str = "./support_tickets_data.csv",
+                     **kwargs):
+            super().__init__(**kwargs)
+            self._store = store or TicketStore.from_csv(file_path)
+
+        def _run(self, **kwargs: Any) -> Any:
+            try:
+                return self._store.query(TicketQuery(**kwargs))
+            except ValueError as e:
+                return f"Invalid ticket query: {e}"
+else:
+    def TicketQueryTool(*args, **kwargs):
+        _require_crewai_tools()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+ISSUE_TYPES = ["API Issue", "Login Issue", "Report Generation", "Data Import", "Feature Request",
+               "Billing Issue", "UI Bug"]
+AGENTS = ["A001", "A002", "A003", "A004", "A005"]
+COMMENTS = [
+    "I'm pleased with how my issue was handled. Thanks!",
+    "The problem still persists. Not resolved yet.",
+    "The issue was escalated quickly, which was appreciated.",
+    "It took too long to resolve the issue. Not happy.",
+    "Agent was knowledgeable and solved my issue efficiently.",
+    "Still waiting for a resolution. Not happy with the delay.",
+]
+
+
+def synthetic_tickets(n: int, seed: int = 0) -> pd.DataFrame:
+    """n tickets shaped like support_tickets_data.csv"""
+    rng = np.random.default_rng(seed)
+    ids = pd.Series(np.arange(1, n + 1)).astype(str).str.zfill(7)
+    return pd.DataFrame({
+        "ticket_id": "T" + ids,
+        "customer_id": "C" + pd.Series(rng.integers(1, 10_000, n)).astype(str).str.zfill(4),
+        "issue_type": pd.Categorical.from_codes(rng.integers(0, len(ISSUE_TYPES), n), ISSUE_TYPES),
+        "issue_description": pd.Categorical.from_codes(rng.integers(0, len(COMMENTS), n), COMMENTS),
+        "priority": pd.Categorical.from_codes(rng.integers(0, 4, n), PRIORITY_ORDER),
+        "date_submitted": np.datetime64("2023-01-01") + rng.integers(0, 181, n).astype("timedelta64[D]"),
+        "response_time_minutes": rng.integers(15, 241, n),
+        "resolution_time_minutes": rng.integers(46, 1400, n),
+        "satisfaction_rating": rng.integers(1, 6, n),
+        "customer_comments": pd.Categorical.from_codes(rng.integers(0, len(COMMENTS), n), COMMENTS),
+        "agent_id": pd.Categorical.from_codes(rng.integers(0, len(AGENTS), n), AGENTS),
+        "resolved": rng.random(n) < 0.6,
+    })
+
+
+# What the table/suggestion tasks in config/tasks.yaml ask of the data
+TASK_QUERIES = [
+    TicketQuery(action="summary"),
+    TicketQuery(action="aggregate", group_by=["issue_type", "priority"], metrics=["count"]),
+    TicketQuery(action="aggregate", group_by=["agent_id"], sort_by="mean_satisfaction_rating",
+                metrics=["count", "mean:resolution_time_minutes", "mean:satisfaction_rating", "mean:resolved"]),
+    TicketQuery(action="aggregate", group_by=["month"], metrics=["count", "mean:satisfaction_rating"]),
+    TicketQuery(action="aggregate", group_by=["issue_type"], resolved=False,
+                metrics=["count", "median:resolution_time_minutes"]),
+    TicketQuery(action="list", issue_type=["Billing Issue"], max_rating=2, sort_by="resolution_time_minutes"),
+]
+
+
+def benchmark(sizes: Sequence[int] = (50, 10_000, 1_000_000), repeats: int = 3):
+    """Prompt size and latency: raw CSV through FileReadTool vs TicketStore answers"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix="tickets_")
+    print(f"=== TICKET QUERY TOOL: {len(TASK_QUERIES)} task queries, prompt size in characters (~tokens = chars / 4) ===")
+    for n in sizes:
+        path = os.path.join(here, "support_tickets_data.csv")
+        if n != 50:
+            path = os.path.join(workdir, f"tickets_{n}.csv")
+            synthetic_tickets(n).to_csv(path, index=False)
+
+        started = time.perf_counter()
+        with open(path, "r") as file:
+            raw = file.read()
+        read_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store = TicketStore.from_csv(path)
+        load_time = time.perf_counter() - started
+        memory = store.frame.memory_usage(deep=True).sum()
+
+        cold, sizes_out = [], []
+        for query in TASK_QUERIES:
+            best = float("inf")
+            for _ in range(repeats):
+                store._cache.clear()
+                started = time.perf_counter()
+                answer = store.query(query)
+                best = min(best, time.perf_counter() - started)
+            cold.append(best)
+            sizes_out.append(len(answer))
+        for query in TASK_QUERIES:
+            store.query(query)
+        started = time.perf_counter()
+        for query in TASK_QUERIES:
+            store.query(query)
+        cached = (time.perf_counter() - started) / len(TASK_QUERIES)
+
+        print(f"--- {n:,} tickets")
+        print(f"FileReadTool: {len(raw):>12,} chars (~{len(raw) // 4:,} tokens) per agent call, read in {read_time * 1000:.1f} ms")
+        print(f"TicketStore:  load once {load_time * 1000:.0f} ms ({memory / 1e6:.2f} MB in memory); per query "
+              f"{min(sizes_out):,}-{max(sizes_out):,} chars, {1000 * np.median(cold):.2f} ms median / "
+              f"{1000 * max(cold):.2f} ms max, cached {cached * 1e6:.0f} us")
+    print("Agent performance answer at the largest size:")
+    print(store.query(TASK_QUERIES[2]))
+
+
+if __name__ == "__main__":
+    benchmark()
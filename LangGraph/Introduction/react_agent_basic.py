@@ -4,6 +4,9 @@ from langchain.agents import initialize_agent, tool
 from langchain_community.tools import TavilySearchResults
 import datetime
 
+# tool_cache.py is in LangGraph/: run as `PYTHONPATH=.. python react_agent_basic.py`
+from tool_cache import CachePolicy, cached_tool
+
 
 load_dotenv()
 
@@ -12,6 +15,7 @@ llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
 search_tool = TavilySearchResults(search_depth="basic")
 
 @tool
+@cached_tool(CachePolicy.TIME_DEPENDENT, ttl=1.0)
 def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
     """Returns the current date and time in the specified format"""
 
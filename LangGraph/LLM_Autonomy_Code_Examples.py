@@ -1,13 +1,24 @@
 """
 LLM Autonomy Levels - Practical Code Examples
 This file demonstrates each autonomy level with working code examples.
+
+Levels 1-5 accept any client exposing `chat.completions.create(...)`: an openai.OpenAI()
+instance, or llm_client.LLMClient for pooled, coalesced, cached and metered calls.
 """
 
 import datetime
-from typing import List, Dict, Any
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from expression_engine import evaluate as evaluate_expression
+from tool_cache import CachePolicy, cached_tool
+
 # ============================================================================
 # LEVEL 0: DIRECT CODE (0% Autonomy)
 # ============================================================================
@@ -32,15 +43,17 @@ class Level0_DirectCode:
         else:
             raise ValueError(f"Unknown operation: {operation}")
     
+    # Built once at import time instead of on every lookup
+    WEATHER_DATA = {
+        "new york": "Sunny, 72°F",
+        "london": "Cloudy, 15°C",
+        "tokyo": "Rainy, 20°C"
+    }
+
     @staticmethod
     def weather_lookup(city: str) -> str:
         """Fixed weather responses"""
-        weather_data = {
-            "new york": "Sunny, 72°F",
-            "london": "Cloudy, 15°C",
-            "tokyo": "Rainy, 20°C"
-        }
-        return weather_data.get(city.lower(), "Weather data not available")
+        return Level0_DirectCode.WEATHER_DATA.get(city.lower(), "Weather data not available")
 
 # Example usage:
 # result = Level0_DirectCode.calculator("add", 5, 3)
@@ -81,7 +94,7 @@ class Level1_SingleLLM:
         return self.chat_completion(prompt)
 
 # Example usage:
-# llm_level1 = Level1_SingleLLM(openai_client)
+# llm_level1 = Level1_SingleLLM(openai_client)  # or Level1_SingleLLM(LLMClient(cache_ttl=300))
 # explanation = llm_level1.code_explanation("def factorial(n): return 1 if n <= 1 else n * factorial(n-1)")
 
 
@@ -357,20 +370,22 @@ class Level4_ReactAgent:
             # Extract action and input (simplified)
             return {"action": "search", "input": state.original_query}
 
-# Example tools for the agent
+# Example tools for the agent (results cached per tool policy, see tool_cache.py)
+@cached_tool(CachePolicy.EXTERNAL, ttl=300, stale_ttl=3600)
 def search_tool(query: str) -> str:
     """Mock search tool"""
     return f"Search results for '{query}': Found relevant information about the topic."
 
+@cached_tool(CachePolicy.PURE, max_size=1024)
 def calculator_tool(expression: str) -> str:
-    """Simple calculator tool"""
+    """Safe calculator tool (whitelisted arithmetic, no eval)"""
     try:
-        # WARNING: eval is dangerous in production - use safe math parser
-        result = eval(expression)
+        result = evaluate_expression(expression)
         return str(result)
-    except:
+    except (ValueError, TypeError, ArithmeticError):
         return "Error in calculation"
 
+@cached_tool(CachePolicy.TIME_DEPENDENT, ttl=1.0)
 def time_tool(format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
     """Get current time"""
     return datetime.datetime.now().strftime(format_str)
@@ -412,25 +427,178 @@ class LongTermMemory:
         # Simplified similarity matching
         return [exp for exp in self.experiences if context.lower() in exp["context"].lower()]
 
+class EvaluationPipeline:
+    """Queues goal-completion checks and reflections and evaluates them off the action loop"""
+
+    def __init__(self, llm_client, batch_size: int = 4, reflection_interval: int = 5,
+                 novelty_threshold: float = 0.6):
+        self.llm = llm_client
+        self.batch_size = batch_size
+        self.reflection_interval = reflection_interval
+        self.novelty_threshold = novelty_threshold
+        self.llm_calls = 0
+        self._pending: List[Tuple[Goal, str]] = []
+        self._in_flight: set = set()
+        self._futures: List = []
+        self._reflected_at = 0
+        self._lock = threading.Lock()
+        # A single worker keeps verdicts and reflections in submission order
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def awaiting_verdict(self, goal: Goal) -> bool:
+        """True while a completion check for the goal is queued or running"""
+        with self._lock:
+            return id(goal) in self._in_flight or any(g is goal for g, _ in self._pending)
+
+    def submit_completion_check(self, goal: Goal, last_result: str):
+        """Queue a completion check; a full queue is sent as one batched request"""
+        with self._lock:
+            self._pending = [(g, r) for g, r in self._pending if g is not goal]
+            self._pending.append((goal, last_result))
+            batch_ready = len(self._pending) >= self.batch_size
+        if batch_ready:
+            self._dispatch()
+
+    def maybe_reflect(self, memory: LongTermMemory):
+        """Reflect every N new experiences, or early when the latest one is novel"""
+        experiences = memory.experiences
+        if len(experiences) < 3:
+            return
+
+        new_experiences = len(experiences) - self._reflected_at
+        if new_experiences <= 0:
+            return
+        if new_experiences < self.reflection_interval and self._novelty(experiences) < self.novelty_threshold:
+            return
+
+        self._reflected_at = len(experiences)
+        self._submit(self._reflect, memory, list(experiences[-5:]))
+
+    def flush(self, wait_for_results: bool = True):
+        """Send any queued checks and optionally block until all work has finished"""
+        self._dispatch()
+        if wait_for_results:
+            with self._lock:
+                futures, self._futures = self._futures, []
+            wait(futures)
+
+    def close(self):
+        """Drain outstanding work and release the worker thread"""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _dispatch(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._in_flight.update(id(goal) for goal, _ in batch)
+        if batch:
+            self._submit(self._evaluate_batch, batch)
+
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evaluator")
+        future = self._executor.submit(fn, *args)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()]
+            self._futures.append(future)
+
+    def _complete(self, prompt: str) -> str:
+        with self._lock:
+            self.llm_calls += 1
+        response = self.llm.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+    def _evaluate_batch(self, batch: List[Tuple[Goal, str]]):
+        """Judge several goals with one structured request"""
+        goal_lines = "\n".join(
+            f'{i}. Goal: "{goal.description}"\n   Latest result: "{result}"'
+            for i, (goal, result) in enumerate(batch, start=1)
+        )
+        evaluation_prompt = f"""
+        For each numbered goal below, decide whether it has been sufficiently completed.
+
+        {goal_lines}
+
+        Respond with only a JSON object mapping each goal number to "YES" or "NO",
+        for example {{"1": "YES", "2": "NO"}}.
+        """
+
+        try:
+            verdicts = self._parse_verdicts(self._complete(evaluation_prompt))
+            for i, (goal, _) in enumerate(batch, start=1):
+                if goal.status == "active" and verdicts.get(str(i), "").strip().lower() == "yes":
+                    goal.status = "completed"
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(id(goal) for goal, _ in batch)
+
+    @staticmethod
+    def _parse_verdicts(response_text: str) -> Dict[str, str]:
+        match = re.search(r"\{.*\}", response_text, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            verdicts = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        return {str(k): str(v) for k, v in verdicts.items()} if isinstance(verdicts, dict) else {}
+
+    def _reflect(self, memory: LongTermMemory, recent_experiences: List[Dict]):
+        reflection_prompt = f"""
+        Reflect on these recent experiences and identify patterns:
+
+        {str(recent_experiences)}
+
+        What patterns do you notice? What should be remembered for future decisions?
+        """
+        memory.learned_patterns[f"insight_{datetime.datetime.now()}"] = self._complete(reflection_prompt)
+
+    @staticmethod
+    def _novelty(experiences: List[Dict]) -> float:
+        """1 - highest word overlap between the latest experience and the ones before it"""
+        def words(exp: Dict) -> set:
+            return set(f"{exp['action']} {exp['context']} {exp['result']}".lower().split())
+
+        latest = words(experiences[-1])
+        previous = [words(exp) for exp in experiences[-11:-1]]
+        if not latest or not previous:
+            return 1.0
+        overlap = max(len(latest & other) / len(latest | other) for other in previous)
+        return 1.0 - overlap
+
 class Level5_AutonomousAgent:
     """Fully autonomous agent that sets its own goals and plans"""
-    
-    def __init__(self, llm_client, tools: Dict[str, callable]):
+
+    def __init__(self, llm_client, tools: Dict[str, callable], batched_evaluation: bool = True,
+                 evaluator: Optional[EvaluationPipeline] = None):
         self.llm = llm_client
         self.tools = tools
         self.goals: List[Goal] = []
         self.memory = LongTermMemory()
         self.running = False
-    
-    def start(self, initial_objective: str = None):
+        # Without an evaluator every action is followed by its own completion check and reflection
+        if evaluator is None and batched_evaluation:
+            evaluator = EvaluationPipeline(llm_client)
+        self.evaluator = evaluator
+
+    def start(self, initial_objective: str = None, max_cycles: Optional[int] = None):
         """Start autonomous operation"""
         self.running = True
-        
+        cycles = 0
+
         if initial_objective:
             initial_goal = Goal(initial_objective, priority=10)
             self.goals.append(initial_goal)
-        
+
         while self.running and (self.has_active_goals() or self._should_generate_goals()):
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            cycles += 1
             try:
                 # Self-assessment
                 situation = self._assess_current_situation()
@@ -448,6 +616,9 @@ class Level5_AutonomousAgent:
             except Exception as e:
                 print(f"Agent error: {e}")
                 # In a real system, implement proper error recovery
+
+        if self.evaluator:
+            self.evaluator.close()
     
     def stop(self):
         """Stop autonomous operation"""
@@ -518,6 +689,14 @@ class Level5_AutonomousAgent:
         if not active_goals:
             return
         
+        if self.evaluator:
+            ready_goals = [g for g in active_goals if not self.evaluator.awaiting_verdict(g)]
+            if not ready_goals:
+                # Every active goal is waiting on a verdict; drain the queue before acting again
+                self.evaluator.flush()
+                return
+            active_goals = ready_goals
+
         current_goal = max(active_goals, key=lambda g: g.priority)
         
         # Plan action for this goal
@@ -534,7 +713,9 @@ class Level5_AutonomousAgent:
             )
             
             # Check if goal is completed
-            if self._is_goal_completed(current_goal, result):
+            if self.evaluator:
+                self.evaluator.submit_completion_check(current_goal, result)
+            elif self._is_goal_completed(current_goal, result):
                 current_goal.status = "completed"
                 
         except Exception as e:
@@ -600,6 +781,10 @@ class Level5_AutonomousAgent:
     
     def _reflect_and_learn(self):
         """Reflect on recent experiences and update learned patterns"""
+
+        if self.evaluator:
+            self.evaluator.maybe_reflect(self.memory)
+            return
         
         recent_experiences = self.memory.experiences[-5:]
         if len(recent_experiences) < 3:
@@ -625,6 +810,36 @@ class Level5_AutonomousAgent:
 # autonomous_agent = Level5_AutonomousAgent(openai_client, agent_tools)
 # autonomous_agent.start("Learn about machine learning and create a summary")
 
+class CallCountingClient:
+    """Wraps an LLM client and counts chat completion calls (thread-safe)"""
+
+    def __init__(self, llm_client):
+        self._llm = llm_client
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        return self._llm.chat.completions.create(**kwargs)
+
+def compare_evaluation_modes(llm_client, tools: Dict[str, callable], objective: str,
+                             max_cycles: int = 40) -> Dict[str, float]:
+    """Report LLM calls per completed goal with per-action vs batched evaluation"""
+    report = {}
+    for mode, batched in (("per_action", False), ("batched", True)):
+        counter = CallCountingClient(llm_client)
+        agent = Level5_AutonomousAgent(counter, tools, batched_evaluation=batched)
+        agent.start(objective, max_cycles=max_cycles)
+        completed = len([g for g in agent.goals if g.status == "completed"])
+        report[mode] = counter.calls / completed if completed else float("inf")
+    return report
+
+# Example usage:
+# report = compare_evaluation_modes(openai_client, agent_tools, "Learn about machine learning")
+# print(report)  # {"per_action": ..., "batched": ...}
+
 
 # ============================================================================
 # DEMONSTRATION RUNNER
@@ -645,8 +860,17 @@ def demonstrate_all_levels():
     
     # Note: Levels 1-5 require actual LLM client and tools
     print("Levels 1-5 require LLM client setup and API keys.")
-    print("See the class implementations above for usage examples.\n")
-    
+    print("See the class implementations above for usage examples.")
+    print("Run autonomy_benchmark.py to measure every level offline with a scripted fake LLM.\n")
+
+    print("LEVEL 5 - Evaluation overhead (scripted offline client):")
+    # The scripted fake is only for this offline demo, not a dependency of the examples
+    from fake_llm import ScriptedLLM
+
+    report = compare_evaluation_modes(ScriptedLLM(), {"search": search_tool}, "Research autonomy levels")
+    print(f"LLM calls per completed goal: per-action {report['per_action']:.2f}"
+          f" | batched {report['batched']:.2f}\n")
+
     print("=== AUTONOMY COMPARISON ===")
     levels = [
         ("Level 0", "Direct Code", "0%", "Deterministic logic"),
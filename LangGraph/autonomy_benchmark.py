@@ -0,0 +1,226 @@
+"""
+Autonomy Level Benchmark Harness
+Measures the overhead each autonomy level adds, offline and deterministically.
+
+Every level from Level0_DirectCode to Level5_AutonomousAgent runs a representative
+task against a ScriptedLLM (configurable latency and token output) and counting fake
+tools. For each task we record:
+
+- LLM calls and tokens
+- tool calls
+- wall time and CPU time
+- peak Python memory (tracemalloc)
+
+Results are written as JSON so runs can be compared over time:
+
+    python autonomy_benchmark.py --latency 0.01 --output results/latest.json
+    python autonomy_benchmark.py --baseline results/latest.json   # flags regressions
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from fake_llm import ScriptedLLM
+from LLM_Autonomy_Code_Examples import (
+    Level0_DirectCode,
+    Level1_SingleLLM,
+    Level2_Chains,
+    Level3_Router,
+    Level4_ReactAgent,
+    Level5_AutonomousAgent,
+)
+
+# Metrics compared against a baseline; higher is worse for all of them
+TRACKED_METRICS = ["llm_calls", "tool_calls", "wall_ms", "cpu_ms", "peak_memory_kb"]
+
+
+# ============================================================================
+# FAKE TOOLS
+# ============================================================================
+
+class ToolCounter:
+    """Shared call counter for all fake tools in a run"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, fn: Callable) -> Callable:
+        def counted(*args, **kwargs):
+            with self._lock:
+                self.calls += 1
+            return fn(*args, **kwargs)
+        return counted
+
+
+class FakeSearch:
+    """Search client with the .search(query) -> list interface Level2_Chains expects"""
+
+    def __init__(self, counter: ToolCounter, results_per_query: int = 3):
+        self.search = counter.wrap(
+            lambda query: [f"Result {i} for '{query}'" for i in range(results_per_query)]
+        )
+
+
+def make_fake_tools(counter: ToolCounter) -> Dict[str, Callable]:
+    return {
+        "search": counter.wrap(lambda query: f"Search results for '{query}': success"),
+        "calculator": counter.wrap(lambda expression: "37.5"),
+        "time": counter.wrap(lambda format_str="%Y-%m-%d": "2025-01-01"),
+    }
+
+
+# ============================================================================
+# TASKS
+# ============================================================================
+
+@dataclass
+class TaskResult:
+    level: str
+    task: str
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    tool_calls: int
+    wall_ms: float
+    cpu_ms: float
+    peak_memory_kb: float
+
+
+def build_tasks(llm: ScriptedLLM, counter: ToolCounter, level5_cycles: int) -> List[tuple]:
+    """(level, task name, callable) for every autonomy level"""
+    tools = make_fake_tools(counter)
+
+    def level0():
+        counter.wrap(Level0_DirectCode.calculator)("add", 10, 5)
+        counter.wrap(Level0_DirectCode.weather_lookup)("New York")
+
+    def level5():
+        agent = Level5_AutonomousAgent(llm, tools)
+        agent.start("Research autonomy levels", max_cycles=level5_cycles)
+
+    return [
+        ("Level 0", "calculator + weather lookup", level0),
+        ("Level 1", "chat completion", lambda: Level1_SingleLLM(llm).chat_completion("Explain recursion")),
+        ("Level 2", "research and summarize chain",
+         lambda: Level2_Chains(llm, FakeSearch(counter)).research_and_summarize_chain("LLM agents")),
+        ("Level 3", "route query", lambda: Level3_Router(llm).route_query("What is 15% of 250?")),
+        ("Level 4", "ReAct solve", lambda: Level4_ReactAgent(llm, tools).solve("What is 15% of 250?")),
+        ("Level 5", f"autonomous run ({level5_cycles} cycles)", level5),
+    ]
+
+
+def measure(level: str, task: str, fn: Callable, llm: ScriptedLLM, counter: ToolCounter) -> TaskResult:
+    llm.reset()
+    counter.calls = 0
+
+    tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    fn()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return TaskResult(level, task, llm.calls, llm.prompt_tokens, llm.completion_tokens,
+                      counter.calls, wall * 1000, cpu * 1000, peak / 1024)
+
+
+def run_benchmark(latency: float = 0.0, completion_tokens: int = 50, repeat: int = 3,
+                  level5_cycles: int = 20) -> Dict:
+    """Run every level `repeat` times and keep the median timing per task"""
+    llm = ScriptedLLM(latency=latency, completion_tokens=completion_tokens)
+    counter = ToolCounter()
+
+    results = []
+    for level, task, fn in build_tasks(llm, counter, level5_cycles):
+        runs = [measure(level, task, fn, llm, counter) for _ in range(repeat)]
+        median = runs[0]
+        for field in ("wall_ms", "cpu_ms", "peak_memory_kb"):
+            setattr(median, field, statistics.median(getattr(r, field) for r in runs))
+        results.append(median)
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"latency": latency, "completion_tokens": completion_tokens,
+                   "repeat": repeat, "level5_cycles": level5_cycles},
+        "results": [asdict(r) for r in results],
+    }
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def print_report(report: Dict):
+    print(f"=== AUTONOMY BENCHMARK (latency={report['config']['latency']}s, "
+          f"tokens={report['config']['completion_tokens']}) ===")
+    print(f"{'Level':<8} {'Task':<32} {'LLM':>4} {'Tools':>5} {'Wall ms':>9} {'CPU ms':>8} {'Peak KB':>9}")
+    for r in report["results"]:
+        print(f"{r['level']:<8} {r['task']:<32} {r['llm_calls']:>4} {r['tool_calls']:>5} "
+              f"{r['wall_ms']:>9.2f} {r['cpu_ms']:>8.2f} {r['peak_memory_kb']:>9.1f}")
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """List metrics that grew by more than `tolerance` relative to the baseline"""
+    previous = {(r["level"], r["task"]): r for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        old = previous.get((r["level"], r["task"]))
+        if old is None:
+            continue
+        for metric in TRACKED_METRICS:
+            # Ignore sub-millisecond noise on timing metrics
+            if metric.endswith("_ms") and r[metric] - old[metric] < 1.0:
+                continue
+            if old[metric] and r[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{r['level']} {metric}: {old[metric]:.2f} -> {r[metric]:.2f}")
+            elif not old[metric] and r[metric] and not metric.endswith("_ms"):
+                regressions.append(f"{r['level']} {metric}: 0 -> {r[metric]}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LLM autonomy levels with a scripted fake LLM")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of fake latency per LLM call")
+    parser.add_argument("--tokens", type=int, default=50, help="completion tokens per free-text reply")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--level5-cycles", type=int, default=20)
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative growth vs baseline")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.latency, args.tokens, args.repeat, args.level5_cycles)
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions vs baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions vs baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
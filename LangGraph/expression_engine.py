@@ -0,0 +1,308 @@
+"""
+Safe Arithmetic Expression Engine
+Replaces bare eval() in the calculator tools with a whitelisted, compiled evaluator.
+
+An expression is parsed with `ast` once, checked against the allowed node types and
+compiled into a tree of small Python closures. Compiled expressions are cached by
+their source string, so an agent that keeps asking for "x * 1.15" pays the parsing
+cost only the first time.
+
+Supported:
+- numbers, + - * / // % **, unary +/-
+- variables passed as bindings:  evaluate("price * (1 + tax)", {"price": 250, "tax": 0.15})
+- common math functions:         sqrt, log, sin, cos, exp, abs, round, min, max, ...
+- NumPy arrays as bindings:      evaluate("sqrt(x) + 1", {"x": np.arange(10)})
+"""
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional
+
+try:
+    import numpy as np
+except ImportError:  # vectorized evaluation is only available with numpy installed
+    np = None
+
+MAX_EXPRESSION_LENGTH = 1000
+MAX_INT_BITS = 4096          # largest integer operand / result, ~1233 decimal digits
+MAX_EXPONENT = 1000          # largest |exponent| accepted by **
+MAX_ARRAY_SIZE = 10_000_000  # largest array binding for vectorized evaluation
+CACHE_SIZE = 1024
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is malformed, not allowed, or exceeds a limit"""
+
+
+# ============================================================================
+# FUNCTION NAMESPACES
+# ============================================================================
+
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+SCALAR_FUNCTIONS: Dict[str, Callable] = {
+    "abs": abs, "round": round, "min": min, "max": max,
+    "sqrt": math.sqrt, "exp": math.exp, "log": math.log, "log10": math.log10, "log2": math.log2,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "floor": math.floor, "ceil": math.ceil, "hypot": math.hypot,
+    "degrees": math.degrees, "radians": math.radians,
+}
+
+VECTOR_FUNCTIONS: Dict[str, Callable] = {}
+if np is not None:
+    VECTOR_FUNCTIONS = {
+        "abs": np.abs, "round": np.round, "min": np.minimum, "max": np.maximum,
+        "sqrt": np.sqrt, "exp": np.exp, "log": np.log, "log10": np.log10, "log2": np.log2,
+        "sin": np.sin, "cos": np.cos, "tan": np.tan,
+        "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan, "atan2": np.arctan2,
+        "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+        "floor": np.floor, "ceil": np.ceil, "hypot": np.hypot,
+        "degrees": np.degrees, "radians": np.radians,
+    }
+
+
+# ============================================================================
+# LIMIT CHECKS
+# ============================================================================
+
+def _check_operand(value):
+    """Reject integers too large to compute with cheaply"""
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise ExpressionError(f"Operand exceeds {MAX_INT_BITS} bits")
+    return value
+
+
+def _check_broadcast(*operands):
+    """Reject array operations whose broadcast result would exceed MAX_ARRAY_SIZE elements"""
+    shapes = [np.shape(value) for value in operands if isinstance(value, np.ndarray)]
+    if not shapes:
+        return
+    try:
+        shape = np.broadcast_shapes(*shapes)
+    except ValueError as exc:
+        raise ExpressionError(f"Incompatible array shapes: {exc}") from None
+    if math.prod(shape) > MAX_ARRAY_SIZE:
+        raise ExpressionError(f"Result of shape {shape} exceeds {MAX_ARRAY_SIZE} elements")
+
+
+def _checked_mul(a, b):
+    if isinstance(a, int) and isinstance(b, int) and a.bit_length() + b.bit_length() > MAX_INT_BITS:
+        raise ExpressionError(f"Result would exceed {MAX_INT_BITS} bits")
+    return a * b
+
+
+def _checked_pow(base, exponent):
+    if np is not None and isinstance(exponent, np.ndarray):
+        largest = float(np.max(np.abs(exponent))) if exponent.size else 0.0
+    else:
+        largest = abs(exponent)
+    if largest > MAX_EXPONENT:
+        raise ExpressionError(f"Exponent magnitude exceeds {MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if base.bit_length() * exponent > MAX_INT_BITS:
+            raise ExpressionError(f"Result would exceed {MAX_INT_BITS} bits")
+    return base ** exponent
+
+
+BINARY_OPERATORS: Dict[type, Callable] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _checked_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _checked_pow,
+}
+
+UNARY_OPERATORS: Dict[type, Callable] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+# A compiled node takes (bindings, functions) and returns a value
+CompiledNode = Callable[[Mapping[str, Any], Mapping[str, Callable]], Any]
+
+
+class CompiledExpression:
+    """An expression parsed and validated once, ready for repeated evaluation"""
+
+    def __init__(self, source: str, root: CompiledNode, variables: FrozenSet[str]):
+        self.source = source
+        self.variables = variables
+        self._root = root
+
+    def evaluate(self, variables: Optional[Mapping[str, Any]] = None) -> Any:
+        """Evaluate with the given bindings; array bindings switch to NumPy functions"""
+        bindings = dict(variables or {})
+        missing = self.variables - bindings.keys()
+        if missing:
+            raise ExpressionError(f"Missing values for: {', '.join(sorted(missing))}")
+
+        functions = SCALAR_FUNCTIONS
+        for name, value in bindings.items():
+            if isinstance(value, bool) or not _is_number_or_array(value):
+                raise ExpressionError(f"Variable '{name}' must be a number or array")
+            if np is not None and isinstance(value, np.ndarray):
+                if value.size > MAX_ARRAY_SIZE:
+                    raise ExpressionError(f"Array '{name}' exceeds {MAX_ARRAY_SIZE} elements")
+                functions = VECTOR_FUNCTIONS
+            else:
+                _check_operand(value)
+
+        return self._root(bindings, functions)
+
+    __call__ = evaluate
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+def _is_number_or_array(value) -> bool:
+    if isinstance(value, (int, float)):
+        return True
+    return np is not None and isinstance(value, (np.ndarray, np.number))
+
+
+def _compile_node(node: ast.AST, variables: set) -> CompiledNode:
+    """Recursively turn a validated AST node into a closure"""
+
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Unsupported literal: {node.value!r}")
+        value = _check_operand(node.value)
+        return lambda env, fns: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return lambda env, fns: value
+        if name in SCALAR_FUNCTIONS:
+            raise ExpressionError(f"Function '{name}' must be called")
+        variables.add(name)
+        return lambda env, fns: env[name]
+
+    if isinstance(node, ast.BinOp):
+        op = BINARY_OPERATORS.get(type(node.op))
+        if op is None:
+            hint = " (use ** for exponentiation)" if isinstance(node.op, ast.BitXor) else ""
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}{hint}")
+        left = _compile_node(node.left, variables)
+        right = _compile_node(node.right, variables)
+
+        def binary(env, fns):
+            a, b = left(env, fns), right(env, fns)
+            if np is not None:
+                _check_broadcast(a, b)
+            return _check_operand(op(a, b))
+
+        return binary
+
+    if isinstance(node, ast.UnaryOp):
+        op = UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        operand = _compile_node(node.operand, variables)
+        return lambda env, fns: op(operand(env, fns))
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in SCALAR_FUNCTIONS:
+            raise ExpressionError(f"Unsupported function: {ast.unparse(node.func)}")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        name = node.func.id
+        args = [_compile_node(arg, variables) for arg in node.args]
+
+        def call(env, fns):
+            values = [arg(env, fns) for arg in args]
+            if np is not None and len(values) > 1:
+                _check_broadcast(*values)
+            return fns[name](*values)
+
+        return call
+
+    raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse, validate and compile an expression (cached by expression string)"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+
+    variables: set = set()
+    root = _compile_node(tree.body, variables)
+    return CompiledExpression(expression, root, frozenset(variables))
+
+
+def evaluate(expression: str, variables: Optional[Mapping[str, Any]] = None) -> Any:
+    """Evaluate an arithmetic expression safely"""
+    return compile_expression(expression).evaluate(variables)
+
+# Example usage:
+# evaluate("15 / 100 * 250")                        -> 37.5
+# evaluate("sqrt(a**2 + b**2)", {"a": 3, "b": 4})   -> 5.0
+# evaluate("x * 2 + 1", {"x": np.arange(5)})        -> array([1, 3, 5, 7, 9])
+# evaluate("__import__('os')")                      -> ExpressionError
+
+
+# ============================================================================
+# MICROBENCHMARKS
+# ============================================================================
+
+def run_benchmarks(repeat: int = 20000):
+    """Compare cold (parse every time) vs cached evaluation, and scalar vs vectorized"""
+    import timeit
+
+    expression = "sqrt(a**2 + b**2) * 0.15 + log(c) - max(a, b) / 3"
+    bindings = {"a": 3.0, "b": 4.0, "c": 10.0}
+
+    def cold():
+        compile_expression.cache_clear()
+        evaluate(expression, bindings)
+
+    def cached():
+        evaluate(expression, bindings)
+
+    compiled = compile_expression(expression)
+
+    def precompiled():
+        compiled.evaluate(bindings)
+
+    print(f"=== EXPRESSION ENGINE MICROBENCHMARKS ({repeat} evaluations) ===")
+    for label, fn in (("cold (parse + compile)", cold), ("cached by string", cached),
+                      ("precompiled object", precompiled)):
+        seconds = timeit.timeit(fn, number=repeat)
+        print(f"{label:<24} {seconds / repeat * 1e6:8.2f} µs/eval")
+
+    if np is None:
+        print("numpy not installed - skipping vectorized benchmark")
+        return
+
+    size = 100_000
+    xs = np.linspace(1.0, 100.0, size)
+    ys = np.linspace(2.0, 200.0, size)
+    scalar_seconds = timeit.timeit(
+        lambda: [evaluate("sqrt(x**2 + y**2)", {"x": x, "y": y}) for x, y in zip(xs.tolist(), ys.tolist())],
+        number=1,
+    )
+    vector_seconds = timeit.timeit(lambda: evaluate("sqrt(x**2 + y**2)", {"x": xs, "y": ys}), number=1)
+    print(f"{size} points, scalar loop   {scalar_seconds * 1e3:8.2f} ms")
+    print(f"{size} points, vectorized    {vector_seconds * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmarks()
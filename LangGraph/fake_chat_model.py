@@ -0,0 +1,73 @@
+"""
+Scripted Fake Chat Model
+A deterministic LangChain chat model so LangGraph workflows can run offline.
+
+ScriptedLLM (fake_llm.py) fakes the raw OpenAI client used by the autonomy levels. This
+one is a BaseChatModel, so it works wherever the notebooks pass a ChatOpenAI: in
+chains, in create_react_agent, and with with_structured_output (answered as a tool
+call to the schema).
+
+Each call hands the messages and the bound tool schemas to `respond`, which returns
+the AIMessage to emit. Every call can sleep for `latency` seconds to model network time.
+
+    def respond(messages, tools):
+        if "Supervisor" in tool_names(tools):
+            return tool_call("Supervisor", {"next": "coder", "reason": "needs code"})
+        return AIMessage(content="Scripted answer")
+
+    llm = ScriptedChatModel(respond=respond, latency=0.05)
+"""
+
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+Responder = Callable[[List[BaseMessage], List[Dict[str, Any]]], AIMessage]
+
+_call_ids = itertools.count()
+
+
+def tool_names(tools: Sequence[Dict[str, Any]]) -> List[str]:
+    return [tool["function"]["name"] for tool in tools]
+
+
+def tool_call(name: str, args: Dict[str, Any]) -> AIMessage:
+    """An AIMessage requesting one tool call (also how structured output is returned)"""
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{next(_call_ids)}"}])
+
+
+def _echo(messages: List[BaseMessage], tools: List[Dict[str, Any]]) -> AIMessage:
+    return AIMessage(content=f"Scripted reply to: {messages[-1].content}" if messages else "Scripted reply")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model whose replies come from a `respond(messages, tools)` function"""
+
+    respond: Responder = _echo
+    latency: float = 0.0
+    calls: int = 0
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat"
+
+    def bind_tools(self, tools: Sequence[Any], tool_choice: Optional[str] = None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], tool_choice=tool_choice, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        message = self.respond(messages, kwargs.get("tools") or [])
+        return ChatResult(generations=[ChatGeneration(message=message)])
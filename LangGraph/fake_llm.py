@@ -0,0 +1,96 @@
+"""
+Scripted Fake LLM Client
+A deterministic stand-in for openai.OpenAI() so the autonomy levels can run offline.
+
+Replies are chosen by the first rule whose pattern appears in the last message.
+A rule's reply is either a fixed string or a function of the prompt; free-text
+replies (reply=None) are padded to `completion_tokens` words so token volume is
+configurable. Every call can sleep for `latency` seconds to model network time.
+
+    llm = ScriptedLLM(latency=0.05, completion_tokens=120)
+    Level1_SingleLLM(llm).chat_completion("Hello")
+    print(llm.calls, llm.prompt_tokens, llm.completion_tokens)
+"""
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+Reply = Optional[Union[str, Callable[[str], str]]]
+
+
+def _react_step(prompt: str) -> str:
+    """Level 4: use a tool twice, then give the final answer"""
+    if prompt.count("Action: ") >= 2:
+        return '{"action": "final_answer", "content": "Scripted final answer"}'
+    return '{"action": "search", "input": "scripted query"}'
+
+
+def _batched_verdicts(prompt: str) -> str:
+    """Level 5: answer YES for every numbered goal in a batched completion check"""
+    numbers = re.findall(r"^\s*(\d+)\. Goal:", prompt, re.MULTILINE)
+    return json.dumps({n: "YES" for n in numbers})
+
+
+# (pattern, reply) pairs covering the prompts in LLM_Autonomy_Code_Examples.py
+DEFAULT_SCRIPT: List[Tuple[str, Reply]] = [
+    ("Generate 3 specific search queries", "query one\nquery two\nquery three"),
+    ("Classify this user query", "math"),
+    ("Think step by step and decide your next action", _react_step),
+    ("generate 1-3 new goals", "Research topic A\nResearch topic B"),
+    ("JSON object mapping each goal number", _batched_verdicts),
+    ("sufficiently completed", "YES"),
+    ("Plan the next action", '{"action": "search", "input": "scripted query"}'),
+]
+
+
+class ScriptedLLM:
+    """Fake client exposing chat.completions.create with scripted replies and usage stats"""
+
+    def __init__(self, script: Optional[List[Tuple[str, Reply]]] = None, latency: float = 0.0,
+                 completion_tokens: int = 50):
+        self.script = DEFAULT_SCRIPT if script is None else script
+        self.latency = latency
+        self.completion_token_target = completion_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.prompt_tokens = self.completion_tokens = 0
+
+    def create(self, model: str = "", messages: Optional[List[Dict[str, str]]] = None, **kwargs) -> SimpleNamespace:
+        messages = messages or []
+        prompt = messages[-1]["content"] if messages else ""
+        if self.latency:
+            time.sleep(self.latency)
+
+        content = self._reply_for(prompt)
+        prompt_tokens = sum(len(m["content"].split()) for m in messages)
+        completion_tokens = len(content.split())
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                     message=SimpleNamespace(role="assistant", content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                  total_tokens=prompt_tokens + completion_tokens),
+        )
+
+    def _reply_for(self, prompt: str) -> str:
+        for pattern, reply in self.script:
+            if pattern in prompt:
+                if reply is None:
+                    break
+                return reply(prompt) if callable(reply) else reply
+        return " ".join(f"token{i}" for i in range(self.completion_token_target))
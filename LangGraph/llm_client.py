@@ -0,0 +1,356 @@
+"""
+Unified LLM Client Adapter
+One OpenAI-compatible client for every autonomy level in LLM_Autonomy_Code_Examples.py.
+
+The Level classes only ever call `llm.chat.completions.create(model=..., messages=...)`,
+so this adapter exposes exactly that surface (plus an async `acreate`) and adds:
+
+1. Connection pooling: one keep-alive httpx session shared by all calls
+2. Retries: exponential backoff on connection errors, 429 and 5xx responses
+3. Single-flight: identical requests already in flight share one upstream call
+4. Response cache: optional exact-match cache with a TTL
+5. Metrics: latency and token usage for every call, via a callback and summary()
+
+    llm = LLMClient(api_key=os.getenv("OPENAI_API_KEY"), cache_ttl=300)
+    agent = Level4_ReactAgent(llm, agent_tools)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class CallMetrics:
+    model: str
+    latency: float            # seconds, as seen by the caller
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    source: str               # "upstream", "cache" or "coalesced"
+    attempts: int             # upstream attempts including retries (0 when not sent)
+
+
+@dataclass
+class _LoopSession:
+    """Async state owned by one event loop: its futures and connections can't be used from another"""
+    http: httpx.AsyncClient
+    inflight: Dict[str, asyncio.Future] = field(default_factory=dict)
+
+
+class _ResponseCache:
+    """Exact-match response cache with TTL and LRU eviction"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, body = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: Dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _to_namespace(value: Any) -> Any:
+    """Turn a JSON response into attribute access like the openai SDK objects"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+class LLMClient:
+    """OpenAI-compatible chat client with pooling, single-flight, caching and metrics"""
+
+    def __init__(self, base_url: str = "https://api.openai.com/v1", api_key: Optional[str] = None,
+                 timeout: float = 60.0, max_connections: int = 20, max_retries: int = 3,
+                 backoff: float = 0.5, cache_ttl: Optional[float] = None, cache_size: int = 1024,
+                 on_metrics: Optional[Callable[[CallMetrics], None]] = None, metrics_window: int = 1000):
+        api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self._base_url = base_url.rstrip("/")
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+        self._timeout = timeout
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections)
+        self._http = httpx.Client(base_url=self._base_url, headers=self._headers,
+                                  timeout=timeout, limits=self._limits)
+        # Async sessions are created per event loop on first use (a new asyncio.run() gets its own)
+        self._loop_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopSession]" = \
+            weakref.WeakKeyDictionary()
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = _ResponseCache(cache_ttl, cache_size) if cache_ttl else None
+        self.on_metrics = on_metrics
+        self.metrics: Deque[CallMetrics] = deque(maxlen=metrics_window)
+
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        # Same call shape as openai.OpenAI(): llm.chat.completions.create(...)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create, acreate=self.acreate))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def create(self, **payload) -> SimpleNamespace:
+        """Synchronous chat completion"""
+        started = time.perf_counter()
+        key = self._request_key(payload)
+
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            return self._finish(cached, payload, started, "cache", 0)
+
+        with self._lock:
+            leader_future = self._inflight.get(key)
+            is_leader = leader_future is None
+            if is_leader:
+                # A leader may have cached its response and left since the check above
+                cached = self.cache.get(key) if self.cache else None
+                if cached is None:
+                    leader_future = self._inflight[key] = Future()
+        if is_leader and cached is not None:
+            return self._finish(cached, payload, started, "cache", 0)
+
+        if not is_leader:
+            body, _ = leader_future.result()
+            return self._finish(body, payload, started, "coalesced", 0)
+
+        try:
+            body, attempts = self._post_with_retries(payload)
+            # Cached before the in-flight entry goes, so a late duplicate finds one or the other
+            if self.cache:
+                self.cache.put(key, body)
+            leader_future.set_result((body, attempts))
+        except BaseException as e:
+            leader_future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return self._finish(body, payload, started, "upstream", attempts)
+
+    async def acreate(self, **payload) -> SimpleNamespace:
+        """Asynchronous chat completion (coalesces identical requests on the same event loop)"""
+        started = time.perf_counter()
+        key = self._request_key(payload)
+
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            return self._finish(cached, payload, started, "cache", 0)
+
+        session = self._loop_session()
+        leader_future = session.inflight.get(key)
+        if leader_future is not None:
+            body, _ = await asyncio.shield(leader_future)
+            return self._finish(body, payload, started, "coalesced", 0)
+
+        leader_future = session.inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            body, attempts = await self._apost_with_retries(session.http, payload)
+            if self.cache:
+                self.cache.put(key, body)
+            leader_future.set_result((body, attempts))
+        except BaseException as e:
+            leader_future.set_exception(e)
+            # Mark retrieved so a leader failure with no followers doesn't log a warning
+            leader_future.exception()
+            raise
+        finally:
+            session.inflight.pop(key, None)
+        return self._finish(body, payload, started, "upstream", attempts)
+
+    def summary(self) -> Dict[str, float]:
+        """Aggregate metrics over the recent call window"""
+        calls = list(self.metrics)
+        if not calls:
+            return {"calls": 0}
+        latencies = sorted(m.latency for m in calls)
+        return {
+            "calls": len(calls),
+            "upstream_calls": sum(m.source == "upstream" for m in calls),
+            "cache_hits": sum(m.source == "cache" for m in calls),
+            "coalesced": sum(m.source == "coalesced" for m in calls),
+            "retries": sum(max(m.attempts - 1, 0) for m in calls),
+            "p50_latency_ms": latencies[len(latencies) // 2] * 1000,
+            "p95_latency_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+            "total_tokens": sum(m.total_tokens for m in calls),
+        }
+
+    def close(self):
+        self._http.close()
+
+    async def aclose(self):
+        """Close the async session of the running event loop"""
+        with self._lock:
+            session = self._loop_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.http.aclose()
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _request_key(payload: Dict) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.replace(".", "", 1).isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt)
+
+    def _post_with_retries(self, payload: Dict) -> Tuple[Dict, int]:
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self._http.post("/chat/completions", json=payload)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json(), attempt + 1
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            time.sleep(self._retry_delay(attempt, response))
+
+    def _loop_session(self) -> _LoopSession:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._loop_sessions.get(loop)
+            if session is None:
+                http = httpx.AsyncClient(base_url=self._base_url, headers=self._headers,
+                                         timeout=self._timeout, limits=self._limits)
+                session = self._loop_sessions[loop] = _LoopSession(http)
+        return session
+
+    async def _apost_with_retries(self, http: httpx.AsyncClient, payload: Dict) -> Tuple[Dict, int]:
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await http.post("/chat/completions", json=payload)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json(), attempt + 1
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+    def _finish(self, body: Dict, payload: Dict, started: float, source: str, attempts: int) -> SimpleNamespace:
+        usage = body.get("usage") or {}
+        metrics = CallMetrics(
+            model=body.get("model", payload.get("model", "")),
+            latency=time.perf_counter() - started,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0),
+            source=source,
+            attempts=attempts,
+        )
+        self.metrics.append(metrics)
+        if self.on_metrics:
+            self.on_metrics(metrics)
+        return _to_namespace(body)
+
+
+# ============================================================================
+# DEMONSTRATION AGAINST A LOCAL MOCK SERVER
+# ============================================================================
+
+def demonstrate_client():
+    """Exercise pooling, single-flight, caching, retries and async against a mock server"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from mock_openai_server import MockOpenAIServer
+
+    def ask(text: str) -> Dict:
+        return {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": text}]}
+
+    print("=== LLM CLIENT ADAPTER DEMONSTRATION ===\n")
+
+    with MockOpenAIServer(latency=0.05) as server, LLMClient(base_url=server.base_url, api_key="test") as llm:
+        for i in range(10):
+            llm.chat.completions.create(**ask(f"question {i}"))
+        print(f"Pooling:       10 sequential calls over {server.connection_count} TCP connection(s)")
+
+        before = server.request_count
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: llm.chat.completions.create(**ask("same question")), range(8)))
+        print(f"Single-flight: 8 concurrent identical calls -> {server.request_count - before} upstream call(s)")
+
+    with MockOpenAIServer(latency=0.05) as server, \
+            LLMClient(base_url=server.base_url, api_key="test", cache_ttl=60) as llm:
+        for _ in range(5):
+            llm.chat.completions.create(**ask("cached question"))
+        print(f"Cache:         5 repeated calls -> {server.request_count} upstream call(s)")
+
+    with MockOpenAIServer(fail_first=2) as server, \
+            LLMClient(base_url=server.base_url, api_key="test", backoff=0.01) as llm:
+        response = llm.chat.completions.create(**ask("flaky"))
+        print(f"Retries:       {llm.metrics[-1].attempts} attempts -> {response.choices[0].message.content!r}")
+
+    async def run_async(llm: LLMClient):
+        questions = [ask(f"async {i % 4}") for i in range(12)]
+        started = time.perf_counter()
+        await asyncio.gather(*(llm.chat.completions.acreate(**q) for q in questions))
+        await llm.aclose()
+        return time.perf_counter() - started
+
+    with MockOpenAIServer(latency=0.05) as server, LLMClient(base_url=server.base_url, api_key="test") as llm:
+        elapsed = asyncio.run(run_async(llm))
+        print(f"Async:         12 calls (4 distinct) in {elapsed * 1000:.0f} ms -> "
+              f"{server.request_count} upstream call(s)")
+        print(f"\nMetrics summary: {llm.summary()}")
+
+
+if __name__ == "__main__":
+    demonstrate_client()
@@ -0,0 +1,133 @@
+"""
+Local mock of the OpenAI chat-completions endpoint.
+Lets the client adapter and agents be exercised offline against a real HTTP server.
+
+    with MockOpenAIServer(latency=0.05) as server:
+        client = LLMClient(base_url=server.base_url, api_key="test")
+        client.chat.completions.create(model="gpt-3.5-turbo", messages=[...])
+        print(server.request_count, server.connection_count)
+
+`reply` returns the assistant's text, or a full assistant message dict (for example
+one carrying `tool_calls`) when the caller needs tool-calling turns.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Union
+
+
+def echo_reply(payload: Dict) -> str:
+    """Default reply: echo the last message back"""
+    messages = payload.get("messages", [])
+    last = messages[-1]["content"] if messages else ""
+    return f"Echo: {last}"
+
+
+class MockOpenAIServer:
+    """Threaded HTTP/1.1 server answering POST /v1/chat/completions"""
+
+    def __init__(self, latency: float = 0.0, reply: Callable[[Dict], Union[str, Dict]] = echo_reply,
+                 fail_first: int = 0, fail_status: int = 503):
+        self.latency = latency
+        self.reply = reply
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.request_count = 0
+        self.requests: List[Dict] = []
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def connection_count(self) -> int:
+        """Distinct TCP connections seen so far (1 for a fully pooled sequential client)"""
+        return len(self._clients)
+
+    def start(self) -> "MockOpenAIServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _record(self, client_address, payload: Dict) -> int:
+        with self._lock:
+            self._clients.add(client_address)
+            self.request_count += 1
+            self.requests.append(payload)
+            return self.request_count
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+
+                number = server._record(self.client_address, payload)
+                if server.latency:
+                    time.sleep(server.latency)
+                if number <= server.fail_first:
+                    self._send(server.fail_status, {"error": {"message": "Injected failure"}})
+                    return
+
+                reply = server.reply(payload)
+                message = reply if isinstance(reply, dict) else {"role": "assistant", "content": reply}
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in payload.get("messages", []))
+                completion_tokens = len(str(message.get("content") or "").split())
+                self._send(200, {
+                    "id": f"chatcmpl-mock-{number}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": payload.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "message": message,
+                        "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                })
+
+            def _send(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
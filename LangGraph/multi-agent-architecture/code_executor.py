@@ -0,0 +1,362 @@
+"""
+Sandboxed Code Executor
+Warm pool of worker processes that run the coder agent's Python snippets.
+
+PythonREPLTool runs `exec` inside the host interpreter: every request shares the same
+globals, a runaway snippet blocks the caller (and any event loop it runs on), and a
+crash takes the notebook down with it. WorkerPool moves execution out of process:
+
+- Warm workers: started from a fork server that has already imported the preload
+  modules (math, numpy, pandas), so a new worker is a fork, not a fresh interpreter
+- Isolation: each call gets fresh globals; nothing leaks between requests
+- Limits: per-call CPU time and address-space limits via setrlimit (POSIX), plus a
+  wall-clock timeout enforced by the parent
+- Streaming: stdout/stderr chunks are sent back as they are written
+- Recycling: a worker is replaced after `max_uses` calls, a crash, a timeout or a
+  CPU-limit hit; the replacement is started straight away so the pool stays warm
+
+    pool = WorkerPool(size=2, cpu_seconds=5, memory_mb=512)
+    python_repl_tool = sandboxed_python_tool(pool)
+    pool.run("print(sum(range(10)))").output   # '45\\n'
+"""
+
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Sequence, Set
+
+try:
+    import resource
+except ImportError:  # Windows: no setrlimit, only the wall-clock timeout applies
+    resource = None
+
+DEFAULT_PRELOAD = ("math", "numpy", "pandas")
+
+
+@dataclass
+class ExecutionResult:
+    output: str
+    error: Optional[str]    # formatted exception, or why the worker was stopped
+    elapsed: float
+    pid: int
+    recycled: bool = False  # the worker was replaced after this call
+
+    def __str__(self) -> str:
+        return self.output + (self.error or "")
+
+
+class CPUTimeExceeded(Exception):
+    pass
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+class _PipeWriter:
+    """File-like object forwarding writes to the parent as ("out", text) messages"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def write(self, text: str) -> int:
+        if text:
+            self.conn.send(("out", text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _on_cpu_limit(signum, frame):
+    raise CPUTimeExceeded("CPU time limit exceeded")
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _address_space() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _worker_main(conn, preload: Sequence[str], cpu_seconds: Optional[float], memory_mb: Optional[int]):
+    modules = {}
+    for name in preload:
+        try:
+            modules[name] = __import__(name)
+        except ImportError:
+            pass
+    if "numpy" in modules:
+        modules["np"] = modules["numpy"]
+    if "pandas" in modules:
+        modules["pd"] = modules["pandas"]
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        if memory_mb is not None:
+            # Measured after the imports, so the budget is for the snippet itself
+            limit = _address_space() + memory_mb * 1024 * 1024
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+    writer = _PipeWriter(conn)
+    sys.stdout = sys.stderr = writer
+    while True:
+        try:
+            code = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if code is None:
+            return
+
+        cpu_limited = resource is not None and cpu_seconds is not None
+        if cpu_limited:
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (int(_cpu_used() + cpu_seconds) + 1, hard))
+        error, fatal = None, False
+        try:
+            exec(compile(code, "<sandbox>", "exec"), {"__name__": "__main__", **modules})
+        except CPUTimeExceeded as exc:
+            error, fatal = f"{type(exc).__name__}: {exc}", True
+        except MemoryError:
+            error, fatal = "MemoryError: memory limit exceeded", True
+        except BaseException as exc:  # noqa: BLE001 - the snippet's errors are its output
+            error = "".join(traceback.format_exception_only(type(exc), exc))
+        finally:
+            if cpu_limited:
+                resource.setrlimit(resource.RLIMIT_CPU, (resource.RLIM_INFINITY, hard))
+        conn.send(("done", error, fatal))
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class _Worker:
+    def __init__(self, ctx, preload, cpu_seconds, memory_mb):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, preload, cpu_seconds, memory_mb), daemon=True)
+        self.process.start()
+        child.close()
+        self.uses = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """Pre-started worker processes executing snippets with limits and fresh globals"""
+
+    def __init__(self, size: int = 2, max_uses: int = 50, cpu_seconds: Optional[float] = 5.0,
+                 memory_mb: Optional[int] = 512, timeout: float = 30.0,
+                 preload: Sequence[str] = DEFAULT_PRELOAD):
+        self.size = size
+        self.max_uses = max_uses
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self.preload = tuple(preload)
+        self.recycled = 0
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._ctx = multiprocessing.get_context("forkserver")
+            self._ctx.set_forkserver_preload([name for name in self.preload if _importable(name)])
+        else:
+            self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers: Set[_Worker] = set()  # idle and busy, so close() can stop every one
+        for _ in range(size):
+            self._idle.put(self._start_worker())
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self._ctx, self.preload, self.cpu_seconds, self.memory_mb)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _stop_worker(self, worker: _Worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop()
+
+    def _acquire(self) -> _Worker:
+        while True:
+            if self._closed:
+                raise RuntimeError("WorkerPool is closed")
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def _release(self, worker: _Worker, recycle: bool):
+        if self._closed:
+            self._stop_worker(worker)
+            return
+        if recycle or worker.uses >= self.max_uses or not worker.process.is_alive():
+            self._stop_worker(worker)
+            with self._lock:
+                self.recycled += 1
+            worker = self._start_worker()
+        self._idle.put(worker)
+
+    def stream(self, code: str) -> Iterator[str]:
+        """Yield output chunks as the snippet writes them; the generator's return value is the ExecutionResult"""
+        worker = self._acquire()
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        chunks, error, recycle = [], None, False
+        try:
+            worker.uses += 1
+            worker.conn.send(code)
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    error, recycle = f"TimeoutError: no result after {self.timeout:.0f} s", True
+                    break
+                message = worker.conn.recv()
+                if message[0] == "out":
+                    chunks.append(message[1])
+                    yield message[1]
+                else:
+                    _, error, recycle = message
+                    break
+        except (EOFError, OSError, ValueError):
+            worker.process.join(1)
+            error, recycle = f"WorkerCrashed: exit code {worker.process.exitcode}", True
+        except GeneratorExit:
+            # Abandoned mid-run: the worker may still be executing, with unread output in its pipe
+            recycle = True
+            raise
+        finally:
+            pid = worker.process.pid
+            self._release(worker, recycle)
+        return ExecutionResult("".join(chunks), error, time.perf_counter() - started, pid, recycle)
+
+    def run(self, code: str, on_output: Optional[Callable[[str], None]] = None) -> ExecutionResult:
+        stream = self.stream(code)
+        while True:
+            try:
+                chunk = next(stream)
+            except StopIteration as done:
+                return done.value
+            if on_output is not None:
+                on_output(chunk)
+
+    async def arun(self, code: str) -> ExecutionResult:
+        """Run without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.run, code)
+
+    def close(self):
+        """Stop every worker, including ones still running a snippet (their run reports a crash)"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for worker in workers:
+            self._stop_worker(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _importable(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def sandboxed_python_tool(pool: WorkerPool):
+    """Drop-in replacement for PythonREPLTool backed by the pool"""
+    from langchain_core.tools import tool
+
+    @tool
+    def python_repl(code: str) -> str:
+        """A Python shell. Use this to execute python commands. Input should be a valid python command.
+        If you want to see the output of a value, you should print it out with `print(...)`.
+        Each call starts with fresh globals; math, numpy (np) and pandas (pd) are already imported."""
+        return str(pool.run(code))
+
+    return python_repl
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+FIBONACCI = """
+def fibonacci(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+print(fibonacci(20))
+"""
+
+
+def benchmark(runs: int = 20):
+    """Cold start (new interpreter per snippet) vs the warm pool, plus the limits and recycling"""
+    import subprocess
+
+    preload = "import math, numpy, pandas\n"
+    print(f"=== CODE EXECUTION: Fibonacci snippet, {runs} runs ===")
+
+    started = time.perf_counter()
+    for _ in range(max(runs // 4, 1)):
+        output = subprocess.run([sys.executable, "-c", preload + FIBONACCI], capture_output=True, text=True).stdout
+    cold = (time.perf_counter() - started) / max(runs // 4, 1)
+    print(f"Cold start (new interpreter + imports): {cold * 1000:8.1f} ms/run  -> {output.strip()}")
+
+    started = time.perf_counter()
+    pool = WorkerPool(size=2, max_uses=10)
+    print(f"Pool start (2 workers):                 {(time.perf_counter() - started) * 1000:8.1f} ms once")
+    pool.run("pass"), pool.run("pass")
+    started = time.perf_counter()
+    for _ in range(runs):
+        result = pool.run(FIBONACCI)
+    warm = (time.perf_counter() - started) / runs
+    print(f"Warm pool:                              {warm * 1000:8.1f} ms/run  -> {result.output.strip()} "
+          f"({cold / warm:.0f}x faster, {pool.recycled} workers recycled at max_uses=10)")
+
+    pool.run("leaked = 42")
+    print(f"Isolation:   {pool.run('print(leaked)').error.strip()}")
+    ticks = "import time\nfor i in range(3):\n    print(i)\n    time.sleep(0.05)"
+    arrivals = []
+    started = time.perf_counter()
+    pool.run(ticks, on_output=lambda chunk: arrivals.append(time.perf_counter() - started))
+    print(f"Streaming:   chunks arrived at {', '.join(f'{t * 1000:.0f}' for t in arrivals)} ms")
+    if resource is not None:
+        with WorkerPool(size=1, cpu_seconds=1, preload=()) as limited:
+            print(f"CPU limit:   {limited.run('while True: pass').error}")
+        print(f"Memory:      {pool.run('x = bytearray(2 * 1024 ** 3)').error}")
+    crash = pool.run("import os; os._exit(3)")
+    print(f"Crash:       {crash.error} (recycled: {crash.recycled}); next run: {pool.run('print(1 + 1)').output.strip()}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,210 @@
+"""
+Routing Layer
+Cheaper routing decisions for the supervisor and validator nodes.
+
+Every supervisor and validator hop used to be a with_structured_output LLM call just to
+pick `next`. RoutingLayer answers from the cheapest tier that can:
+
+1. budget     the run has used `max_hops` hops: stop instead of asking anyone
+2. heuristic  obvious routes decided locally (a request that is only an arithmetic
+              expression goes to the coder, and the coder's answer to it is accepted
+              when it parses as a number)
+3. cache      the same decision point seen before: memoised on a fingerprint of the
+              node, the original request and the last `window` messages
+4. llm        the structured-output call, whose result is then cached
+
+Every decision is reported to `on_decision` with its source and latency, and kept in
+`decisions` for summaries.
+
+    router = RoutingLayer(max_hops=12, on_decision=print)
+    app, metrics = build_supervisor_workflow(llm, [tavily_search], [python_repl_tool], router=router)
+"""
+
+import ast
+import hashlib
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+LEAD_IN = re.compile(r"^(what is|what's|calculate|compute|evaluate)\s+", re.IGNORECASE)
+ARITHMETIC = re.compile(r"^[\d\s.+\-*/^%()x×÷]+$")
+NUMBER = re.compile(r"^[-+]?\d[\d,]*(\.\d+)?([eE][-+]?\d+)?$")
+FAILURE = re.compile(r"error|traceback|exception", re.IGNORECASE)
+ARITHMETIC_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.operator, ast.unaryop)
+SPECIALISTS = {"supervisor", "validator", "enhancer", "researcher", "coder"}
+
+
+@dataclass
+class RoutingDecision:
+    node: str                      # "supervisor" or "validator"
+    source: str                    # budget, heuristic, cache or llm
+    latency: float
+    response: Optional[BaseModel]  # None when the hop budget stopped the run
+
+
+def _text(message: Any) -> str:
+    if isinstance(message, dict):
+        return str(message.get("content", ""))
+    if isinstance(message, tuple):
+        return str(message[1])
+    return str(getattr(message, "content", message))
+
+
+def _speaker(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("name") or message.get("role", "")
+    if isinstance(message, tuple):
+        return message[0]
+    return getattr(message, "name", None) or getattr(message, "type", "")
+
+
+def is_computation(question: str) -> bool:
+    """True only when the request is an arithmetic expression, optionally led by "what is" and the like"""
+    expression = LEAD_IN.sub("", question.strip()).rstrip("?= ").strip()
+    if not ARITHMETIC.match(expression):
+        return False
+    expression = expression.replace("^", "**").replace("×", "*").replace("x", "*").replace("÷", "/")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        return False
+    nodes = list(ast.walk(tree))
+    return (all(isinstance(node, ARITHMETIC_NODES) for node in nodes)
+            and all(isinstance(node.value, (int, float)) for node in nodes if isinstance(node, ast.Constant))
+            and any(isinstance(node, ast.BinOp) for node in nodes))
+
+
+def numeric_result(text: str) -> bool:
+    """True when a reply is a bare number, optionally after a label ("Computed: 6765")"""
+    text = text.strip()
+    return not FAILURE.search(text) and bool(NUMBER.match(text.rsplit(":", 1)[-1].strip()))
+
+
+def hops_used(messages: Sequence[Any]) -> int:
+    return sum(1 for m in messages if _speaker(m) in SPECIALISTS)
+
+
+class RoutingLayer:
+    """Budget, heuristic and memoisation tiers in front of the routing LLM calls"""
+
+    def __init__(self, window: int = 4, cache_size: int = 1024, max_hops: Optional[int] = 12,
+                 heuristics: bool = True, on_decision: Optional[Callable[[RoutingDecision], None]] = None,
+                 history: int = 1000):
+        self.window = window
+        self.cache_size = cache_size
+        self.max_hops = max_hops
+        self.heuristics = heuristics
+        self.on_decision = on_decision
+        self.decisions: Deque[RoutingDecision] = deque(maxlen=history)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fingerprint(self, node: str, messages: Sequence[Any]) -> str:
+        digest = hashlib.sha256(node.encode())
+        for message in list(messages[:1]) + list(messages[1:][-self.window:]):
+            digest.update(b"\0" + _speaker(message).encode() + b"\0" + _text(message).encode())
+        return digest.hexdigest()
+
+    def heuristic(self, node: str, messages: Sequence[Any]) -> Optional[Dict[str, Any]]:
+        """Routes that need no model: fields for the node's schema, or None"""
+        question = _text(messages[0]) if messages else ""
+        if not is_computation(question):
+            return None
+        if node == "supervisor" and hops_used(messages) == 0:
+            return {"next": "coder", "reason": "Computation request: routed straight to the coder."}
+        if node == "validator" and _speaker(messages[-1]) == "coder" and numeric_result(_text(messages[-1])):
+            return {"next": "FINISH", "reason": "The coder returned a numeric result for an arithmetic request."}
+        return None
+
+    def route(self, node: str, schema: Type[BaseModel], messages: Sequence[Any],
+              decide: Callable[[], BaseModel]) -> RoutingDecision:
+        """Decide the next step at `node`; `decide` is the LLM call, used only as a last resort"""
+        started = time.perf_counter()
+        response, source = None, "budget"
+
+        if self.max_hops is None or hops_used(messages) < self.max_hops:
+            fields = self.heuristic(node, messages) if self.heuristics else None
+            if fields is not None:
+                response, source = schema(**fields), "heuristic"
+            else:
+                key = self.fingerprint(node, messages)
+                with self._lock:
+                    cached = self._cache.get(key)
+                    if cached is not None:
+                        self._cache.move_to_end(key)
+                if cached is not None:
+                    response, source = schema(**cached), "cache"
+                else:
+                    response, source = decide(), "llm"
+                    with self._lock:
+                        self._cache[key] = response.model_dump()
+                        while len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+
+        decision = RoutingDecision(node, source, time.perf_counter() - started, response)
+        self.decisions.append(decision)
+        if self.on_decision is not None:
+            self.on_decision(decision)
+        return decision
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and mean latency (ms) of the recorded decisions, per source"""
+        counts = Counter(d.source for d in self.decisions)
+        totals = Counter()
+        for d in self.decisions:
+            totals[d.source] += d.latency
+        return {source: {"count": counts[source], "mean_ms": 1000 * totals[source] / counts[source]}
+                for source in counts}
+
+
+def compare_routing(latency: float = 0.02):
+    """Routing calls and latency per source with the fake LLM, plus a run stopped by the hop budget"""
+    import warnings
+
+    from langchain_core.tools import tool
+
+    from supervisor_workflow import _scripted_workflow_llm, build_supervisor_workflow
+
+    warnings.filterwarnings("ignore", message="create_react_agent has been moved")
+
+    @tool
+    def fake_search(query: str) -> str:
+        """Search the web"""
+        return f"two results for {query}"
+
+    @tool
+    def fake_python(code: str) -> str:
+        """Run Python code"""
+        return "6765"
+
+    requests = ["Quantum Entanglement", "Give me the 20th fibonacci number?", "What is 12 * (7 + 5)?",
+                "Quantum Entanglement", "Give me the 20th fibonacci number?", "Quantum Entanglement"]
+
+    print(f"=== ROUTING LAYER: {len(requests)} requests, fake LLM with {latency * 1000:.0f} ms per call ===")
+    for label, router in [("LLM routing only", None), ("routing layer", RoutingLayer())]:
+        llm = _scripted_workflow_llm(latency, parallel=False)
+        app, metrics = build_supervisor_workflow(llm, [fake_search], [fake_python], router=router)
+        started = time.perf_counter()
+        for request in requests:
+            app.invoke({"messages": [("user", request)]})
+        elapsed = time.perf_counter() - started
+        print(f"{label:<18} {elapsed:6.2f} s, {llm.calls} LLM calls, {metrics.summary()['hops']} hops")
+        if router is not None:
+            for source, stats in sorted(router.summary().items()):
+                print(f"  {source:<10} {stats['count']:>3} decisions, {stats['mean_ms']:7.3f} ms mean")
+
+    looping = _scripted_workflow_llm(latency, parallel=False, finish=False)
+    router = RoutingLayer(max_hops=10)
+    app, _ = build_supervisor_workflow(looping, [fake_search], [fake_python], router=router)
+    result = app.invoke({"messages": [("user", "Quantum Entanglement")]})
+    print(f"Validator that never accepts: stopped after {hops_used(result['messages']) - 1} hops "
+          f"by the budget ({router.decisions[-1].source})")
+
+
+if __name__ == "__main__":
+    compare_routing()
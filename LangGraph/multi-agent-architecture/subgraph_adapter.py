@@ -0,0 +1,270 @@
+"""
+Subgraph Adapter
+Runs a compiled subgraph as a node of a parent graph with a different state schema.
+
+The subgraphs notebook does the schema translation by hand inside the node: build a
+fresh subgraph state, invoke, and copy the result back. Shared-schema parents go
+further and hand the subgraph their whole state, message history included, on every
+hop. SubgraphAdapter declares the mapping once:
+
+- inputs:  subgraph key -> parent key (passed by reference) or a function of a
+  read-only view exposing only the declared parent keys (`reads`)
+- outputs: parent key -> subgraph key or a function of the subgraph result
+- The subgraph is compiled once and shared by every call and thread
+- Fan-out: `map` runs many subgraph instances concurrently through the compiled
+  graph's batch API
+
+    search_agent = SubgraphAdapter(
+        search_app,
+        inputs={"messages": to_human_message("query")},
+        outputs={"response": last_message_content()},
+    )
+    parent_graph.add_node("search_agent", search_agent)
+    search_agent.map([{"query": q} for q in questions], max_concurrency=10)
+"""
+
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+InputSpec = Union[str, Callable[[Mapping[str, Any]], Any]]
+OutputSpec = Union[str, Callable[[Mapping[str, Any]], Any]]
+
+
+class StateView(Mapping):
+    """Read-only window onto the declared keys of a parent state; nothing is copied"""
+
+    __slots__ = ("_state", "_keys")
+
+    def __init__(self, state: Mapping[str, Any], keys: frozenset):
+        self._state = state
+        self._keys = keys
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(f"{key!r} is not declared in the adapter's reads")
+        return self._state[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self._state if key in self._keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def to_human_message(key: str) -> Callable[[Mapping[str, Any]], List[HumanMessage]]:
+    """Input mapping: the parent's `key` as a one-message conversation"""
+    def build(view: Mapping[str, Any]) -> List[HumanMessage]:
+        return [HumanMessage(content=view[key])]
+    build.reads = (key,)
+    return build
+
+
+def last_message_content(key: str = "messages") -> Callable[[Mapping[str, Any]], Any]:
+    """Output mapping: content of the subgraph's final message"""
+    def read(result: Mapping[str, Any]) -> Any:
+        return result[key][-1].content
+    return read
+
+
+@dataclass
+class AdapterStats:
+    calls: int = 0
+    time: float = 0.0
+    bytes_in: int = 0       # serialized size of the subgraph inputs (when measuring)
+    bytes_out: int = 0      # serialized size of the values written back to the parent
+
+    def per_call(self) -> Dict[str, float]:
+        calls = max(self.calls, 1)
+        return {"bytes_in": self.bytes_in / calls, "bytes_out": self.bytes_out / calls,
+                "ms": 1000 * self.time / calls}
+
+
+class SubgraphAdapter:
+    """Parent-graph node that maps declared keys into and out of a shared compiled subgraph"""
+
+    def __init__(self, subgraph, inputs: Dict[str, InputSpec], outputs: Dict[str, OutputSpec],
+                 reads: Optional[Sequence[str]] = None, measure: bool = False):
+        # Accept an uncompiled StateGraph, but compile it exactly once
+        self.subgraph = subgraph if hasattr(subgraph, "invoke") else subgraph.compile()
+        self.inputs = dict(inputs)
+        self.outputs = dict(outputs)
+        if reads is None:
+            # Parent keys named directly, plus those declared by helpers like to_human_message
+            reads = [key for spec in self.inputs.values()
+                     for key in ([spec] if isinstance(spec, str) else getattr(spec, "reads", ()))]
+        self.reads = frozenset(reads)
+        self.measure = measure
+        self.stats = AdapterStats()
+        self._lock = threading.Lock()
+
+    def subgraph_input(self, state: Mapping[str, Any]) -> Dict[str, Any]:
+        view = StateView(state, self.reads)
+        return {key: view[spec] if isinstance(spec, str) else spec(view) for key, spec in self.inputs.items()}
+
+    def parent_update(self, result: Mapping[str, Any]) -> Dict[str, Any]:
+        return {key: result[spec] if isinstance(spec, str) else spec(result) for key, spec in self.outputs.items()}
+
+    def _record(self, started: float, inputs: Sequence[Dict[str, Any]], updates: Sequence[Dict[str, Any]]):
+        elapsed = time.perf_counter() - started
+        sizes = (sum(len(pickle.dumps(i)) for i in inputs), sum(len(pickle.dumps(u)) for u in updates)) \
+            if self.measure else (0, 0)
+        with self._lock:
+            self.stats.calls += len(inputs)
+            self.stats.time += elapsed
+            self.stats.bytes_in += sizes[0]
+            self.stats.bytes_out += sizes[1]
+
+    def __call__(self, state: Mapping[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        subgraph_input = self.subgraph_input(state)
+        update = self.parent_update(self.subgraph.invoke(subgraph_input, config))
+        self._record(started, [subgraph_input], [update])
+        return update
+
+    invoke = __call__
+
+    async def ainvoke(self, state: Mapping[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        subgraph_input = self.subgraph_input(state)
+        update = self.parent_update(await self.subgraph.ainvoke(subgraph_input, config))
+        self._record(started, [subgraph_input], [update])
+        return update
+
+    def map(self, states: Sequence[Mapping[str, Any]], max_concurrency: int = 10,
+            config: Optional[RunnableConfig] = None) -> List[Dict[str, Any]]:
+        """Fan out: one subgraph run per parent state, up to `max_concurrency` at a time"""
+        started = time.perf_counter()
+        inputs = [self.subgraph_input(state) for state in states]
+        results = self.subgraph.batch(inputs, {**(config or {}), "max_concurrency": max_concurrency})
+        updates = [self.parent_update(result) for result in results]
+        self._record(started, inputs, updates)
+        return updates
+
+    def fan_out_node(self, list_key: str, item_key: str, results_key: str,
+                     max_concurrency: int = 10) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+        """Parent node running the subgraph once per item of `state[list_key]`
+
+        Each item is presented to the input mapping as `item_key`; `results_key` receives
+        the output updates in item order.
+        """
+        def node(state: Mapping[str, Any]) -> Dict[str, Any]:
+            return {results_key: self.map([{item_key: item} for item in state[list_key]], max_concurrency)}
+        return node
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def build_search_subgraph(llm, tools: Sequence[Any]):
+    """The notebook's child graph: an agent node looping through a ToolNode until it answers"""
+    from typing import Annotated, TypedDict
+
+    from langgraph.graph import END, StateGraph, add_messages
+    from langgraph.prebuilt import ToolNode
+
+    class ChildState(TypedDict):
+        messages: Annotated[list, add_messages]
+
+    llm_with_tools = llm.bind_tools(tools=tools)
+
+    def agent(state: ChildState):
+        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+
+    def tools_router(state: ChildState):
+        last_message = state["messages"][-1]
+        return "tool_node" if getattr(last_message, "tool_calls", None) else END
+
+    subgraph = StateGraph(ChildState)
+    subgraph.add_node("agent", agent)
+    subgraph.add_node("tool_node", ToolNode(tools=tools))
+    subgraph.set_entry_point("agent")
+    subgraph.add_conditional_edges("agent", tools_router, {"tool_node": "tool_node", END: END})
+    subgraph.add_edge("tool_node", "agent")
+    return subgraph.compile()
+
+
+def benchmark(latency: float = 0.05, queries: int = 10, history: int = 40):
+    """Bytes handed to the subgraph per call and fan-out throughput with the fake LLM"""
+    from typing import Annotated, TypedDict
+
+    from langchain_core.messages import AIMessage, ToolMessage
+    from langchain_core.tools import tool
+    from langgraph.graph import END, START, StateGraph, add_messages
+
+    # fake_chat_model.py is in LangGraph/: run as `PYTHONPATH=.. python subgraph_adapter.py`
+    from fake_chat_model import ScriptedChatModel, tool_call
+
+    @tool
+    def fake_search(query: str) -> str:
+        """Search the web"""
+        return f"Two results about {query}"
+
+    def respond(messages, tools):
+        if isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=f"Answer: {messages[-1].content}")
+        return tool_call("fake_search", {"query": messages[-1].content})
+
+    search_app = build_search_subgraph(ScriptedChatModel(respond=respond, latency=latency), [fake_search])
+
+    # A parent that carries a conversation history alongside the query
+    class ParentState(TypedDict):
+        messages: Annotated[list, add_messages]
+        query: str
+        response: str
+
+    conversation = [HumanMessage(content=f"Earlier turn {i}: " + "context " * 60) for i in range(history)]
+    questions = [f"What is topic {i}?" for i in range(queries)]
+
+    def shared_schema(state: ParentState):
+        # Shared-schema style: the subgraph receives the whole message history
+        result = search_app.invoke({"messages": state["messages"] + [HumanMessage(content=state["query"])]})
+        return {"response": result["messages"][-1].content}
+
+    adapter = SubgraphAdapter(search_app, inputs={"messages": to_human_message("query")},
+                              outputs={"response": last_message_content()}, measure=True)
+
+    print(f"=== SUBGRAPH ADAPTER: {queries} queries, {history}-message parent history, "
+          f"{latency * 1000:.0f} ms fake LLM ===")
+    full_input = {"messages": conversation + [HumanMessage(content=questions[0])]}
+    print(f"Bytes handed to the subgraph per call: full state {len(pickle.dumps(full_input)):,} "
+          f"vs mapped keys {len(pickle.dumps(adapter.subgraph_input({'query': questions[0]}))):,}")
+
+    for label, node in [("shared schema", shared_schema), ("adapter", adapter)]:
+        graph = StateGraph(ParentState)
+        graph.add_node("search_agent", node)
+        graph.add_edge(START, "search_agent")
+        graph.add_edge("search_agent", END)
+        parent_app = graph.compile()
+        started = time.perf_counter()
+        for question in questions:
+            parent_app.invoke({"messages": conversation, "query": question, "response": ""})
+        elapsed = time.perf_counter() - started
+        print(f"Sequential, {label:<14} {elapsed:6.2f} s  ({queries / elapsed:5.1f} queries/s)")
+
+    class FanOutState(TypedDict):
+        queries: List[str]
+        responses: List[Dict[str, Any]]
+
+    graph = StateGraph(FanOutState)
+    graph.add_node("search_all", adapter.fan_out_node("queries", "query", "responses", max_concurrency=queries))
+    graph.add_edge(START, "search_all")
+    graph.add_edge("search_all", END)
+    fan_out_app = graph.compile()
+    started = time.perf_counter()
+    result = fan_out_app.invoke({"queries": questions, "responses": []})
+    elapsed = time.perf_counter() - started
+    print(f"Fan-out, adapter.map       {elapsed:6.2f} s  ({queries / elapsed:5.1f} queries/s), "
+          f"{len(result['responses'])} answers")
+    per_call = adapter.stats.per_call()
+    print(f"Adapter per call: {per_call['bytes_in']:.0f} bytes in, {per_call['bytes_out']:.0f} bytes out")
+
+
+if __name__ == "__main__":
+    benchmark()
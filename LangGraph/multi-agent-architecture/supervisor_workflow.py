@@ -0,0 +1,432 @@
+"""
+Supervisor Multi-agent Workflow
+The supervisor_multiagent_workflow notebook as a reusable module.
+
+A supervisor LLM routes each request to a specialist (prompt enhancer, researcher or
+coder) and a validator decides when the answer is good enough. Compared with the
+notebook:
+
+- Agent pool: the researcher and coder ReAct agents are compiled once and reused on
+  every hop instead of being rebuilt inside the node body
+- Parallel branches: when the supervisor sets `parallel`, the enhancer and researcher
+  run in the same superstep and the validator sees both results
+- Instrumentation: graph-construction time and LLM time are tracked separately, along
+  with the wall time of every hop
+- Routing: an optional RoutingLayer (routing.py) answers supervisor and validator
+  decisions from a hop budget, local heuristics or a memo before calling the LLM
+
+    app, metrics = build_supervisor_workflow(ChatOpenAI(model="gpt-4o"), [tavily_search], [python_repl_tool])
+    app.invoke({"messages": [("user", "Quantum Entanglement")]})
+    print(metrics.summary())
+"""
+
+import functools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import create_react_agent
+from langgraph.types import Command
+from pydantic import BaseModel, Field
+
+# ============================================================================
+# PROMPTS AND SCHEMAS
+# ============================================================================
+
+SUPERVISOR_PROMPT = '''
+
+        You are a workflow supervisor managing a team of three specialized agents: Prompt Enhancer, Researcher, and Coder. Your role is to orchestrate the workflow by selecting the most appropriate next agent based on the current state and needs of the task. Provide a clear, concise rationale for each decision to ensure transparency in your decision-making process.
+
+        **Team Members**:
+        1. **Prompt Enhancer**: Always consider this agent first. They clarify ambiguous requests, improve poorly defined queries, and ensure the task is well-structured before deeper processing begins.
+        2. **Researcher**: Specializes in information gathering, fact-finding, and collecting relevant data needed to address the user's request.
+        3. **Coder**: Focuses on technical implementation, calculations, data analysis, algorithm development, and coding solutions.
+
+        **Your Responsibilities**:
+        1. Analyze each user request and agent response for completeness, accuracy, and relevance.
+        2. Route the task to the most appropriate agent at each decision point.
+        3. Maintain workflow momentum by avoiding redundant agent assignments.
+        4. Continue the process until the user's request is fully and satisfactorily resolved.
+
+        When the request needs both refinement and research that do not depend on each other, set `parallel` so the Prompt Enhancer and Researcher work at the same time.
+
+        Your objective is to create an efficient workflow that leverages each agent's strengths while minimizing unnecessary steps, ultimately delivering complete and accurate solutions to user requests.
+
+    '''
+
+ENHANCER_PROMPT = (
+    "You are a Query Refinement Specialist with expertise in transforming vague requests into precise instructions. Your responsibilities include:\n\n"
+    "1. Analyzing the original query to identify key intent and requirements\n"
+    "2. Resolving any ambiguities without requesting additional user input\n"
+    "3. Expanding underdeveloped aspects of the query with reasonable assumptions\n"
+    "4. Restructuring the query for clarity and actionability\n"
+    "5. Ensuring all technical terminology is properly defined in context\n\n"
+    "Important: Never ask questions back to the user. Instead, make informed assumptions and create the most comprehensive version of their request possible."
+)
+
+RESEARCHER_PROMPT = (
+    "You are an Information Specialist with expertise in comprehensive research. Your responsibilities include:\n\n"
+    "1. Identifying key information needs based on the query context\n"
+    "2. Gathering relevant, accurate, and up-to-date information from reliable sources\n"
+    "3. Organizing findings in a structured, easily digestible format\n"
+    "4. Citing sources when possible to establish credibility\n"
+    "5. Focusing exclusively on information gathering - avoid analysis or implementation\n\n"
+    "Provide thorough, factual responses without speculation where information is unavailable."
+)
+
+CODER_PROMPT = (
+    "You are a coder and analyst. Focus on mathematical calculations, analyzing, solving math questions, "
+    "and executing code. Handle technical problem-solving and data tasks."
+)
+
+VALIDATOR_PROMPT = '''
+    Your task is to ensure reasonable quality.
+    Specifically, you must:
+    - Review the user's question (the first message in the workflow).
+    - Review the answer (the last message in the workflow).
+    - If the answer addresses the core intent of the question, even if not perfectly, signal to end the workflow with 'FINISH'.
+    - Only route back to the supervisor if the answer is completely off-topic, harmful, or fundamentally misunderstands the question.
+
+    - Accept answers that are "good enough" rather than perfect
+    - Prioritize workflow completion over perfect responses
+    - Give benefit of doubt to borderline answers
+
+    Routing Guidelines:
+    1. 'supervisor' Agent: ONLY for responses that are completely incorrect or off-topic.
+    2. Respond with 'FINISH' in all other cases to end the workflow.
+'''
+
+
+class Supervisor(BaseModel):
+    next: Literal["enhancer", "researcher", "coder"] = Field(
+        description="Determines which specialist to activate next in the workflow sequence: "
+                    "'enhancer' when user input requires clarification, expansion, or refinement, "
+                    "'researcher' when additional facts, context, or data collection is necessary, "
+                    "'coder' when implementation, computation, or technical problem-solving is required."
+    )
+    reason: str = Field(
+        description="Detailed justification for the routing decision, explaining the rationale behind selecting the particular specialist and how this advances the task toward completion."
+    )
+    parallel: bool = Field(
+        default=False,
+        description="True to run the enhancer and researcher at the same time when their work is independent."
+    )
+
+
+class Validator(BaseModel):
+    next: Literal["supervisor", "FINISH"] = Field(
+        description="Specifies the next worker in the pipeline: 'supervisor' to continue or 'FINISH' to terminate."
+    )
+    reason: str = Field(
+        description="The reason for the decision."
+    )
+
+
+class WorkflowState(MessagesState):
+    parallel: bool
+
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+@dataclass
+class WorkflowMetrics:
+    construction_time: float = 0.0   # building and compiling graphs (workflow and agents)
+    constructions: int = 0
+    llm_time: float = 0.0            # summed over calls, so parallel calls overlap
+    llm_calls: int = 0
+    hops: List[Tuple[str, float]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_construction(self, elapsed: float):
+        with self._lock:
+            self.construction_time += elapsed
+            self.constructions += 1
+
+    def add_llm_call(self, elapsed: float):
+        with self._lock:
+            self.llm_time += elapsed
+            self.llm_calls += 1
+
+    def add_hop(self, node: str, elapsed: float):
+        with self._lock:
+            self.hops.append((node, elapsed))
+
+    def reset(self):
+        with self._lock:
+            self.construction_time = self.llm_time = 0.0
+            self.constructions = self.llm_calls = 0
+            self.hops = []
+
+    def summary(self) -> Dict[str, Any]:
+        hop_time = sum(elapsed for _, elapsed in self.hops)
+        return {
+            "hops": len(self.hops),
+            "hop_time": hop_time,
+            "construction_time": self.construction_time,
+            "constructions": self.constructions,
+            "llm_time": self.llm_time,
+            "llm_calls": self.llm_calls,
+        }
+
+
+class LLMTimer(BaseCallbackHandler):
+    """Callback that adds the duration of every chat model call to WorkflowMetrics"""
+
+    def __init__(self, metrics: WorkflowMetrics):
+        self.metrics = metrics
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.metrics.add_llm_call(time.perf_counter() - started)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self.on_llm_end(None, run_id=run_id)
+
+
+# ============================================================================
+# AGENT POOL
+# ============================================================================
+
+class AgentPool:
+    """Specialist ReAct agents compiled once and shared by every hop and request
+
+    With prebuilt=False every get() builds a fresh agent, as the notebook's nodes did;
+    that mode only exists to measure the difference.
+    """
+
+    def __init__(self, llm, specs: Dict[str, Tuple[Sequence[Any], str]], metrics: WorkflowMetrics,
+                 prebuilt: bool = True):
+        self.llm = llm
+        self.specs = specs
+        self.metrics = metrics
+        self.prebuilt = prebuilt
+        self._agents: Dict[str, Any] = {}
+        if prebuilt:
+            for name in specs:
+                self._agents[name] = self._build(name)
+
+    def _build(self, name: str):
+        tools, prompt = self.specs[name]
+        started = time.perf_counter()
+        agent = create_react_agent(self.llm, tools=list(tools), prompt=prompt)
+        self.metrics.add_construction(time.perf_counter() - started)
+        return agent
+
+    def get(self, name: str):
+        return self._agents[name] if self.prebuilt else self._build(name)
+
+
+# ============================================================================
+# WORKFLOW
+# ============================================================================
+
+def build_supervisor_workflow(llm, research_tools: Sequence[Any], code_tools: Sequence[Any],
+                              prebuilt: bool = True, metrics: Optional[WorkflowMetrics] = None,
+                              verbose: bool = False, router=None):
+    """Compile the supervisor workflow; returns (app, metrics)
+
+    The app is bound to an LLMTimer, so every run updates `metrics`. With a `router`
+    (routing.RoutingLayer), supervisor and validator decisions go through it and a run
+    that exhausts its hop budget ends instead of looping.
+    """
+    metrics = metrics or WorkflowMetrics()
+    log: Callable[[str], None] = print if verbose else (lambda message: None)
+    started = time.perf_counter()
+
+    pool = AgentPool(llm, {"researcher": (research_tools, RESEARCHER_PROMPT),
+                           "coder": (code_tools, CODER_PROMPT)}, metrics, prebuilt=prebuilt)
+    supervisor_llm = llm.with_structured_output(Supervisor)
+    validator_llm = llm.with_structured_output(Validator)
+
+    def timed(name: str, node: Callable) -> Callable:
+        # wraps() keeps the Command[Literal[...]] return annotation LangGraph reads the edges from
+        @functools.wraps(node)
+        def run(state: WorkflowState):
+            hop_started = time.perf_counter()
+            try:
+                return node(state)
+            finally:
+                metrics.add_hop(name, time.perf_counter() - hop_started)
+        return run
+
+    def decide(node: str, schema, structured_llm, prompt: List[Any], state: WorkflowState):
+        """The routing decision at `node`, or None when the router's hop budget is spent"""
+        if router is None:
+            return structured_llm.invoke(prompt)
+        decision = router.route(node, schema, state["messages"], lambda: structured_llm.invoke(prompt))
+        log(f"--- Routing: {node} decided by {decision.source} in {decision.latency * 1000:.2f} ms ---")
+        return decision.response
+
+    def supervisor_node(state: WorkflowState) -> Command[Literal["enhancer", "researcher", "coder", "__end__"]]:
+        messages = [{"role": "system", "content": SUPERVISOR_PROMPT}] + state["messages"]
+        response = decide("supervisor", Supervisor, supervisor_llm, messages, state)
+        if response is None:
+            log(" --- Hop budget exhausted: transitioning to END ---")
+            return Command(
+                update={"messages": [HumanMessage(content="Hop budget exhausted.", name="supervisor")]},
+                goto=END,
+            )
+        parallel = response.parallel and response.next in ("enhancer", "researcher")
+        goto = ["enhancer", "researcher"] if parallel else response.next
+        log(f"--- Workflow Transition: Supervisor → {' + '.join(goto).upper() if parallel else goto.upper()} ---")
+        return Command(
+            update={"messages": [HumanMessage(content=response.reason, name="supervisor")], "parallel": parallel},
+            goto=goto,
+        )
+
+    def enhancer_node(state: WorkflowState) -> Command[Literal["supervisor", "validator"]]:
+        messages = [{"role": "system", "content": ENHANCER_PROMPT}] + state["messages"]
+        enhanced_query = llm.invoke(messages)
+        # In a parallel hop the researcher's answer goes to the validator, so the
+        # enhancer joins it there instead of looping back to the supervisor
+        goto = "validator" if state.get("parallel") else "supervisor"
+        log(f"--- Workflow Transition: Prompt Enhancer → {goto.capitalize()} ---")
+        return Command(
+            update={"messages": [HumanMessage(content=enhanced_query.content, name="enhancer")]},
+            goto=goto,
+        )
+
+    def research_node(state: WorkflowState) -> Command[Literal["validator"]]:
+        result = pool.get("researcher").invoke({"messages": state["messages"]})
+        log("--- Workflow Transition: Researcher → Validator ---")
+        return Command(
+            update={"messages": [HumanMessage(content=result["messages"][-1].content, name="researcher")]},
+            goto="validator",
+        )
+
+    def code_node(state: WorkflowState) -> Command[Literal["validator"]]:
+        result = pool.get("coder").invoke({"messages": state["messages"]})
+        log("--- Workflow Transition: Coder → Validator ---")
+        return Command(
+            update={"messages": [HumanMessage(content=result["messages"][-1].content, name="coder")]},
+            goto="validator",
+        )
+
+    def validator_node(state: WorkflowState) -> Command[Literal["supervisor", "__end__"]]:
+        # After a parallel hop the enhancer's query may land after the researcher's answer
+        answer = next((m for m in reversed(state["messages"]) if m.name in ("researcher", "coder")),
+                      state["messages"][-1])
+        messages = [
+            {"role": "system", "content": VALIDATOR_PROMPT},
+            {"role": "user", "content": state["messages"][0].content},
+            {"role": "assistant", "content": answer.content},
+        ]
+        response = (decide("validator", Validator, validator_llm, messages, state)
+                    or Validator(next="FINISH", reason="Hop budget exhausted."))
+        goto = END if response.next in ("FINISH", END) else "supervisor"
+        log(" --- Transitioning to END ---" if goto == END else "--- Workflow Transition: Validator → Supervisor ---")
+        return Command(
+            update={"messages": [HumanMessage(content=response.reason, name="validator")], "parallel": False},
+            goto=goto,
+        )
+
+    graph = StateGraph(WorkflowState)
+    graph.add_node("supervisor", timed("supervisor", supervisor_node))
+    graph.add_node("enhancer", timed("enhancer", enhancer_node))
+    graph.add_node("researcher", timed("researcher", research_node))
+    graph.add_node("coder", timed("coder", code_node))
+    graph.add_node("validator", timed("validator", validator_node))
+    graph.add_edge(START, "supervisor")
+    app = graph.compile().with_config(callbacks=[LLMTimer(metrics)])
+    metrics.add_construction(time.perf_counter() - started)
+    return app, metrics
+
+
+# ============================================================================
+# OFFLINE COMPARISON
+# ============================================================================
+
+def _scripted_workflow_llm(latency: float, parallel: bool, finish: bool = True):
+    """Fake model driving: supervisor -> enhancer (+ researcher) -> validator -> supervisor -> coder -> FINISH
+
+    With `finish=False` the validator never accepts, so the run loops until stopped.
+    """
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    # fake_chat_model.py is in LangGraph/: run as `PYTHONPATH=.. python supervisor_workflow.py`
+    from fake_chat_model import ScriptedChatModel, tool_call, tool_names
+
+    def respond(messages, tools):
+        names = tool_names(tools)
+        if "Supervisor" in names:
+            routed = sum(1 for m in messages if getattr(m, "name", None) == "supervisor")
+            if routed == 0:
+                return tool_call("Supervisor", {"next": "enhancer", "reason": "Refine and research first",
+                                                "parallel": parallel})
+            if routed == 1 and not parallel:
+                return tool_call("Supervisor", {"next": "researcher", "reason": "Gather facts"})
+            return tool_call("Supervisor", {"next": "coder", "reason": "Compute the result"})
+        if "Validator" in names:
+            done = finish and messages[-1].content.startswith("Computed")
+            return tool_call("Validator", {"next": "FINISH" if done else "supervisor", "reason": "Checked"})
+        if names and isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=("Computed: " if "fake_python" in names else "Findings: ") + messages[-1].content)
+        if "fake_search" in names:
+            return tool_call("fake_search", {"query": "quantum entanglement"})
+        if "fake_python" in names:
+            return tool_call("fake_python", {"code": "print(6765)"})
+        return AIMessage(content="Enhanced query: explain quantum entanglement with examples")
+
+    return ScriptedChatModel(respond=respond, latency=latency)
+
+
+def compare_agent_pool(latency: float = 0.02, runs: int = 10):
+    """Per-hop overhead with agents rebuilt on every hop vs compiled once, plus parallel branches"""
+    import warnings
+
+    from langchain_core.tools import tool
+
+    # langgraph >= 1.0 flags create_react_agent as moved; the notebook still uses it
+    warnings.filterwarnings("ignore", message="create_react_agent has been moved")
+
+    @tool
+    def fake_search(query: str) -> str:
+        """Search the web"""
+        return f"two results for {query}"
+
+    @tool
+    def fake_python(code: str) -> str:
+        """Run Python code"""
+        return "6765"
+
+    inputs = {"messages": [("user", "Quantum Entanglement")]}
+    print(f"=== SUPERVISOR WORKFLOW: {runs} runs, fake LLM with {latency * 1000:.0f} ms per call ===")
+    print(f"{'mode':<30} {'hops':>5} {'ms/hop':>8} {'build ms/hop':>13} {'llm ms/hop':>11} "
+          f"{'overhead ms/hop':>16} {'ms/run':>8}")
+    for label, prebuilt, parallel in [("rebuild agents per hop", False, False),
+                                      ("agent pool", True, False),
+                                      ("agent pool + parallel", True, True)]:
+        llm = _scripted_workflow_llm(latency, parallel)
+        app, metrics = build_supervisor_workflow(llm, [fake_search], [fake_python], prebuilt=prebuilt)
+        app.invoke(inputs)  # warm-up
+        metrics.reset()
+        started = time.perf_counter()
+        for _ in range(runs):
+            app.invoke(inputs)
+        wall = (time.perf_counter() - started) / runs
+        stats = metrics.summary()
+        hops = stats["hops"]
+        hop_ms = 1000 * stats["hop_time"] / hops
+        build_ms = 1000 * stats["construction_time"] / hops
+        llm_ms = 1000 * stats["llm_time"] / hops
+        print(f"{label:<30} {hops // runs:>5} {hop_ms:8.1f} {build_ms:13.2f} {llm_ms:11.1f} "
+              f"{hop_ms - llm_ms:16.2f} {1000 * wall:8.1f}")
+
+
+if __name__ == "__main__":
+    compare_agent_pool()
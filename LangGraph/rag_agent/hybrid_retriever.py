@@ -0,0 +1,212 @@
+"""
+Hybrid Retriever
+BM25 keyword search fused with the dense VectorIndex by reciprocal-rank fusion.
+
+The BM25 index is built once into compact CSR-style posting arrays: per term, a slice
+of document ids (int32) with precomputed BM25 weights (float32). Scoring a query is one
+vectorised add per query term, with no per-document Python work.
+
+When BM25 is decisive, meaning the top hit clearly beats the runner-up (typical for
+keyword-obvious questions like opening hours or a plan name), the retriever answers
+from BM25 alone and skips the query embedding call. Otherwise both rankings are fused:
+
+    score(doc) = sum over rankings of 1 / (rrf_k + rank)
+
+    retriever = HybridRetriever.from_documents(docs, CachedEmbeddings(OpenAIEmbeddings()), k=3)
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import Field
+
+from rag_ingestion import STOPWORDS
+from vector_index import VectorIndex, _top_k
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over an immutable corpus, stored as posting arrays"""
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.n_docs = len(texts)
+        self.vocabulary: Dict[str, int] = {}
+
+        term_ids, doc_ids = [], []
+        lengths = np.empty(self.n_docs, dtype=np.float32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[doc] = len(tokens)
+            term_ids.extend(self.vocabulary.setdefault(token, len(self.vocabulary)) for token in tokens)
+            doc_ids.extend([doc] * len(tokens))
+
+        # (term, doc) pairs with their term frequency, grouped by term
+        pairs = np.asarray(term_ids, dtype=np.int64) * self.n_docs + np.asarray(doc_ids, dtype=np.int64)
+        pairs, tf = np.unique(pairs, return_counts=True)
+        terms, docs = pairs // self.n_docs, pairs % self.n_docs
+
+        df = np.bincount(terms, minlength=len(self.vocabulary))
+        self.indptr = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.postings = docs.astype(np.int32)
+
+        idf = np.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1e-9))
+        self.weights = (idf[terms] * tf * (k1 + 1) / (tf + norm[docs])).astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.postings.nbytes + self.weights.nbytes
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for token in tokenize(query):
+            term = self.vocabulary.get(token)
+            if term is not None:
+                start, stop = self.indptr[term], self.indptr[term + 1]
+                # Each document appears once per posting list, so fancy-index += is safe
+                scores[self.postings[start:stop]] += self.weights[start:stop]
+        return scores
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.scores(query)
+        top = _top_k(scores, k)
+        top = top[scores[top] > 0]
+        return top, scores[top]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], k: int, rrf_k: int = 60) -> np.ndarray:
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking.tolist()):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return np.asarray(sorted(fused, key=fused.get, reverse=True)[:k], dtype=np.int64)
+
+
+@dataclass
+class HybridStats:
+    queries: int = 0
+    bm25_only: int = 0      # decisive keyword hits that skipped the embedding call
+    embedding_time: float = 0.0
+
+
+class HybridRetriever(BaseRetriever):
+    """LangChain retriever fusing BM25 and dense rankings, skipping the embedding when BM25 is decisive"""
+
+    bm25: Any
+    index: Any
+    embeddings: Any
+    documents: List[Document]
+    k: int = 4
+    candidates: int = 20          # depth of each ranking fed into the fusion
+    rrf_k: int = 60
+    decisive_ratio: Optional[float] = 1.5   # top BM25 score / runner-up; None disables skipping
+    decisive_min_score: float = 5.0
+    stats: HybridStats = Field(default_factory=HybridStats)
+
+    @classmethod
+    def from_documents(cls, documents: Sequence[Document], embeddings: Embeddings, **kwargs) -> "HybridRetriever":
+        documents = list(documents)
+        index = VectorIndex.from_documents(documents, embeddings, ids=[str(i) for i in range(len(documents))])
+        bm25 = BM25Index([doc.page_content for doc in documents])
+        return cls(bm25=bm25, index=index, embeddings=embeddings, documents=documents, **kwargs)
+
+    def rank(self, query: str) -> np.ndarray:
+        """Row numbers of the top k documents"""
+        self.stats.queries += 1
+        keyword_rows, keyword_scores = self.bm25.search(query, self.candidates)
+        if self.decisive_ratio is not None and len(keyword_scores):
+            runner_up = keyword_scores[1] if len(keyword_scores) > 1 else 0.0
+            if keyword_scores[0] >= self.decisive_min_score and keyword_scores[0] >= self.decisive_ratio * runner_up:
+                self.stats.bm25_only += 1
+                return keyword_rows[:self.k]
+
+        started = time.perf_counter()
+        vector = self.embeddings.embed_query(query)
+        self.stats.embedding_time += time.perf_counter() - started
+        dense_rows, _ = self.index.search(vector, self.candidates)
+        return reciprocal_rank_fusion([keyword_rows, dense_rows], self.k, self.rrf_k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [self.documents[row] for row in self.rank(query)]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _synthetic_corpus(n_docs: int, rng: np.random.Generator, n_topics: int = 300,
+                      vocabulary: int = 6000) -> Tuple[List[str], List[Tuple[str, int]]]:
+    """Topic-mixture documents, each carrying one rare identifier, plus labelled queries
+
+    Half of the queries include the document's identifier (keyword-obvious), the other
+    half only a few of its topic words.
+    """
+    words = [f"w{i}" for i in range(vocabulary)]
+    topics = [rng.choice(vocabulary, 40, replace=False) for _ in range(n_topics)]
+    texts, queries = [], []
+    for i in range(n_docs):
+        topic = topics[rng.integers(n_topics)]
+        chosen = rng.choice(topic, 25)
+        body = [words[w] for w in chosen] + [words[w] for w in rng.integers(0, vocabulary, 5)]
+        texts.append(" ".join(body + [f"id{i}"]))
+        if i % max(1, n_docs // 400) == 0:
+            picks = rng.choice(len(body), 4, replace=False)
+            terms = [body[p] for p in picks]
+            queries.append((" ".join(terms[:2] + [f"id{i}"]) if len(queries) % 2 == 0 else " ".join(terms), i))
+    return texts, queries
+
+
+def benchmark(sizes: Sequence[int] = (10_000, 50_000), k: int = 5, embed_latency: float = 0.02):
+    """Build time, per-query latency and recall@k for BM25, dense and hybrid retrieval"""
+    from rag_ingestion import HashingEmbeddings
+
+    rng = np.random.default_rng(0)
+    print(f"=== HYBRID RETRIEVAL: recall@{k}, {embed_latency * 1000:.0f} ms per query embedding ===")
+    for n in sizes:
+        texts, queries = _synthetic_corpus(n, rng)
+        docs = [Document(page_content=text) for text in texts]
+
+        started = time.perf_counter()
+        bm25 = BM25Index(texts)
+        bm25_build = time.perf_counter() - started
+        embeddings = HashingEmbeddings(dim=1024)
+        started = time.perf_counter()
+        index = VectorIndex.from_documents(docs, embeddings, ids=[str(i) for i in range(n)])
+        dense_build = time.perf_counter() - started
+        embeddings.latency = embed_latency
+
+        def evaluate(rank) -> Tuple[float, float]:
+            hits, started = 0, time.perf_counter()
+            for query, relevant in queries:
+                hits += relevant in rank(query).tolist()
+            return hits / len(queries), (time.perf_counter() - started) / len(queries) * 1000
+
+        hybrid = HybridRetriever(bm25=bm25, index=index, embeddings=embeddings, documents=docs, k=k)
+        fused_only = HybridRetriever(bm25=bm25, index=index, embeddings=embeddings, documents=docs, k=k,
+                                     decisive_ratio=None)
+        results = {
+            "BM25 only": evaluate(lambda q: bm25.search(q, k)[0]),
+            "Dense only": evaluate(lambda q: index.search(embeddings.embed_query(q), k)[0]),
+            "Hybrid (always fuse)": evaluate(fused_only.rank),
+            "Hybrid (skip when decisive)": evaluate(hybrid.rank),
+        }
+        print(f"--- {n:,} documents, {len(queries)} queries | build: BM25 {bm25_build:.2f} s "
+              f"({bm25.nbytes / 1e6:.1f} MB postings), dense {dense_build:.2f} s")
+        for label, (recall, latency) in results.items():
+            print(f"{label:<28} recall@{k} {recall:.2f}  {latency:6.2f} ms/query")
+        print(f"Embedding calls skipped: {hybrid.stats.bm25_only}/{hybrid.stats.queries}")
+
+
+if __name__ == "__main__":
+    benchmark()
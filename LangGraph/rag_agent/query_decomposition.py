@@ -0,0 +1,286 @@
+"""
+Query Decomposition
+Multi-step RAG stage that answers compound questions in one pass.
+
+A compound question such as "Who is the owner and what are the timings?" handled one
+sub-question at a time costs a retrieval, one grading call per document and a
+generation for each part. DecomposedRAG instead:
+
+1. splits the question into sub-queries: locally when it is a plain conjunction of
+   questions, through a structured-output LLM call otherwise (optional)
+2. retrieves for every sub-query concurrently (the retriever's batch API)
+3. merges the results, deduplicated by document id, interleaving sub-query rankings
+4. grades all merged documents against all sub-queries in one batched LLM call
+5. generates a single answer from the relevant documents
+
+    rag = DecomposedRAG(llm, db.as_retriever(search_kwargs={"k": 3}))
+    graph = rag.build_graph()
+    graph.invoke({"messages": [HumanMessage(content="Who is the owner and what are the timings?")]})
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, TypedDict
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field
+
+from rag_ingestion import document_id
+
+QUESTION_WORDS = ("who", "what", "when", "where", "which", "why", "how", "is", "are", "do", "does", "can")
+SPLIT = re.compile(r"\?\s*|;\s*|,?\s+(?:and|also|plus)\s+(?=(?:" + "|".join(QUESTION_WORDS) + r")\b)",
+                   re.IGNORECASE)
+
+GENERATE_PROMPT = ChatPromptTemplate.from_template(
+    """Answer every part of the question based only on the following context: {context}
+Question: {question}
+"""
+)
+
+GRADE_BATCH_SYSTEM = """You are a grader assessing which retrieved documents are relevant to a user's questions.
+The documents are numbered. Return the numbers of every document that contains information
+relevant to at least one of the questions."""
+
+GRADE_SYSTEM = """You are a grader assessing relevance of a retrieved document to a user question.
+Only answer if the document contains information relevant to the user's question.
+If the document contains relevant information, respond with 'Yes'. Otherwise, respond with 'No'."""
+
+
+class SubQueries(BaseModel):
+    """Independent sub-questions that together cover the user's question"""
+
+    queries: List[str] = Field(description="Self-contained sub-questions, one per distinct information need")
+
+
+class BatchGrade(BaseModel):
+    """Numbers of the documents relevant to the questions"""
+
+    relevant: List[int] = Field(description="Numbers of the relevant documents")
+
+
+class GradeDocument(BaseModel):
+    """Whether one document is relevant to one question"""
+
+    score: str = Field(description="Document is relevant to the question? If yes -> 'Yes' if not -> 'No'")
+
+
+class DecomposedState(TypedDict):
+    messages: List[BaseMessage]
+    sub_queries: List[str]
+    documents: List[Document]
+
+
+def split_compound(question: str) -> List[str]:
+    """Split a plain conjunction of questions; returns [question] when there is nothing to split"""
+    parts = [p.strip(" ,.") for p in SPLIT.split(question)]
+    parts = [p for p in parts if len(p.split()) >= 2]
+    if len(parts) < 2:
+        return [question]
+    return [p if p.endswith("?") else p + "?" for p in parts]
+
+
+def chunk_key(doc: Document) -> str:
+    """The vector-store id when the store set one, else the chunk's id plus a hash of its text"""
+    if getattr(doc, "id", None):
+        return f"id:{doc.id}"
+    return f"{document_id(doc)}:{hashlib.sha256(doc.page_content.encode()).hexdigest()}"
+
+
+def merge_documents(rankings: Sequence[Sequence[Document]]) -> List[Document]:
+    """Round-robin over the per-query rankings, keeping the first occurrence of each chunk"""
+    merged, seen = [], set()
+    for rank in range(max((len(r) for r in rankings), default=0)):
+        for ranking in rankings:
+            if rank < len(ranking):
+                key = chunk_key(ranking[rank])
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(ranking[rank])
+    return merged
+
+
+def format_docs(docs: Sequence[Document]) -> str:
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+@dataclass
+class DecompositionStats:
+    questions: int = 0
+    sub_queries: int = 0
+    llm_decompositions: int = 0
+    documents_retrieved: int = 0
+    duplicates_merged: int = 0
+
+
+class DecomposedRAG:
+    """Decompose, retrieve concurrently, merge, batch-grade and generate"""
+
+    def __init__(self, llm, retriever, max_concurrency: int = 8, llm_decompose: bool = False):
+        self.llm = llm
+        self.retriever = retriever
+        self.max_concurrency = max_concurrency
+        self.llm_decompose = llm_decompose
+        self.stats = DecompositionStats()
+        self._decomposer = llm.with_structured_output(SubQueries) if llm_decompose else None
+        self._grader = llm.with_structured_output(BatchGrade)
+
+    def decompose(self, question: str) -> List[str]:
+        queries = split_compound(question)
+        if len(queries) == 1 and self._decomposer is not None:
+            # No visible conjunction: let the model decide whether the question has several parts
+            self.stats.llm_decompositions += 1
+            queries = self._decomposer.invoke([("system", "Split the user's question into independent "
+                                                          "sub-questions. Return it unchanged if it has one part."),
+                                               ("human", question)]).queries or [question]
+        self.stats.questions += 1
+        self.stats.sub_queries += len(queries)
+        return queries
+
+    def retrieve(self, queries: Sequence[str]) -> List[Document]:
+        rankings = self.retriever.batch(list(queries), config={"max_concurrency": self.max_concurrency})
+        merged = merge_documents(rankings)
+        retrieved = sum(len(r) for r in rankings)
+        self.stats.documents_retrieved += retrieved
+        self.stats.duplicates_merged += retrieved - len(merged)
+        return merged
+
+    def grade(self, queries: Sequence[str], documents: Sequence[Document]) -> List[Document]:
+        if not documents:
+            return []
+        numbered = "\n\n".join(f"[{i}] {doc.page_content}" for i, doc in enumerate(documents))
+        questions = "\n".join(f"- {q}" for q in queries)
+        result = self._grader.invoke([("system", GRADE_BATCH_SYSTEM),
+                                      ("human", f"Questions:\n{questions}\n\nDocuments:\n{numbered}")])
+        keep = set(result.relevant)
+        return [doc for i, doc in enumerate(documents) if i in keep]
+
+    def generate(self, question: str, documents: Sequence[Document]) -> AIMessage:
+        return (GENERATE_PROMPT | self.llm).invoke({"context": format_docs(documents), "question": question})
+
+    def answer(self, question: str) -> Dict[str, Any]:
+        queries = self.decompose(question)
+        documents = self.grade(queries, self.retrieve(queries))
+        return {"sub_queries": queries, "documents": documents, "answer": self.generate(question, documents)}
+
+    def build_graph(self):
+        """decompose -> retrieve -> grade -> generate as a LangGraph workflow"""
+        from langgraph.graph import END, StateGraph
+
+        def decompose_node(state: DecomposedState):
+            return {"sub_queries": self.decompose(state["messages"][-1].content)}
+
+        def retrieve_node(state: DecomposedState):
+            return {"documents": self.retrieve(state["sub_queries"])}
+
+        def grade_node(state: DecomposedState):
+            return {"documents": self.grade(state["sub_queries"], state["documents"])}
+
+        def generate_node(state: DecomposedState):
+            answer = self.generate(state["messages"][-1].content, state["documents"])
+            return {"messages": state["messages"] + [answer]}
+
+        workflow = StateGraph(DecomposedState)
+        workflow.add_node("decompose", decompose_node)
+        workflow.add_node("retrieve", retrieve_node)
+        workflow.add_node("grade", grade_node)
+        workflow.add_node("generate", generate_node)
+        workflow.set_entry_point("decompose")
+        workflow.add_edge("decompose", "retrieve")
+        workflow.add_edge("retrieve", "grade")
+        workflow.add_edge("grade", "generate")
+        workflow.add_edge("generate", END)
+        return workflow.compile()
+
+
+def sequential_answer(llm, retriever, question: str, sub_queries: Optional[Sequence[str]] = None) -> AIMessage:
+    """Baseline: each sub-question retrieved, graded document by document and answered in turn"""
+    grader = llm.with_structured_output(GradeDocument)
+    partial_answers = []
+    for query in sub_queries or [question]:
+        documents = [
+            doc for doc in retriever.invoke(query)
+            if grader.invoke([("system", GRADE_SYSTEM),
+                              ("human", f"Document: {doc.page_content}\nQuestion: {query}")]).score.lower() == "yes"
+        ]
+        partial_answers.append((GENERATE_PROMPT | llm).invoke({"context": format_docs(documents),
+                                                                "question": query}).content)
+    return AIMessage(content="\n".join(partial_answers))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+COMPOUND_QUESTIONS = [
+    "What are the membership plans and who are the personal trainers?",
+    "What are the operating hours and which group classes are offered?",
+    "Which facilities are available, and what are the membership plans?",
+    "Who are the personal trainers? What are the operating hours?",
+    "What group classes are there and what facilities do you have and what are the operating hours?",
+    "What are the membership plans?",
+]
+TOPICS = ("membership plans", "group classes", "personal trainers", "operating hours", "facilities")
+
+
+def _fake_backends(llm_latency: float, embed_latency: float):
+    # fake_chat_model.py is in LangGraph/: run as `PYTHONPATH=.. python query_decomposition.py`
+    from fake_chat_model import ScriptedChatModel, tool_call, tool_names
+    from rag_ingestion import HashingEmbeddings, synthetic_gym_documents
+    from vector_index import VectorIndex
+
+    def topics_in(text: str) -> set:
+        text = text.lower()
+        return {t for t in TOPICS if t.split()[0].rstrip("s") in text}
+
+    def respond(messages, tools):
+        names, prompt = tool_names(tools), messages[-1].content
+        if "BatchGrade" in names:
+            questions, documents = prompt.split("Documents:")
+            wanted = topics_in(questions)
+            numbered = re.findall(r"\[(\d+)\] (.*)", documents)
+            return tool_call("BatchGrade", {"relevant": [int(i) for i, text in numbered if topics_in(text) & wanted]})
+        if "GradeDocument" in names:
+            document, question = prompt.split("\nQuestion: ")
+            return tool_call("GradeDocument", {"score": "Yes" if topics_in(document) & topics_in(question) else "No"})
+        return AIMessage(content="Answer covering: " + ", ".join(sorted(topics_in(prompt.split("Question:")[-1]))))
+
+    embeddings = HashingEmbeddings()
+    index = VectorIndex.from_documents(synthetic_gym_documents(100), embeddings)
+    embeddings.latency = embed_latency
+    retriever = index.as_retriever(embeddings, search_kwargs={"k": 3})
+    return ScriptedChatModel(respond=respond, latency=llm_latency), retriever, embeddings
+
+
+def benchmark(llm_latency: float = 0.2, embed_latency: float = 0.05):
+    """Sequential per-sub-question flow vs decomposition with concurrent retrieval and batched grading"""
+    llm, retriever, embeddings = _fake_backends(llm_latency, embed_latency)
+    rag = DecomposedRAG(llm, retriever)
+
+    print(f"=== QUERY DECOMPOSITION: {len(COMPOUND_QUESTIONS)} questions, fake LLM {llm_latency * 1000:.0f} ms, "
+          f"fake embeddings {embed_latency * 1000:.0f} ms ===")
+    for question in COMPOUND_QUESTIONS:
+        queries = split_compound(question)
+
+        llm.calls, embeddings.calls = 0, 0
+        started = time.perf_counter()
+        sequential_answer(llm, retriever, question, queries)
+        sequential, sequential_calls = time.perf_counter() - started, llm.calls
+
+        llm.calls = 0
+        started = time.perf_counter()
+        result = rag.answer(question)
+        decomposed, decomposed_calls = time.perf_counter() - started, llm.calls
+
+        print(f"{len(queries)} parts | sequential {sequential:5.2f} s ({sequential_calls:2d} LLM calls) | "
+              f"decomposed {decomposed:5.2f} s ({decomposed_calls} LLM calls, {len(result['documents'])} docs) "
+              f"| {result['answer'].content}")
+    print(f"Sub-queries: {rag.stats.sub_queries} for {rag.stats.questions} questions; "
+          f"{rag.stats.duplicates_merged} duplicate documents merged")
+
+
+if __name__ == "__main__":
+    benchmark()
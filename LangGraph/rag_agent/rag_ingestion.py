@@ -0,0 +1,339 @@
+"""
+RAG Ingestion
+Embedding and vector-store ingestion shared by the rag_agent notebooks.
+
+The notebooks used to call Chroma.from_documents(docs, OpenAIEmbeddings()), which
+re-embedded every gym document on every run. This module puts a persistent cache in
+front of any LangChain embedding model:
+
+- CachedEmbeddings   SQLite cache keyed by a hash of (model, text); only texts that were
+                     never seen before go to the model, in batches of up to `batch_size`
+- DocumentIngestor   incremental upserts with stable chunk-level ids: unchanged chunks
+                     are skipped, changed ones re-embedded and replaced, removed ones
+                     deleted (chunks without a recorded position are matched by content)
+- HashingEmbeddings  deterministic local embedding (feature hashing), for offline runs
+
+    db = Chroma.from_documents(docs, CachedEmbeddings(OpenAIEmbeddings()))
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".embedding_cache.sqlite")
+)
+SQLITE_MAX_PARAMS = 500
+
+# Words dropped before keyword matching and query normalisation
+STOPWORDS = frozenset(
+    "a an and are at be can could do does for from how i in is it me my of on or our please "
+    "tell the there to what when where which who will with would you your".split()
+)
+
+
+# ============================================================================
+# LOCAL EMBEDDINGS
+# ============================================================================
+
+class HashingEmbeddings(Embeddings):
+    """Bag of words and word bigrams hashed into `dim` buckets, L2-normalised
+
+    `latency` adds a sleep per call to model a remote embedding API.
+    """
+
+    def __init__(self, dim: int = 256, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.model = f"hashing-{dim}"
+        self.calls = 0
+
+    def _embed(self, text: str) -> np.ndarray:
+        tokens = re.findall(r"[a-z0-9]+", text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+# ============================================================================
+# EMBEDDING CACHE
+# ============================================================================
+
+@dataclass
+class EmbeddingCacheStats:
+    hits: int = 0
+    misses: int = 0
+    batches: int = 0       # calls made to the underlying model
+    embed_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+MODEL_ATTRIBUTES = ("model", "model_name", "deployment", "dimensions")
+
+
+def embedding_namespace(embeddings: Embeddings) -> str:
+    """Class name plus whichever model identifiers it exposes (OpenAI `model`, HuggingFace `model_name`)"""
+    parts = [type(embeddings).__name__]
+    parts += [f"{attr}={value}" for attr in MODEL_ATTRIBUTES
+              if (value := getattr(embeddings, attr, None)) not in (None, "")]
+    return ":".join(parts)
+
+
+class CachedEmbeddings(Embeddings):
+    """Persistent content-hash cache in front of an embedding model"""
+
+    def __init__(self, underlying: Embeddings, cache_path: str = DEFAULT_CACHE_PATH,
+                 batch_size: int = 64, namespace: Optional[str] = None):
+        self.underlying = underlying
+        self.batch_size = batch_size
+        # Vectors from different models must never mix, so the model is part of the key
+        self.namespace = namespace or embedding_namespace(underlying)
+        self.stats = EmbeddingCacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._db.commit()
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode()).hexdigest()
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), SQLITE_MAX_PARAMS):
+                chunk = keys[i:i + SQLITE_MAX_PARAMS]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+        return found
+
+    def _store(self, items: Iterable[tuple]):
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+            )
+            self._db.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("doc", text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.stats.hits += len(texts) - sum(1 for key in keys if key in missing)
+        self.stats.misses += len(missing)
+
+        pending = list(missing.items())
+        for i in range(0, len(pending), self.batch_size):
+            batch = pending[i:i + self.batch_size]
+            started = time.perf_counter()
+            vectors = self.underlying.embed_documents([text for _, text in batch])
+            self.stats.embed_time += time.perf_counter() - started
+            self.stats.batches += 1
+            self._store((key, vector) for (key, _), vector in zip(batch, vectors))
+            found.update((key, list(vector)) for (key, _), vector in zip(batch, vectors))
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        cached = self._lookup([key]).get(key)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+        self.stats.misses += 1
+        vector = self.underlying.embed_query(text)
+        self._store([(key, vector)])
+        return list(vector)
+
+    def close(self):
+        self._db.close()
+
+
+# ============================================================================
+# INCREMENTAL INGESTION
+# ============================================================================
+
+CHUNK_KEYS = ("page", "start_index", "chunk_index")
+
+
+def document_id(doc: Document) -> str:
+    """Stable chunk-level id
+
+    The source plus the chunk's position when the loader or splitter recorded one
+    (`start_index`, `chunk_index`, with `page` when present), so an edited chunk keeps its id.
+    Otherwise the source plus a hash of the content, since one file yields many chunks.
+    """
+    content_hash = hashlib.sha256(doc.page_content.encode()).hexdigest()
+    source = doc.metadata.get("source")
+    if not source:
+        return content_hash[:32]
+    if "start_index" in doc.metadata or "chunk_index" in doc.metadata:
+        locator = "&".join(f"{key}={doc.metadata[key]}" for key in CHUNK_KEYS if key in doc.metadata)
+        return f"{source}#{locator}"
+    return f"{source}#{content_hash[:16]}"
+
+
+def document_fingerprint(doc: Document) -> str:
+    payload = json.dumps([doc.page_content, doc.metadata], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class IngestReport:
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    elapsed: float = 0.0
+
+
+class DocumentIngestor:
+    """Upserts documents into a vector store, touching only what changed
+
+    The manifest of ingested ids and fingerprints is kept in memory, or in a JSON file
+    when `manifest_path` is given (use that with a persistent vector store).
+    """
+
+    def __init__(self, vectorstore, manifest_path: Optional[str] = None):
+        self.vectorstore = vectorstore
+        self.manifest_path = manifest_path
+        self.manifest: Dict[str, str] = {}
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def upsert(self, docs: Sequence[Document], delete_missing: bool = True) -> IngestReport:
+        started = time.perf_counter()
+        report = IngestReport()
+        changed_docs, changed_ids, replaced, seen = [], [], [], set()
+        pending: Dict[str, str] = {}
+
+        for doc in docs:
+            doc_id, fingerprint = document_id(doc), document_fingerprint(doc)
+            seen.add(doc_id)
+            previous = pending.get(doc_id, self.manifest.get(doc_id))
+            if previous == fingerprint:
+                report.unchanged += 1
+                continue
+            if previous is None:
+                report.added += 1
+            else:
+                report.updated += 1
+                replaced.append(doc_id)
+            changed_docs.append(doc)
+            changed_ids.append(doc_id)
+            pending[doc_id] = fingerprint
+
+        if changed_docs:
+            # Replace rather than rely on add() upserting, which not every store does
+            if replaced:
+                self.vectorstore.delete(ids=replaced)
+            self.vectorstore.add_documents(changed_docs, ids=changed_ids)
+            # Only now: if embedding fails, the next upsert must see these chunks as changed
+            self.manifest.update(pending)
+
+        if delete_missing:
+            removed = [doc_id for doc_id in self.manifest if doc_id not in seen]
+            if removed:
+                self.vectorstore.delete(ids=removed)
+                for doc_id in removed:
+                    del self.manifest[doc_id]
+                report.deleted = len(removed)
+
+        if self.manifest_path:
+            with open(f"{self.manifest_path}.tmp", "w") as f:
+                json.dump(self.manifest, f)
+            os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def synthetic_gym_documents(n: int) -> List[Document]:
+    """Gym-style documents for benchmarks and offline runs"""
+    topics = ["membership plans", "group classes", "personal trainers", "operating hours", "facilities"]
+    return [
+        Document(
+            page_content=f"Peak Performance Gym note {i}: details about {topics[i % len(topics)]} "
+                         f"for branch {i // len(topics)}, including pricing tier {i % 7} and schedule slot {i % 13}.",
+            metadata={"source": f"note_{i:05d}.txt"},
+        )
+        for i in range(n)
+    ]
+
+
+def benchmark_ingestion(n_docs: int = 2000, batch_size: int = 64, latency: float = 0.05):
+    """Cold vs warm vs incremental ingestion with a slow local embedding model"""
+    import tempfile
+
+    from langchain_core.vectorstores import InMemoryVectorStore
+
+    docs = synthetic_gym_documents(n_docs)
+    print(f"=== RAG INGESTION: {n_docs} documents, batch size {batch_size}, "
+          f"{latency * 1000:.0f} ms per embedding call ===")
+
+    with tempfile.TemporaryDirectory() as root:
+        cache_path = os.path.join(root, "embeddings.sqlite")
+
+        model = HashingEmbeddings(latency=latency)
+        embeddings = CachedEmbeddings(model, cache_path, batch_size=batch_size)
+
+        def run(label: str, ingest):
+            calls, misses = model.calls, embeddings.stats.misses
+            started = time.perf_counter()
+            ingest()
+            elapsed = time.perf_counter() - started
+            print(f"{label:<34} {elapsed:7.3f} s  ({model.calls - calls} model calls, "
+                  f"{embeddings.stats.misses - misses} texts embedded)")
+
+        run("Cold cache (from_documents):", lambda: InMemoryVectorStore.from_documents(docs, embeddings))
+        run("Warm cache, fresh run:", lambda: InMemoryVectorStore.from_documents(docs, embeddings))
+
+        store = InMemoryVectorStore(embeddings)
+        ingestor = DocumentIngestor(store)
+        run("Ingestor, first upsert:", lambda: ingestor.upsert(docs))
+        edited = list(docs)
+        for i in range(0, n_docs, n_docs // 50):
+            edited[i] = Document(page_content=docs[i].page_content + " Updated.", metadata=docs[i].metadata)
+        run("Ingestor, 50 documents edited:", lambda: ingestor.upsert(edited))
+        run("Ingestor, nothing changed:", lambda: ingestor.upsert(edited))
+        run("Ingestor, 100 documents removed:", lambda: ingestor.upsert(edited[100:]))
+        print(f"Vector store holds {len(store.store)} documents")
+        embeddings.close()
+
+
+if __name__ == "__main__":
+    benchmark_ingestion()
@@ -0,0 +1,236 @@
+"""
+RAG Tool-calling Agent
+The rag_powered_tool_calling notebook's agent as a reusable module.
+
+The notebook's `agent` node ran `ChatOpenAI().bind_tools(tools)` on every turn: a new
+OpenAI client (and a new HTTP connection), plus re-serialising every tool's JSON schema.
+Here models come from a ModelFactory instead:
+
+- One shared httpx connection pool for every model the factory creates
+- Tool schemas converted once per tool and reused by every binding
+- Bound models cached by (model, tool set), so a turn is a dictionary lookup
+
+    retriever_tool, off_topic = create_gym_tools(retriever)
+    graph = build_rag_tool_agent([retriever_tool, off_topic], model="gpt-3.5-turbo")
+    graph.invoke({"messages": [HumanMessage(content="Who is the owner and what are the timings?")]})
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict
+
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_core.tools import create_retriever_tool, tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode
+
+RETRIEVER_DESCRIPTION = (
+    "Information related to Gym History & Founder, Operating Hours, Membership Plans, Fitness Classes, "
+    "Personal Trainers, and Facilities & Equipment of Peak Performance Gym"
+)
+
+
+class AgentState(TypedDict):
+    messages: Annotated[Sequence[BaseMessage], add_messages]
+
+
+@dataclass
+class FactoryStats:
+    models_built: int = 0
+    bindings_built: int = 0
+    binding_hits: int = 0
+    schemas_converted: int = 0
+
+
+class ModelFactory:
+    """Creates ChatOpenAI models on one connection pool and caches their tool bindings"""
+
+    def __init__(self, max_connections: int = 20, timeout: float = 60.0, **model_kwargs):
+        self.model_kwargs = model_kwargs
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.http_client = httpx.Client(limits=limits, timeout=timeout)
+        # Async pool is created with the first model (ChatOpenAI takes both clients up front)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._limits, self._timeout = limits, timeout
+        self.stats = FactoryStats()
+        self._models: Dict[str, Any] = {}
+        self._bound: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+        self._schemas: Dict[int, Tuple[Any, Dict[str, Any], str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Shared async pool; its connections are opened by, and tied to, the event loop that first uses them"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+        return self._async_client
+
+    def chat_model(self, model: str = "gpt-3.5-turbo"):
+        with self._lock:
+            chat = self._models.get(model)
+            if chat is None:
+                from langchain_openai import ChatOpenAI
+
+                chat = self._models[model] = ChatOpenAI(model=model, http_client=self.http_client,
+                                                        http_async_client=self.async_http_client,
+                                                        **self.model_kwargs)
+                self.stats.models_built += 1
+        return chat
+
+    def tool_schema(self, tool_obj) -> Tuple[Dict[str, Any], str]:
+        """The tool's OpenAI schema and its digest, converted once per tool object"""
+        with self._lock:
+            # The tool itself is kept in the entry so its id cannot be reused
+            entry = self._schemas.get(id(tool_obj))
+            if entry is None:
+                schema = convert_to_openai_tool(tool_obj)
+                digest = hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+                entry = self._schemas[id(tool_obj)] = (tool_obj, schema, digest)
+                self.stats.schemas_converted += 1
+        return entry[1], entry[2]
+
+    def bound(self, model: str, tools: Sequence[Any]):
+        """`chat_model(model).bind_tools(tools)`, built once per (model, tool set)"""
+        schemas = [self.tool_schema(t) for t in tools]
+        key = (model, tuple(digest for _, digest in schemas))
+        with self._lock:
+            runnable = self._bound.get(key)
+            if runnable is not None:
+                self.stats.binding_hits += 1
+                return runnable
+        runnable = self.chat_model(model).bind_tools([schema for schema, _ in schemas])
+        with self._lock:
+            self.stats.bindings_built += 1
+            return self._bound.setdefault(key, runnable)
+
+    def close(self):
+        """Close the sync pool; from async code use aclose(), which closes both"""
+        self.http_client.close()
+
+    async def aclose(self):
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+_default_factory: Optional[ModelFactory] = None
+
+
+def default_model_factory() -> ModelFactory:
+    global _default_factory
+    if _default_factory is None:
+        _default_factory = ModelFactory()
+    return _default_factory
+
+
+def create_gym_tools(retriever) -> List[Any]:
+    """The notebook's retriever tool and off-topic catch-all"""
+    retriever_tool = create_retriever_tool(retriever, "retriever_tool", RETRIEVER_DESCRIPTION)
+
+    @tool
+    def off_topic():
+        """Catch all Questions NOT related to Peak Performance Gym's history, hours, membership plans, fitness classes, trainers, or facilities"""
+        return "Forbidden - do not respond to the user"
+
+    return [retriever_tool, off_topic]
+
+
+def should_continue(state) -> Literal["tools", END]:
+    last_message = state["messages"][-1]
+    if last_message.tool_calls:
+        return "tools"
+    return END
+
+
+def build_rag_tool_agent(tools: Sequence[Any], model: str = "gpt-3.5-turbo",
+                         factory: Optional[ModelFactory] = None):
+    """Compile the agent -> tools -> agent loop with a model bound once from the factory"""
+    factory = factory or default_model_factory()
+    bound_model = factory.bound(model, tools)
+
+    def agent(state):
+        return {"messages": [bound_model.invoke(state["messages"])]}
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("agent", agent)
+    workflow.add_node("tools", ToolNode(tools))
+    workflow.add_edge(START, "agent")
+    workflow.add_conditional_edges("agent", should_continue)
+    workflow.add_edge("tools", "agent")
+    return workflow.compile()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _tool_calling_reply(payload: Dict) -> Dict:
+    """Mock server script: call the retriever for a new question, answer after the tool result"""
+    last = payload["messages"][-1]
+    if last["role"] == "tool":
+        return {"role": "assistant", "content": f"Based on the gym notes: {last['content'][:80]}"}
+    return {"role": "assistant", "content": None, "tool_calls": [{
+        "id": f"call_{len(payload['messages'])}", "type": "function",
+        "function": {"name": "retriever_tool", "arguments": json.dumps({"query": last["content"]})},
+    }]}
+
+
+def benchmark(questions: int = 30, model: str = "gpt-3.5-turbo"):
+    """Per-turn overhead of the notebook's per-call client/binding vs the factory, on the mock server"""
+    from langchain_core.messages import HumanMessage
+    from langchain_openai import ChatOpenAI
+
+    # mock_openai_server.py is in LangGraph/: run as `PYTHONPATH=.. python rag_tool_agent.py`
+    from mock_openai_server import MockOpenAIServer
+    from rag_ingestion import HashingEmbeddings, synthetic_gym_documents
+    from vector_index import VectorIndex
+
+    embeddings = HashingEmbeddings()
+    index = VectorIndex.from_documents(synthetic_gym_documents(200), embeddings)
+    tools = create_gym_tools(index.as_retriever(embeddings, search_type="mmr", search_kwargs={"k": 3}))
+    prompts = [f"What are the membership plans at branch {i}?" for i in range(questions)]
+
+    print(f"=== RAG TOOL AGENT: {questions} questions (2 model turns each), mock server with no latency ===")
+    with MockOpenAIServer(reply=_tool_calling_reply) as server:
+        def notebook_agent(state):
+            chat = ChatOpenAI(model=model, base_url=server.base_url, api_key="test")
+            chat = chat.bind_tools(tools)
+            return {"messages": [chat.invoke(state["messages"])]}
+
+        workflow = StateGraph(AgentState)
+        workflow.add_node("agent", notebook_agent)
+        workflow.add_node("tools", ToolNode(tools))
+        workflow.add_edge(START, "agent")
+        workflow.add_conditional_edges("agent", should_continue)
+        workflow.add_edge("tools", "agent")
+        variants = [("client + bind per turn", workflow.compile(), None)]
+
+        factory = ModelFactory(base_url=server.base_url, api_key="test")
+        variants.append(("model factory", build_rag_tool_agent(tools, model, factory), factory))
+
+        for label, graph, factory in variants:
+            graph.invoke({"messages": [HumanMessage(content="warm up")]})
+            requests, connections = server.request_count, server.connection_count
+            started = time.perf_counter()
+            for prompt in prompts:
+                result = graph.invoke({"messages": [HumanMessage(content=prompt)]})
+            elapsed = time.perf_counter() - started
+            turns = server.request_count - requests
+            print(f"{label:<24} {1000 * elapsed / turns:6.2f} ms/turn, "
+                  f"{server.connection_count - connections:3d} new connections for {turns} requests")
+        print(f"Factory: {factory.stats.models_built} model, {factory.stats.bindings_built} binding, "
+              f"{factory.stats.schemas_converted} schemas converted")
+        print(f"Last answer: {result['messages'][-1].content[:70]}...")
+        factory.close()
+        factory.close()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,279 @@
+"""
+Semantic Cache
+Question-level cache in front of the classification_driven_agent graph.
+
+Every question normally costs a classifier LLM call, a retrieval and an answer LLM call.
+SemanticCache embeds the question locally and, when an earlier question is within
+`threshold` cosine similarity, serves that run's topic decision, retrieved document ids
+and answer instead of invoking the graph.
+
+- Freshness: entries expire after `ttl` seconds
+- Invalidation: the cache is tied to a fingerprint of the document set and is cleared
+  when the documents change
+- Lookup: nearest neighbour over the cached questions through VectorIndex
+
+    cached_graph = CachedGraph(graph, SemanticCache(), docs)
+    cached_graph.invoke({"messages": [HumanMessage(content="What are the gym hours?")]})
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+from rag_ingestion import STOPWORDS, HashingEmbeddings, document_fingerprint, document_id
+from vector_index import VectorIndex
+
+
+def documents_fingerprint(docs: Sequence[Document]) -> str:
+    """Order-independent hash of a document set (ids and contents)"""
+    parts = sorted(f"{document_id(doc)}:{document_fingerprint(doc)}" for doc in docs)
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class QuestionEmbeddings(Embeddings):
+    """Local question embedding: stopwords dropped and simple suffixes stripped before hashing
+
+    Makes paraphrases that differ in filler words, word order, plurals or punctuation
+    land close together without calling an embedding API.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.hashing = HashingEmbeddings(dim)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+        return " ".join(re.sub(r"(ing|ed|es|s)$", "", w) if len(w) > 4 else w for w in words)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.hashing.embed_documents([self.normalize(text) for text in texts])
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    on_topic: str
+    document_ids: List[str]
+    answer: str
+    created: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class SemanticCacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    invalidations: int = 0
+    lookup_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SemanticCache:
+    """Nearest-question cache with a similarity threshold, TTL and document-set invalidation"""
+
+    def __init__(self, embeddings: Optional[Embeddings] = None, threshold: float = 0.75,
+                 ttl: Optional[float] = 3600.0, max_entries: int = 4096, candidates: int = 4):
+        self.embeddings = embeddings or QuestionEmbeddings()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.candidates = candidates  # nearest entries checked, so an expired one doesn't hide the next
+        self.stats = SemanticCacheStats()
+        self.fingerprint: Optional[str] = None
+        self._entries: Dict[str, CachedAnswer] = {}
+        self._index: Optional[VectorIndex] = None
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._index = None
+
+    def bind_documents(self, docs: Sequence[Document]):
+        """Tie the cache to a document set; a different set clears every entry"""
+        fingerprint = documents_fingerprint(docs)
+        if self.fingerprint is not None and fingerprint != self.fingerprint:
+            self.clear()
+            self.stats.invalidations += 1
+        self.fingerprint = fingerprint
+
+    def lookup(self, question: str) -> Optional[CachedAnswer]:
+        started = time.perf_counter()
+        entry = None
+        if self._entries:
+            rows, scores = self._index.search(self.embeddings.embed_query(question), k=self.candidates, exact=True)
+            now = time.monotonic()
+            for entry_id in [self._index.ids[row] for row, score in zip(rows, scores) if score >= self.threshold]:
+                candidate = self._entries[entry_id]
+                if self.ttl is not None and now - candidate.created > self.ttl:
+                    self._remove(entry_id)
+                    self.stats.expired += 1
+                else:
+                    entry = candidate
+                    break
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        self.stats.lookup_time += time.perf_counter() - started
+        return entry
+
+    def store(self, question: str, on_topic: str, documents: Sequence[Document], answer: str):
+        vector = self.embeddings.embed_query(question)
+        if self._index is None:
+            self._index = VectorIndex(len(vector))
+        if len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))  # oldest first
+        entry_id = str(self._next_id)
+        self._next_id += 1
+        self._index.add([vector], [entry_id])
+        self._entries[entry_id] = CachedAnswer(question, on_topic, [document_id(doc) for doc in documents], answer)
+
+    def _remove(self, entry_id: str):
+        del self._entries[entry_id]
+        self._index.delete([entry_id])
+
+
+class CachedGraph:
+    """Wraps the compiled classification graph so answered questions skip it entirely"""
+
+    def __init__(self, graph, cache: SemanticCache, docs: Sequence[Document]):
+        self.graph = graph
+        self.cache = cache
+        self.set_documents(docs)
+
+    def set_documents(self, docs: Sequence[Document]):
+        """Call after the vector store's documents change"""
+        self.docs_by_id = {document_id(doc): doc for doc in docs}
+        self.cache.bind_documents(docs)
+
+    def invoke(self, input: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        question = input["messages"][-1].content
+        entry = self.cache.lookup(question)
+        if entry is not None:
+            return {
+                "messages": list(input["messages"]) + [AIMessage(content=entry.answer)],
+                "documents": [self.docs_by_id[i] for i in entry.document_ids if i in self.docs_by_id],
+                "on_topic": entry.on_topic,
+            }
+
+        result = self.graph.invoke(input, **kwargs)
+        last = result["messages"][-1]
+        self.cache.store(question, result.get("on_topic", ""), result.get("documents") or [],
+                         getattr(last, "content", str(last)))
+        return result
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+PARAPHRASE_SET = [
+    # (question, group): questions in the same group share an answer. Near-duplicates
+    # with a different answer (plan_spa, weekend_hours, ...) check for false hits.
+    ("Who is the owner and what are the timings?", "owner_hours"),
+    ("who is the owner, and what are the timings", "owner_hours"),
+    ("What are the timings and who is the owner?", "owner_hours"),
+    ("Can you tell me who the owner is and the timings?", "owner_hours"),
+    ("What are the weekend timings?", "weekend_hours"),
+    ("What are the membership plans?", "plans"),
+    ("what membership plans are there?", "plans"),
+    ("Tell me about your membership plans please", "plans"),
+    ("Which membership plan includes 24/7 access?", "plan_247"),
+    ("Which membership plans include 24/7 access?", "plan_247"),
+    ("Which membership plan includes spa facilities?", "plan_spa"),
+    ("Who founded Peak Performance Gym?", "founder"),
+    ("Who founded the Peak Performance gym", "founder"),
+    ("Who is the founder of Peak Performance Gym?", "founder"),
+    ("What group fitness classes do you offer?", "classes"),
+    ("What group fitness classes are offered?", "classes"),
+    ("Which group fitness classes do you offer?", "classes"),
+    ("Do you offer student discounts?", "discount"),
+    ("Do you offer discounts for students?", "discount"),
+    ("Do you offer corporate discounts?", "corporate_discount"),
+    ("Who are the personal trainers?", "trainers"),
+    ("who are your personal trainers", "trainers"),
+    ("What is Blackhole in space?", "off_topic"),
+    ("What is a blackhole in space?", "off_topic"),
+    ("What equipment is available?", "equipment"),
+    ("What equipment is available at the gym?", "equipment"),
+]
+
+
+def benchmark(latencies=(0.3, 0.02, 0.8), repeats: int = 3):
+    """Hit rate, wrong-answer rate and latency with simulated classifier/retrieval/answer costs"""
+    classify_latency, retrieve_latency, answer_latency = latencies
+    docs = [Document(page_content=f"Gym fact {i}", metadata={"source": f"fact_{i}.txt"}) for i in range(6)]
+
+    class SimulatedGraph:
+        """Stand-in for the compiled notebook graph with the same state shape"""
+
+        def __init__(self):
+            self.calls = 0
+
+        def invoke(self, input):
+            self.calls += 1
+            question = input["messages"][-1].content
+            time.sleep(classify_latency)
+            if "blackhole" in question.lower():
+                answer, on_topic, found = "I'm sorry! I cannot answer this question!", "No", []
+            else:
+                time.sleep(retrieve_latency + answer_latency)
+                group = dict(PARAPHRASE_SET)[question]
+                answer, on_topic, found = f"answer:{group}", "Yes", docs[:3]
+            return {"messages": list(input["messages"]) + [AIMessage(content=answer)],
+                    "documents": found, "on_topic": on_topic}
+
+    from langchain_core.messages import HumanMessage
+
+    groups = dict(PARAPHRASE_SET)
+    graph = SimulatedGraph()
+    cached = CachedGraph(graph, SemanticCache(), docs)
+    wrong = 0
+    timings = {"hit": [], "miss": []}
+    for _ in range(repeats):
+        for question, group in PARAPHRASE_SET:
+            hits_before = cached.cache.stats.hits
+            started = time.perf_counter()
+            result = cached.invoke({"messages": [HumanMessage(content=question)]})
+            elapsed = time.perf_counter() - started
+            timings["hit" if cached.cache.stats.hits > hits_before else "miss"].append(elapsed)
+            answer = result["messages"][-1].content
+            expected = "I'm sorry! I cannot answer this question!" if group == "off_topic" else f"answer:{group}"
+            wrong += answer != expected
+
+    stats = cached.cache.stats
+    total = len(PARAPHRASE_SET) * repeats
+    uncached = total * (classify_latency + retrieve_latency + answer_latency)
+    spent = sum(timings["hit"]) + sum(timings["miss"])
+    print(f"=== SEMANTIC CACHE: {len(PARAPHRASE_SET)} questions in "
+          f"{len(set(groups.values()))} paraphrase groups, x{repeats} ===")
+    print(f"Hit rate:            {stats.hit_rate:.0%} ({stats.hits} hits, {stats.misses} misses, "
+          f"{graph.calls} graph runs)")
+    print(f"Wrong cached answers: {wrong}")
+    print(f"Latency:             hit {1000 * sum(timings['hit']) / max(len(timings['hit']), 1):.2f} ms, "
+          f"miss {1000 * sum(timings['miss']) / max(len(timings['miss']), 1):.0f} ms")
+    print(f"Total time:          {spent:.2f} s vs {uncached:.2f} s without the cache "
+          f"({1 - spent / uncached:.0%} saved)")
+
+    cached.set_documents(docs + [Document(page_content="New fact", metadata={"source": "new.txt"})])
+    print(f"After a document change: {len(cached.cache)} entries, {stats.invalidations} invalidation")
+
+
+if __name__ == "__main__":
+    benchmark()
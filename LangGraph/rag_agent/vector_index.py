@@ -0,0 +1,384 @@
+"""
+Vector Index
+Lightweight in-process vector index for the rag_agent retrievers.
+
+Vectors live in one contiguous float32 matrix (optionally memory-mapped from disk), so
+an exact search is a single matrix-vector product followed by argpartition. For large
+corpora an IVF mode clusters the rows and scans only the closest lists, using an int8
+copy of the vectors and exact re-scoring of the best candidates. MMR re-ranking works
+on the candidate block with one pairwise product and a running max, with no Python loop
+over pairs.
+
+    index = VectorIndex.from_documents(docs, CachedEmbeddings(OpenAIEmbeddings()))
+    retriever = index.as_retriever(embeddings, search_type="mmr", search_kwargs={"k": 3})
+
+Vectors are L2-normalised on insert, so scores are cosine similarities.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import Field
+
+from rag_ingestion import document_id
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    np.maximum(norms, 1e-12, out=norms)
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+@dataclass
+class _IVF:
+    centroids: np.ndarray  # (L, d) float32, normalised
+    order: np.ndarray      # row ids grouped by list
+    offsets: np.ndarray    # (L + 1,) list boundaries into `order`
+    codes: Optional[np.ndarray]   # (n, d) int8 in `order` order, or None when not quantized
+    scales: Optional[np.ndarray]  # (n,) per-vector dequantisation scale
+    n_rows: int            # rows covered; rows added later are scanned exactly
+    n_probe: int
+
+
+class VectorIndex:
+    """Contiguous float32 vectors with ids and documents, searched by inner product"""
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.empty((capacity, dim), dtype=np.float32)
+        self._alive = np.ones(capacity, dtype=bool)
+        self._size = 0
+        self._deleted = 0
+        self.ids: List[str] = []
+        self.documents: List[Optional[Document]] = []
+        self._row_of: Dict[str, int] = {}
+        self._ivf: Optional[_IVF] = None
+
+    def __len__(self) -> int:
+        return self._size - self._deleted
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self._size]
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _reserve(self, rows: int):
+        needed = self._size + rows
+        if needed <= len(self._matrix) and self._matrix.flags.writeable:
+            return
+        capacity = max(needed, 2 * len(self._matrix), 1024)
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        alive = np.ones(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._matrix, self._alive = matrix, alive
+
+    def add(self, vectors: np.ndarray, ids: Optional[Sequence[str]] = None,
+            documents: Optional[Sequence[Document]] = None) -> List[str]:
+        """Insert vectors; an id that already exists has its vector and document replaced"""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        if ids is None:
+            ids = [str(self._size + i) for i in range(len(vectors))]
+        documents = documents if documents is not None else [None] * len(vectors)
+        if len(set(ids)) < len(ids):
+            # Repeated ids in one batch: the last occurrence wins, as it would across batches
+            last = {doc_id: i for i, doc_id in enumerate(ids)}
+            keep = sorted(last.values())
+            vectors, ids, documents = vectors[keep], [ids[i] for i in keep], [documents[i] for i in keep]
+
+        new_rows = [i for i, doc_id in enumerate(ids) if doc_id not in self._row_of]
+        self._reserve(len(new_rows))
+        for i, (doc_id, doc) in enumerate(zip(ids, documents)):
+            row = self._row_of.get(doc_id)
+            if row is not None:
+                self._matrix[row] = vectors[i]
+                self.documents[row] = doc
+                self._ivf = None  # quantized copy is stale
+        if new_rows:
+            start = self._size
+            self._matrix[start:start + len(new_rows)] = vectors[new_rows]
+            self._alive[start:start + len(new_rows)] = True
+            for offset, i in enumerate(new_rows):
+                self._row_of[ids[i]] = start + offset
+                self.ids.append(ids[i])
+                self.documents.append(documents[i])
+            self._size += len(new_rows)
+        return list(ids)
+
+    def delete(self, ids: Sequence[str]):
+        for doc_id in ids:
+            row = self._row_of.pop(doc_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._deleted += 1
+
+    @classmethod
+    def from_documents(cls, documents: Sequence[Document], embeddings: Embeddings,
+                       ids: Optional[Sequence[str]] = None) -> "VectorIndex":
+        vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in documents]), dtype=np.float32)
+        index = cls(vectors.shape[1], capacity=max(len(vectors), 1))
+        if ids is None:
+            ids = [document_id(doc) for doc in documents]  # chunk-level: one file yields many chunks
+        index.add(vectors, ids, documents)
+        return index
+
+    # ------------------------------------------------------------------
+    # IVF / quantization
+    # ------------------------------------------------------------------
+
+    def build_ivf(self, n_lists: Optional[int] = None, n_probe: int = 8, quantize: bool = True,
+                  iterations: int = 10, seed: int = 0):
+        """Cluster the rows into `n_lists` inverted lists (k-means on a sample)"""
+        matrix = self.matrix
+        n = len(matrix)
+        n_lists = min(n_lists or max(1, int(4 * np.sqrt(n))), n)
+        rng = np.random.default_rng(seed)
+        sample = matrix[rng.choice(n, size=min(n, 64 * n_lists), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=n_lists)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+            centroids = _normalize(sums)
+
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 65536):
+            assign[start:start + 65536] = np.argmax(matrix[start:start + 65536] @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1))
+
+        codes = scales = None
+        if quantize:
+            ordered = matrix[order]
+            scales = (np.abs(ordered).max(axis=1) / 127.0).astype(np.float32)
+            np.maximum(scales, 1e-12, out=scales)
+            codes = np.rint(ordered / scales[:, None]).astype(np.int8)
+        self._ivf = _IVF(centroids, order, offsets, codes, scales, n, n_probe)
+
+    def _ivf_candidates(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        ivf = self._ivf
+        lists = _top_k(ivf.centroids @ query, ivf.n_probe)
+        positions = np.concatenate([np.arange(ivf.offsets[l], ivf.offsets[l + 1]) for l in lists])
+        if self._deleted:
+            positions = positions[self._alive[ivf.order[positions]]]
+        if ivf.codes is not None:
+            # Approximate scores from the int8 copy, then exact re-scoring of the best few
+            approx = (ivf.codes[positions] @ query) * ivf.scales[positions]
+            positions = positions[_top_k(approx, 4 * k)]
+        rows = ivf.order[positions]
+        if ivf.n_rows < self._size:
+            rows = np.concatenate([rows, np.arange(ivf.n_rows, self._size)])
+        return rows, self._matrix[rows] @ query
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: Sequence[float], k: int = 4, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the k most similar vectors, best first"""
+        query = _normalize(np.asarray(query, dtype=np.float32))
+        if self._ivf is not None and not exact:
+            rows, scores = self._ivf_candidates(query, k)
+        else:
+            rows, scores = None, self.matrix @ query
+        if self._deleted:
+            alive = self._alive[rows] if rows is not None else self._alive[:self._size]
+            scores = np.where(alive, scores, -np.inf)
+        top = _top_k(scores, min(k, len(self)))
+        top = top[np.isfinite(scores[top])]  # deleted rows scored -inf
+        return (rows[top] if rows is not None else top), scores[top]
+
+    def mmr(self, query: Sequence[float], k: int = 4, fetch_k: int = 20,
+            lambda_mult: float = 0.5) -> np.ndarray:
+        """Rows chosen by maximal marginal relevance among the fetch_k nearest"""
+        candidates, _ = self.search(query, fetch_k)
+        if len(candidates) == 0:
+            return candidates
+        query = _normalize(np.asarray(query, dtype=np.float32))
+        block = self._matrix[candidates]
+        relevance = block @ query
+        pairwise = block @ block.T
+
+        chosen = np.zeros(len(candidates), dtype=bool)
+        first = int(np.argmax(relevance))
+        selected = [first]
+        chosen[first] = True
+        max_similarity = pairwise[first].copy()
+        for _ in range(1, min(k, len(candidates))):
+            score = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+            score[chosen] = -np.inf
+            pick = int(np.argmax(score))
+            selected.append(pick)
+            chosen[pick] = True
+            np.maximum(max_similarity, pairwise[pick], out=max_similarity)
+        return candidates[selected]
+
+    def similarity_search_by_vector(self, query: Sequence[float], k: int = 4) -> List[Document]:
+        rows, _ = self.search(query, k)
+        return [self.documents[row] for row in rows]
+
+    def max_marginal_relevance_search_by_vector(self, query: Sequence[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5) -> List[Document]:
+        return [self.documents[row] for row in self.mmr(query, k, fetch_k, lambda_mult)]
+
+    def as_retriever(self, embeddings: Embeddings, search_type: str = "similarity",
+                     search_kwargs: Optional[Dict[str, Any]] = None) -> "VectorIndexRetriever":
+        return VectorIndexRetriever(index=self, embeddings=embeddings, search_type=search_type,
+                                    search_kwargs=search_kwargs or {})
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Write the live rows to `path` (a directory) as vectors.npy plus metadata"""
+        os.makedirs(path, exist_ok=True)
+        alive = np.flatnonzero(self._alive[:self._size])
+        np.save(os.path.join(path, "vectors.npy"), self._matrix[alive])
+        records = [
+            {"id": self.ids[row],
+             "document": None if self.documents[row] is None else
+             {"page_content": self.documents[row].page_content, "metadata": self.documents[row].metadata}}
+            for row in alive
+        ]
+        with open(os.path.join(path, "documents.json"), "w") as f:
+            json.dump({"dim": self.dim, "records": records}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """Open a saved index; with mmap the vectors are paged in from disk on demand"""
+        with open(os.path.join(path, "documents.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["dim"], capacity=1)
+        index._matrix = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        index._size = len(index._matrix)
+        index._alive = np.ones(index._size, dtype=bool)
+        for row, record in enumerate(meta["records"]):
+            index.ids.append(record["id"])
+            index._row_of[record["id"]] = row
+            doc = record["document"]
+            index.documents.append(None if doc is None else Document(**doc))
+        return index
+
+
+class VectorIndexRetriever(BaseRetriever):
+    """LangChain retriever over a VectorIndex (search_type "similarity" or "mmr")"""
+
+    index: Any
+    embeddings: Any
+    search_type: str = "similarity"
+    search_kwargs: Dict[str, Any] = Field(default_factory=dict)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = self.embeddings.embed_query(query)
+        if self.search_type == "mmr":
+            return self.index.max_marginal_relevance_search_by_vector(vector, **self.search_kwargs)
+        if self.search_type == "similarity":
+            return self.index.similarity_search_by_vector(vector, **self.search_kwargs)
+        raise ValueError(f"Unsupported search_type: {self.search_type}")
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _clustered_vectors(n: int, dim: int, rng: np.random.Generator, n_topics: int = 256) -> np.ndarray:
+    """Embedding-like data: points scattered around topic directions"""
+    topics = _normalize(rng.standard_normal((n_topics, dim)).astype(np.float32))
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(n, start + 100_000)
+        vectors[start:stop] = topics[rng.integers(0, n_topics, stop - start)]
+        vectors[start:stop] += 0.08 * rng.standard_normal((stop - start, dim)).astype(np.float32)
+    return vectors
+
+
+def _time_per_query(fn, queries: np.ndarray) -> float:
+    fn(queries[0])
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+def benchmark(sizes: Sequence[int] = (1_000, 100_000, 1_000_000), dim: int = 128, n_queries: int = 50,
+              baseline_limit: int = 100_000):
+    """Per-query latency for k=3 similarity and MMR (fetch_k=20) at several corpus sizes
+
+    The baseline is LangChain's InMemoryVectorStore (list-of-floats storage with the stock
+    maximal_marginal_relevance), standing in for the notebooks' Chroma setup.
+    """
+    from langchain_core.vectorstores import InMemoryVectorStore
+
+    class Precomputed(Embeddings):
+        def __init__(self, vectors):
+            self.vectors = vectors
+
+        def embed_documents(self, texts):
+            return [self.vectors[int(text)].tolist() for text in texts]
+
+        def embed_query(self, text):
+            return self.vectors[int(text)].tolist()
+
+    rng = np.random.default_rng(0)
+    print(f"=== VECTOR INDEX: dim {dim}, k=3, MMR fetch_k=20, ms per query ===")
+    print(f"{'vectors':>10} {'baseline':>9} {'base mmr':>9} {'exact':>8} {'mmr':>8} {'ivf+int8':>9} "
+          f"{'ivf mmr':>8} {'recall@3':>9} {'ivf build':>10}")
+    for n in sizes:
+        vectors = _clustered_vectors(n, dim, rng)
+        queries = vectors[rng.integers(0, n, n_queries)] + 0.05 * rng.standard_normal((n_queries, dim))
+        queries = queries.astype(np.float32)
+
+        index = VectorIndex(dim, capacity=n)
+        index.add(vectors)
+        exact = _time_per_query(lambda q: index.search(q, 3), queries)
+        mmr = _time_per_query(lambda q: index.mmr(q, 3, 20), queries)
+        truth = [set(index.search(q, 3)[0].tolist()) for q in queries]
+
+        started = time.perf_counter()
+        index.build_ivf(n_probe=8)
+        build = time.perf_counter() - started
+        ivf = _time_per_query(lambda q: index.search(q, 3), queries)
+        ivf_mmr = _time_per_query(lambda q: index.mmr(q, 3, 20), queries)
+        recall = np.mean([len(truth[i] & set(index.search(q, 3)[0].tolist())) / 3 for i, q in enumerate(queries)])
+
+        base = base_mmr = "n/a"
+        if n <= baseline_limit:
+            store = InMemoryVectorStore(Precomputed(vectors))
+            store.add_texts([str(i) for i in range(n)])
+            base_queries = queries[:10].tolist()
+            base = f"{_time_per_query(lambda q: store.similarity_search_by_vector(q, 3), base_queries):.2f}"
+            base_mmr = f"{_time_per_query(lambda q: store.max_marginal_relevance_search_by_vector(q, 3, 20), base_queries):.2f}"
+            del store
+        print(f"{n:>10,} {base:>9} {base_mmr:>9} {exact:8.2f} {mmr:8.2f} {ivf:9.2f} {ivf_mmr:8.2f} "
+              f"{recall:9.2f} {build:9.1f}s")
+        del index, vectors
+    print(f"(baseline skipped above {baseline_limit:,} vectors: it keeps each vector as a Python list)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -6,6 +6,9 @@ import datetime
 from langchain_community.tools import TavilySearchResults
 from langchain import hub
 
+# tool_cache.py is in LangGraph/: run as `PYTHONPATH=.. python react_graph.py`
+from tool_cache import CachePolicy, cached_tool
+
 load_dotenv()
 
 llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
@@ -13,6 +16,7 @@ llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
 search_tool = TavilySearchResults(search_depth="basic")
 
 @tool
+@cached_tool(CachePolicy.TIME_DEPENDENT, ttl=1.0)
 def get_system_time(format: str = "%Y-%m-%d %H:%M:%S"):
     """Returns the current date and time in the specified format"""
 
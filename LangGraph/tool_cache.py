@@ -0,0 +1,209 @@
+"""
+Tool Result Caching
+Decorators that memoize agent tool calls according to how the tool behaves.
+
+Policies:
+- PURE            same input always gives the same output -> memoize forever (LRU-bounded)
+- TIME_DEPENDENT  output drifts with the clock            -> expire after `ttl` seconds
+- EXTERNAL        output comes from a remote service      -> expire after `ttl`, but keep
+                  serving the stale value for `stale_ttl` more seconds while a background
+                  refresh runs (stale-while-revalidate)
+
+    @cached_tool(CachePolicy.EXTERNAL, ttl=300, stale_ttl=3600)
+    def search_tool(query: str) -> str:
+        ...
+
+Calls are keyed on their bound arguments, so `search_tool("x")` and `search_tool(query="x")`
+share an entry. Stats are kept per tool (`search_tool.cache.stats`) and every cache event
+is also published to an optional instrumentation hook set with `set_instrumentation_hook`.
+Decorated functions keep their signature and docstring, so LangChain's @tool can be
+stacked on top.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CachePolicy(Enum):
+    PURE = "pure"
+    TIME_DEPENDENT = "time_dependent"
+    EXTERNAL = "external"
+
+
+DEFAULT_TTL = {
+    CachePolicy.PURE: None,
+    CachePolicy.TIME_DEPENDENT: 1.0,
+    CachePolicy.EXTERNAL: 300.0,
+}
+DEFAULT_STALE_TTL = 3600.0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    refreshes: int = 0
+    evictions: int = 0
+    bypasses: int = 0   # calls with unhashable arguments
+    errors: int = 0     # failed background refreshes
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+@dataclass
+class CacheEvent:
+    tool: str
+    event: str          # hit, miss, stale_hit, refresh, refresh_error, evict, bypass
+    policy: str
+    elapsed: float      # seconds spent in the call (0 for events without a call)
+
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+_instrumentation_hook: Optional[Callable[[CacheEvent], None]] = None
+_registry: Dict[str, "ToolCache"] = {}
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool-cache-refresh")
+
+
+def set_instrumentation_hook(hook: Optional[Callable[[CacheEvent], None]]):
+    """Receive a CacheEvent for every cache lookup, refresh and eviction (None to disable)"""
+    global _instrumentation_hook
+    _instrumentation_hook = hook
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of the stats of every cached tool, keyed by module and qualified name"""
+    return {
+        name: {**asdict(cache.stats), "hit_rate": cache.stats.hit_rate, "size": len(cache)}
+        for name, cache in _registry.items()
+    }
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class ToolCache:
+    """Bounded LRU cache for one tool, applying its policy on lookup"""
+
+    def __init__(self, fn: Callable, policy: CachePolicy, ttl: Optional[float],
+                 stale_ttl: float, max_size: int):
+        self.fn = fn
+        self.name = f"{fn.__module__}.{fn.__qualname__}"  # two tools may share a __name__
+        self.signature = inspect.signature(fn)
+        self.policy = policy
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl if policy is CachePolicy.EXTERNAL else 0.0
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def call(self, args: tuple, kwargs: dict) -> Any:
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (bound.args, tuple(sorted(bound.kwargs.items())))
+            hash(key)
+        except TypeError:
+            self._record("bypasses", "bypass")
+            return self.fn(*args, **kwargs)
+
+        started = time.perf_counter()
+        outcome, schedule_refresh = None, False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if self.ttl is None or age <= self.ttl:
+                    outcome = "hit"
+                elif age <= self.ttl + self.stale_ttl:
+                    outcome = "stale_hit"
+                    schedule_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                if outcome:
+                    self._entries.move_to_end(key)
+
+        if outcome:
+            if schedule_refresh:
+                _refresh_pool.submit(self._refresh, key, args, kwargs)
+            self._record(outcome + "s", outcome, started)
+            return entry[1]
+
+        value = self.fn(*args, **kwargs)
+        self._store(key, value)
+        self._record("misses", "miss", started)
+        return value
+
+    def _refresh(self, key: Hashable, args: tuple, kwargs: dict):
+        started = time.perf_counter()
+        try:
+            value = self.fn(*args, **kwargs)
+        except Exception:
+            self._record("errors", "refresh_error", started)
+        else:
+            self._store(key, value)
+            self._record("refreshes", "refresh", started)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: Hashable, value: Any):
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        for _ in range(evicted):
+            self._record("evictions", "evict")
+
+    def _record(self, counter: str, event: str, started: Optional[float] = None):
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+        hook = _instrumentation_hook
+        if hook is not None:
+            elapsed = time.perf_counter() - started if started is not None else 0.0
+            hook(CacheEvent(self.name, event, self.policy.value, elapsed))
+
+
+def cached_tool(policy: CachePolicy = CachePolicy.PURE, ttl: Optional[float] = None,
+                stale_ttl: float = DEFAULT_STALE_TTL, max_size: int = 256):
+    """Cache a tool's results according to `policy` (see module docstring)"""
+    if ttl is None:
+        ttl = DEFAULT_TTL[policy]
+
+    def decorator(fn: Callable) -> Callable:
+        cache = ToolCache(fn, policy, ttl, stale_ttl, max_size)
+        _registry[cache.name] = cache
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return cache.call(args, kwargs)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
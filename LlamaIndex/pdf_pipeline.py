@@ -0,0 +1,401 @@
+"""
+Local PDF Pipeline
+Page-parallel PDF parsing, token-aware chunking and batched embedding in one stream.
+
+SimpleDirectoryReader and LlamaParse handle a PDF as a single unit: the whole file is
+parsed before anything is chunked, and nothing is embedded until every chunk exists.
+PDFPipeline overlaps the stages instead:
+
+- Parse: page ranges are spread over a process pool; each worker opens the file through
+  mmap, so pages are paged in from disk on demand and a large PDF is never read whole
+- Stream: page texts are handed on in page order as soon as the next range completes
+- Chunk: TokenChunker cuts the running text into `chunk_size`-token windows with
+  `overlap`, counting tokens with tiktoken (whitespace tokens when it is unavailable)
+- Embed: chunks are grouped into `batch_size` batches and embedded on a thread pool
+  while parsing continues
+
+Requires pypdf.
+
+    pipeline = PDFPipeline(embed_fn=OpenAIEmbedding().get_text_embedding_batch)
+    nodes = [node for batch in pipeline.stream("Transformers Applications.pdf") for node in to_nodes(batch)]
+    index = VectorStoreIndex(nodes)
+"""
+
+import mmap
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pypdf
+except ImportError:  # parsing needs pypdf; chunking and embedding work without it
+    pypdf = None
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to whitespace-separated words
+    tiktoken = None
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+def _require_pypdf():
+    if pypdf is None:
+        raise ImportError("PDF parsing requires pypdf: pip install pypdf")
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+_READERS: Dict[str, Tuple[Any, mmap.mmap, Any]] = {}
+MAX_OPEN_READERS = 8
+
+
+def _reader(path: str):
+    """Per-process PdfReader over a read-only memory map, opened once per file"""
+    entry = _READERS.get(path)
+    if entry is None:
+        if len(_READERS) >= MAX_OPEN_READERS:
+            f, mapped, _ = _READERS.pop(next(iter(_READERS)))
+            mapped.close()
+            f.close()
+        f = open(path, "rb")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        entry = _READERS[path] = (f, mapped, pypdf.PdfReader(mapped))
+    return entry[2]
+
+
+def page_count(path: str) -> int:
+    _require_pypdf()
+    return len(_reader(path).pages)
+
+
+def parse_pages(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop)"""
+    reader = _reader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pages(path: str, workers: int = 4, pages_per_task: int = 8,
+               executor: Optional[ProcessPoolExecutor] = None) -> Iterator[Tuple[int, str]]:
+    """(page number, text) in page order, while later ranges are still being parsed"""
+    _require_pypdf()
+    path = os.path.abspath(path)
+    total = page_count(path)
+    ranges = [(start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)]
+    if workers <= 1 and executor is None:
+        for start, stop in ranges:
+            yield from zip(range(start, stop), parse_pages(path, start, stop))
+        return
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending, done, next_range = {}, {}, 0
+        todo = iter(ranges)
+        # Bounded in-flight work keeps memory flat however long the PDF is
+        for start, stop in todo:
+            pending[pool.submit(parse_pages, path, start, stop)] = start
+            if len(pending) >= 2 * max(workers, 1):
+                break
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[pending.pop(future)] = future.result()
+                for start, stop in todo:
+                    pending[pool.submit(parse_pages, path, start, stop)] = start
+                    break
+            while next_range < len(ranges) and ranges[next_range][0] in done:
+                start = ranges[next_range][0]
+                yield from enumerate(done.pop(start), start)
+                next_range += 1
+    finally:
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+
+
+# ============================================================================
+# CHUNKING
+# ============================================================================
+
+@dataclass
+class Chunk:
+    text: str
+    first_page: int
+    last_page: int
+    tokens: int
+    index: int
+
+
+def _load_encoding(name: str):
+    """tiktoken encoding, or None when tiktoken or its encoding files are unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        # Loads cl100k_base from the copy bundled with llama-index, so no download is needed
+        from llama_index.core.utils import get_tokenizer
+        get_tokenizer()
+    except ImportError:
+        pass
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:  # offline and not cached: tiktoken downloads encodings on first use
+        return None
+
+
+class TokenChunker:
+    """Incremental fixed-size token windows with overlap, tracking the pages each chunk spans"""
+
+    def __init__(self, chunk_size: int = 512, overlap: int = 64, encoding: str = "cl100k_base"):
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self._encoding = _load_encoding(encoding)
+        self._tokens: List[Any] = []
+        self._pages: List[int] = []
+        self._count = 0
+
+    def encode(self, text: str) -> List[Any]:
+        if self._encoding is not None:
+            return self._encoding.encode(text, disallowed_special=())
+        return re.findall(r"\S+\s*", text)
+
+    def decode(self, tokens: Sequence[Any]) -> str:
+        return self._encoding.decode(list(tokens)) if self._encoding is not None else "".join(tokens)
+
+    def _emit(self, size: int) -> Chunk:
+        chunk = Chunk(self.decode(self._tokens[:size]), self._pages[0], self._pages[size - 1], size, self._count)
+        self._count += 1
+        return chunk
+
+    def feed(self, page: int, text: str) -> Iterator[Chunk]:
+        tokens = self.encode(text + "\n\n")
+        self._tokens.extend(tokens)
+        self._pages.extend([page] * len(tokens))
+        step = self.chunk_size - self.overlap
+        while len(self._tokens) >= self.chunk_size:
+            yield self._emit(self.chunk_size)
+            del self._tokens[:step], self._pages[:step]
+
+    def finish(self) -> Iterator[Chunk]:
+        # The tail is only worth a chunk if it holds more than the previous chunk's overlap
+        if len(self._tokens) > (self.overlap if self._count else 0):
+            yield self._emit(len(self._tokens))
+        self._tokens, self._pages = [], []
+
+
+def chunk_pages(pages: Iterable[Tuple[int, str]], chunker: TokenChunker) -> Iterator[Chunk]:
+    for page, text in pages:
+        yield from chunker.feed(page, text)
+    yield from chunker.finish()
+
+
+# ============================================================================
+# EMBEDDING
+# ============================================================================
+
+def embed_batches(chunks: Iterable[Chunk], embed_fn: EmbedFn, batch_size: int = 64,
+                  concurrency: int = 4) -> Iterator[List[Tuple[Chunk, List[float]]]]:
+    """Embed chunks in batches on a thread pool, yielding batches in order as they finish"""
+    def embed(batch: List[Chunk]):
+        return list(zip(batch, embed_fn([chunk.text for chunk in batch])))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight, batch = [], []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) == batch_size:
+                in_flight.append(pool.submit(embed, batch))
+                batch = []
+                if len(in_flight) > concurrency:
+                    yield in_flight.pop(0).result()
+        if batch:
+            in_flight.append(pool.submit(embed, batch))
+        for future in in_flight:
+            yield future.result()
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+@dataclass
+class PipelineReport:
+    pages: int = 0
+    chunks: int = 0
+    tokens: int = 0
+    first_batch: float = 0.0    # seconds until the first embedded batch was available
+    elapsed: float = 0.0
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.pages} pages, {self.chunks} chunks ({self.tokens} tokens) in {self.elapsed:.2f} s "
+                f"= {self.pages_per_sec:.0f} pages/s, first batch after {self.first_batch:.2f} s")
+
+
+class PDFPipeline:
+    """Parse -> chunk -> embed, with each stage consuming the previous one's output as it arrives"""
+
+    def __init__(self, embed_fn: Optional[EmbedFn] = None, workers: int = 4, pages_per_task: int = 8,
+                 chunk_size: int = 512, overlap: int = 64, batch_size: int = 64, embed_concurrency: int = 4):
+        self.embed_fn = embed_fn
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self.embed_concurrency = embed_concurrency
+        self.report = PipelineReport()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        # One pool for the pipeline's lifetime, so workers keep their open readers warm
+        if self.workers > 1 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def chunks(self, path: str) -> Iterator[Chunk]:
+        report = self.report = PipelineReport()
+
+        def counted(pages):
+            for page in pages:
+                report.pages += 1
+                yield page
+
+        pages = iter_pages(path, self.workers, self.pages_per_task, self._pool())
+        for chunk in chunk_pages(counted(pages), TokenChunker(self.chunk_size, self.overlap)):
+            report.chunks += 1
+            report.tokens += chunk.tokens
+            yield chunk
+
+    def stream(self, path: str) -> Iterator[List[Tuple[Chunk, List[float]]]]:
+        """Embedded batches of (chunk, vector) for one PDF"""
+        if self.embed_fn is None:
+            raise ValueError("PDFPipeline needs an embed_fn to produce embeddings")
+        started = time.perf_counter()
+        for n, batch in enumerate(embed_batches(self.chunks(path), self.embed_fn, self.batch_size,
+                                                self.embed_concurrency)):
+            if n == 0:
+                self.report.first_batch = time.perf_counter() - started
+            yield batch
+        self.report.elapsed = time.perf_counter() - started
+
+    def run(self, path: str, on_batch: Optional[Callable[[List[Tuple[Chunk, List[float]]]], None]] = None
+            ) -> PipelineReport:
+        for batch in self.stream(path):
+            if on_batch is not None:
+                on_batch(batch)
+        return self.report
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "PDFPipeline":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def to_nodes(batch: Sequence[Tuple[Chunk, List[float]]], path: str = "") -> List[Any]:
+    """LlamaIndex TextNodes carrying the precomputed embeddings"""
+    from llama_index.core.schema import TextNode
+
+    return [
+        TextNode(text=chunk.text, embedding=vector,
+                 metadata={"file_name": os.path.basename(path), "page_label": f"{chunk.first_page + 1}"
+                           if chunk.first_page == chunk.last_page else f"{chunk.first_page + 1}-{chunk.last_page + 1}"})
+        for chunk, vector in batch
+    ]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def write_synthetic_pdf(path: str, pages: int = 1000, lines_per_page: int = 40):
+    """Plain-text PDF with `pages` pages of Helvetica text, written without any PDF library"""
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    topics = ["attention heads", "positional encoding", "vision transformers", "macronutrients", "layer norm"]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} line {line}: notes on {topics[(page + line) % len(topics)]} "
+                 f"with measurement {page * lines_per_page + line}." for line in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({escape(text)}) '" for text in lines) + " ET"
+        data = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        kids.append(len(objects) + 1)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), pages)
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def _fake_embed_fn(latency: float, dim: int = 256) -> EmbedFn:
+    import hashlib
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        time.sleep(latency)
+        return [[b / 255 for b in hashlib.sha256(text.encode()).digest()] * (dim // 32) for text in texts]
+
+    return embed
+
+
+def benchmark(latency: float = 0.1, synthetic_pages: int = 1000):
+    """Sequential parse-then-chunk-then-embed vs the streaming pipeline, in pages/sec"""
+    import tempfile
+
+    _require_pypdf()
+    embed_fn = _fake_embed_fn(latency)
+    slides = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LangGraph", "LangGraph_Slides.pdf")
+    synthetic = os.path.join(tempfile.mkdtemp(prefix="pdf_bench_"), "synthetic.pdf")
+    print(f"=== PDF PIPELINE: {latency * 1000:.0f} ms per embedding batch, {os.cpu_count()} CPU(s), "
+          f"tokenizer: {'tiktoken' if _load_encoding('cl100k_base') else 'whitespace'} ===")
+    started = time.perf_counter()
+    write_synthetic_pdf(synthetic, synthetic_pages)
+    print(f"Synthetic {synthetic_pages}-page PDF written in {time.perf_counter() - started:.2f} s "
+          f"({os.path.getsize(synthetic) / 1e6:.1f} MB)")
+
+    for path in [slides, synthetic]:
+        print(f"--- {os.path.basename(path)}")
+        started = time.perf_counter()
+        reader = pypdf.PdfReader(path)
+        texts = [page.extract_text() or "" for page in reader.pages]
+        chunks = list(chunk_pages(enumerate(texts), TokenChunker()))
+        for i in range(0, len(chunks), 64):
+            embed_fn([chunk.text for chunk in chunks[i:i + 64]])
+        elapsed = time.perf_counter() - started
+        print(f"Sequential (parse all, chunk, embed): {len(texts) / elapsed:6.0f} pages/s ({elapsed:.2f} s)")
+
+        for workers in (1, 4):
+            with PDFPipeline(embed_fn, workers=workers) as pipeline:
+                print(f"Pipeline, {workers} worker(s):  {pipeline.run(path)}")
+    os.remove(synthetic)
+
+
+if __name__ == "__main__":
+    benchmark()